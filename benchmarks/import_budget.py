@@ -0,0 +1,114 @@
+# =============================================================================
+# ORÇAMENTO DE TEMPO DE IMPORTAÇÃO
+# =============================================================================
+# Descrição: Mede, em processos novos, o tempo de importação dos módulos do
+#            projeto e verifica se ficam dentro do orçamento e se não carregam
+#            bibliotecas pesadas fora de hora (por exemplo, pandas no motor).
+#
+# Uso:
+#   python benchmarks/import_budget.py              # falha (código 1) se estourar
+#   python benchmarks/import_budget.py --repeat 10
+#   python benchmarks/import_budget.py --scale 2    # orçamentos 2x maiores (máquinas lentas)
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# -----------------------------------------------------------------------------
+# 2. ORÇAMENTOS
+# -----------------------------------------------------------------------------
+HEAVY_MODULES = ("pandas", "plotly", "xlsxwriter", "pyarrow", "PIL", "streamlit")
+
+# módulo -> (orçamento em ms, bibliotecas que não podem ser carregadas)
+BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "retirement_engine": (250.0, HEAVY_MODULES),
+    "retirement_engine.assets": (300.0, HEAVY_MODULES),
+    "retirement_engine.batch": (300.0, HEAVY_MODULES),
+    "retirement_engine.backtest": (300.0, HEAVY_MODULES),
+    "retirement_engine.exports": (300.0, HEAVY_MODULES),
+    "retirement_engine.mortality": (300.0, HEAVY_MODULES),
+    "retirement_engine.pipeline": (300.0, HEAVY_MODULES),
+    "retirement_engine.profiling": (300.0, HEAVY_MODULES),
+    "retirement_engine.samples": (300.0, HEAVY_MODULES),
+    "retirement_engine.scenarios": (300.0, HEAVY_MODULES),
+    "retirement_engine.service": (300.0, HEAVY_MODULES),
+    "retirement_engine.solver": (300.0, HEAVY_MODULES),
+    "retirement_engine.store": (300.0, HEAVY_MODULES),
+    "retirement_engine.sweep": (300.0, HEAVY_MODULES),
+    "retirement_engine.withdrawal": (300.0, HEAVY_MODULES),
+    "retirement_engine.writers": (300.0, HEAVY_MODULES),
+    # O próprio Streamlit carrega Plotly e Pillow; pandas e o restante só na primeira renderização.
+    # Antes de adiar gráficos, exportações e pandas levava cerca de 1 s: o orçamento acusa a volta desse custo.
+    "retirement_simulator": (1000.0, ("pandas", "xlsxwriter", "pyarrow")),
+}
+
+MEASURE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+# -----------------------------------------------------------------------------
+# 3. MEDIÇÃO
+# -----------------------------------------------------------------------------
+def measure_import(module: str) -> Dict[str, object]:
+    """Importa `module` em um interpretador novo e devolve o tempo e as bibliotecas carregadas."""
+    completed = subprocess.run(
+        [sys.executable, "-c", MEASURE_SCRIPT.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def check_budgets(repeat: int, scale: float) -> List[str]:
+    """Imprime o relatório e devolve as violações encontradas."""
+    failures = []
+    width = max(len(module) for module in BUDGETS)
+    print(f"{'módulo':<{width}}  {'mediana':>9}  {'orçamento':>9}  carregados")
+    for module, (budget_ms, forbidden) in BUDGETS.items():
+        runs = [measure_import(module) for _ in range(repeat)]
+        median_ms = statistics.median(run["ms"] for run in runs)
+        loaded = sorted(set(runs[0]["loaded"]))
+        status = ""
+        if median_ms > budget_ms * scale:
+            status = "  ⚠️ acima do orçamento"
+            failures.append(f"{module}: {median_ms:.0f} ms > {budget_ms * scale:.0f} ms")
+        unexpected = [name for name in loaded if name in forbidden]
+        if unexpected:
+            status += f"  ⚠️ carregou {', '.join(unexpected)}"
+            failures.append(f"{module}: carregou {', '.join(unexpected)}")
+        print(f"{module:<{width}}  {median_ms:6.0f} ms  {budget_ms * scale:6.0f} ms  {', '.join(loaded) or '—'}{status}")
+    return failures
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Verifica o orçamento de tempo de importação.")
+    parser.add_argument("--repeat", type=int, default=5, help="Processos por módulo (usa a mediana)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplicador dos orçamentos")
+    args = parser.parse_args(argv)
+
+    failures = check_budgets(args.repeat, args.scale)
+    if failures:
+        print("\nOrçamento estourado:\n  " + "\n  ".join(failures), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
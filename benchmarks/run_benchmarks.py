@@ -0,0 +1,406 @@
+# =============================================================================
+# BENCHMARKS DO SIMULADOR
+# =============================================================================
+# Descrição: Mede latência e vazão das etapas do pipeline (simulação,
+#            construção de gráficos e exportação) e compara com resultados
+#            armazenados anteriormente.
+#
+# Uso:
+#   python benchmarks/run_benchmarks.py                       # executa e imprime
+#   python benchmarks/run_benchmarks.py --save-baseline       # grava benchmarks/baseline.json
+#   python benchmarks/run_benchmarks.py --compare             # compara com o baseline
+#   python benchmarks/run_benchmarks.py --filter retirement   # apenas casos com "retirement"
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import argparse
+import dataclasses
+import datetime
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from retirement_engine import (  # noqa: E402
+    MODE_STRATEGY,
+    STRATEGY_DRAWDOWN,
+    STRATEGY_PERPETUAL,
+    MonteCarloSettings,
+    SharedCache,
+    build_income_matrix,
+    config_hash,
+    run_monte_carlo,
+    run_simulation,
+    simulate_accumulation,
+    simulation_timeline,
+    verify_monte_carlo,
+)
+from retirement_engine.assets import default_asset_model  # noqa: E402
+from retirement_engine.backtest import BacktestSettings, ReturnHistory, run_backtest  # noqa: E402
+from retirement_engine.monte_carlo import STREAM_PATHS  # noqa: E402
+from retirement_engine.mortality import build_survival_curve  # noqa: E402
+from retirement_engine.pipeline import StagedSimulator  # noqa: E402
+from retirement_engine.samples import HORIZONS, SOURCE_COUNTS, make_config  # noqa: E402
+from retirement_engine.scenarios import simulate_scenarios  # noqa: E402
+from retirement_engine.service import simulate_requests  # noqa: E402
+from retirement_engine.store import ResultStore  # noqa: E402
+from retirement_engine.withdrawal import (  # noqa: E402
+    STRATEGY_FLOOR_CEILING,
+    STRATEGY_FOUR_PERCENT,
+    STRATEGY_GUYTON_KLINGER,
+    STRATEGY_VPW,
+)
+
+# -----------------------------------------------------------------------------
+# 2. CONSTANTES
+# -----------------------------------------------------------------------------
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# -----------------------------------------------------------------------------
+# 3. CASOS DE BENCHMARK
+# -----------------------------------------------------------------------------
+@dataclass
+class Case:
+    """Um caso mede `run()`; `units` é o número de meses simulados (ou linhas) por chamada."""
+
+    name: str
+    run: Callable[[], object]
+    units: int
+
+
+def build_cases() -> List[Case]:
+    cases: List[Case] = []
+
+    for years in HORIZONS:
+        config = make_config(years, 10)
+        cases.append(Case(f"accumulation/{years}y", lambda c=config: simulate_accumulation(c), years * 12))
+
+    for n_sources in SOURCE_COUNTS:
+        for years in HORIZONS:
+            config = make_config(20, years, n_sources)
+            months = config.accumulation_months + config.retirement_months
+            cases.append(Case(
+                f"retirement.custom/{n_sources}src/{years}y", lambda c=config: run_simulation(c), months
+            ))
+            ages = simulation_timeline(config)
+            cases.append(Case(
+                f"income_matrix/{n_sources}src/{years}y",
+                lambda s=config.income_sources, a=ages: build_income_matrix(s, a),
+                max(n_sources, 1) * len(ages),
+            ))
+
+    for strategy_type, label in ((STRATEGY_DRAWDOWN, "drawdown"), (STRATEGY_PERPETUAL, "perpetual")):
+        for years in HORIZONS:
+            config = make_config(20, years, 10, MODE_STRATEGY, strategy_type)
+            months = config.accumulation_months + config.retirement_months
+            cases.append(Case(f"retirement.{label}/{years}y", lambda c=config: run_simulation(c), months))
+
+    # Recálculo incremental: só as despesas mudam, acumulação e renda são reaproveitadas.
+    config = make_config(20, 40, 100)
+    simulator = StagedSimulator()
+    expenses = itertools.cycle(np.linspace(7_000.0, 9_000.0, 101))
+    cases.append(Case(
+        "staged.expenses_only/100src/40y",
+        lambda: simulator.run(dataclasses.replace(config, monthly_expenses=next(expenses))),
+        config.accumulation_months + config.retirement_months,
+    ))
+
+    # Armazenamento: leitura de um resultado salvo (partida a quente) e gravação
+    store = ResultStore(Path(tempfile.mkdtemp(prefix="bench-")) / "results.db")
+    for n_sources in (0, 100):
+        config = make_config(20, 40, n_sources)
+        result = run_simulation(config)
+        store.put(config, result)
+        cases.append(Case(
+            f"store.get/{n_sources}src/60y", lambda c=config: store.get(c), len(result.columns)
+        ))
+        cases.append(Case(
+            f"store.put/{n_sources}src/60y", lambda c=config, r=result: store.put(c, r), len(result.columns)
+        ))
+
+    # Cache compartilhado entre sessões: acerto (com lock) e gravação (com a
+    # estimativa de memória do resultado)
+    shared = SharedCache()
+    config = make_config(20, 40, 10)
+    result = run_simulation(config)
+    result_key = config_hash(config)
+    shared.put(result_key, result)
+    cases.append(Case("shared_cache.hit/10src/60y", lambda: shared.get(result_key), len(result.columns)))
+    cases.append(Case(
+        "shared_cache.put/10src/60y", lambda: shared.put(result_key, result), len(result.columns)
+    ))
+
+    # Comparação de cenários: N planos em uma única recursão
+    for n_scenarios in (1, 4, 16):
+        configs = [
+            dataclasses.replace(make_config(20, 40, 10), retirement_age=50.0 + i, monthly_investment=2_000.0 + 100 * i)
+            for i in range(n_scenarios)
+        ]
+        cases.append(Case(
+            f"scenarios/{n_scenarios}x/10src/60y",
+            lambda c=configs: simulate_scenarios(c),
+            sum(config.accumulation_months + config.retirement_months for config in configs),
+        ))
+
+    # Serviço HTTP: um lote de requisições (corpo JSON → resposta) processado por um worker
+    requests = [
+        {"config": dataclasses.replace(make_config(20, 40, 10), retirement_age=50.0 + i % 16).to_dict()}
+        for i in range(32)
+    ]
+    cases.append(Case(
+        "service.batch/32x/10src/60y",
+        lambda: simulate_requests(requests),
+        len(requests),
+    ))
+
+    config = make_config(35, 40)
+    mc_settings = MonteCarloSettings(n_paths=10_000, seed=1)
+    cases.append(Case(
+        "monte_carlo/10k_paths/75y",
+        lambda: run_monte_carlo(config, mc_settings),
+        mc_settings.n_paths * (config.accumulation_months + config.retirement_months),
+    ))
+    # Conferência de um resultado recalculando só o primeiro e o último fluxo
+    mc_result = run_monte_carlo(config, mc_settings)
+    cases.append(Case(
+        "monte_carlo.verify/2_streams/75y",
+        lambda: verify_monte_carlo(config, mc_result),
+        2 * STREAM_PATHS * (config.accumulation_months + config.retirement_months),
+    ))
+    # Regras dinâmicas: a retirada de cada mês é decidida para os 10k caminhos de uma vez
+    for strategy_type, label in (
+        (STRATEGY_GUYTON_KLINGER, "guyton_klinger"),
+        (STRATEGY_VPW, "vpw"),
+        (STRATEGY_FOUR_PERCENT, "four_percent"),
+        (STRATEGY_FLOOR_CEILING, "floor_ceiling"),
+    ):
+        dynamic_config = make_config(35, 40, 10, MODE_STRATEGY, strategy_type)
+        cases.append(Case(
+            f"monte_carlo.{label}/10k_paths/75y",
+            lambda c=dynamic_config: run_monte_carlo(c, mc_settings),
+            mc_settings.n_paths * (dynamic_config.accumulation_months + dynamic_config.retirement_months),
+        ))
+
+    # Carteira com ações e renda fixa correlacionadas e trajetória de alocação
+    glide_settings = dataclasses.replace(
+        mc_settings,
+        asset_model=default_asset_model(config.current_age, config.retirement_age, config.life_expectancy),
+    )
+    cases.append(Case(
+        "monte_carlo.glide_path/2assets/10k_paths/75y",
+        lambda: run_monte_carlo(config, glide_settings),
+        mc_settings.n_paths * (config.accumulation_months + config.retirement_months),
+    ))
+
+    # Idade de morte sorteada por caminho a partir de uma tábua de Gompertz
+    table_ages = np.arange(111)
+    survival = build_survival_curve(table_ages, np.minimum(5e-5 * np.exp(0.095 * table_ages), 1.0), config.current_age)
+    cases.append(Case(
+        "monte_carlo.mortality/10k_paths/75y",
+        lambda: run_monte_carlo(config, mc_settings, survival),
+        mc_settings.n_paths * (config.accumulation_months + config.retirement_months),
+    ))
+
+    history = ReturnHistory(
+        dates=tuple(f"{1900 + i // 12}-{i % 12 + 1:02d}" for i in range(1500)),
+        assets=("carteira",),
+        returns=np.random.default_rng(1).normal(0.004, 0.04, (1500, 1)),
+    )
+    bt_settings = BacktestSettings(n_bootstrap=1_000, seed=1)
+    n_cohorts = history.n_months - (config.accumulation_months + config.retirement_months) + 1
+    cases.append(Case(
+        "backtest/1500m_history/75y",
+        lambda: run_backtest(config, history, bt_settings),
+        (n_cohorts + bt_settings.n_bootstrap) * (config.accumulation_months + config.retirement_months),
+    ))
+
+    cases.extend(_presentation_cases())
+    return cases
+
+
+def _presentation_cases() -> List[Case]:
+    """Gráficos e exportações; ignorados se Plotly/pandas não estiverem instalados."""
+    try:
+        from retirement_engine.charts import build_income_figure, build_portfolio_figure, income_composition
+        from retirement_engine.exports import export_csv, export_excel
+        from retirement_engine.writers import write_monte_carlo_paths
+    except ImportError as e:
+        print(f"Aviso: casos de apresentação ignorados ({e})", file=sys.stderr)
+        return []
+
+    cases: List[Case] = []
+    for n_sources in (0, 10):
+        for years in (20, 60):
+            result = run_simulation(make_config(20, years, n_sources))
+            points = len(result.ages)
+            selected = list(range(n_sources))
+
+            def income_figure(r=result, sel=selected):
+                return build_income_figure(r, *income_composition(r, sel))
+
+            cases.append(Case(f"figure.portfolio/{n_sources}src/{years}y", lambda r=result: build_portfolio_figure(r), points))
+            cases.append(Case(f"figure.income/{n_sources}src/{years}y", income_figure, points * (n_sources + 1)))
+            cases.append(Case(
+                f"figure.serialize/{n_sources}src/{years}y",
+                lambda f=income_figure: f().to_plotly_json(),
+                points * (n_sources + 1),
+            ))
+
+    for years in (20, 80):
+        result = run_simulation(make_config(20, years))
+        rows = len(result.ages)
+        cases.append(Case(f"export.csv/{years}y", lambda r=result: export_csv(r), rows))
+        cases.append(Case(f"export.excel/{years}y", lambda r=result: export_excel(r), rows))
+
+    config = make_config(35, 40)
+    mc_settings = MonteCarloSettings(n_paths=2_000, seed=1)
+    rows = mc_settings.n_paths * (config.accumulation_months + config.retirement_months + 1)
+    output_dir = Path(tempfile.mkdtemp(prefix="bench-"))
+    for suffix in (".parquet", ".csv.gz"):
+        path = output_dir / f"paths{suffix}"
+        cases.append(Case(
+            f"export.stream_paths{suffix}/2k_paths",
+            lambda p=path: write_monte_carlo_paths(config, mc_settings, p),
+            rows,
+        ))
+    return cases
+
+
+# -----------------------------------------------------------------------------
+# 4. MEDIÇÃO
+# -----------------------------------------------------------------------------
+def measure(case: Case, min_time: float = 0.2, repeat: int = 5) -> Dict[str, float]:
+    """Executa o caso em `repeat` rodadas de duração mínima `min_time` segundos."""
+    case.run()  # aquecimento
+    start = time.perf_counter()
+    case.run()
+    single = max(time.perf_counter() - start, 1e-7)
+    number = max(1, int(min_time / single))
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            case.run()
+        timings.append((time.perf_counter() - start) / number)
+    median = statistics.median(timings)
+    return {
+        "median_s": median,
+        "min_s": min(timings),
+        "max_s": max(timings),
+        "throughput_units_per_s": case.units / median,
+        "units": case.units,
+    }
+
+
+def environment() -> Dict[str, str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "desconhecido"
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+# -----------------------------------------------------------------------------
+# 5. RELATÓRIOS
+# -----------------------------------------------------------------------------
+def _format_time(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds:8.3f} s "
+
+
+def print_report(results: Dict[str, Dict[str, float]]) -> None:
+    width = max(len(name) for name in results)
+    print(f"{'caso':<{width}}  {'mediana':>11}  {'mínimo':>11}  {'vazão (un/s)':>14}")
+    for name, stats in results.items():
+        print(
+            f"{name:<{width}}  {_format_time(stats['median_s'])}  {_format_time(stats['min_s'])}  "
+            f"{stats['throughput_units_per_s']:14,.0f}"
+        )
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Imprime a comparação com o baseline e devolve os casos que regrediram."""
+    width = max(len(name) for name in results)
+    regressions = []
+    print(f"{'caso':<{width}}  {'baseline':>11}  {'atual':>11}  {'variação':>9}")
+    for name, stats in results.items():
+        if name not in baseline:
+            print(f"{name:<{width}}  {'—':>11}  {_format_time(stats['median_s'])}  {'novo':>9}")
+            continue
+        before = baseline[name]["median_s"]
+        change = stats["median_s"] / before - 1
+        flag = ""
+        if change > threshold:
+            flag = "  ⚠️ regressão"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  ✅ melhoria"
+        print(f"{name:<{width}}  {_format_time(before)}  {_format_time(stats['median_s'])}  {change:+8.1%}{flag}")
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do simulador de aposentadoria.")
+    parser.add_argument("--filter", "-k", default="", help="Executa apenas casos cujo nome contém este texto")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Duração mínima de cada rodada (s)")
+    parser.add_argument("--repeat", type=int, default=5, help="Número de rodadas por caso")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, type=Path, help="Grava os resultados como baseline")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, type=Path, help="Compara com um baseline gravado")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Variação relativa considerada regressão (padrão: 10%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Sai com código 1 se houver regressão")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for case in build_cases():
+        if args.filter in case.name:
+            results[case.name] = measure(case, args.min_time, args.repeat)
+    if not results:
+        print("Nenhum caso corresponde ao filtro.", file=sys.stderr)
+        return 1
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            stored = json.load(f)
+        print(f"Baseline: commit {stored['environment']['commit']} ({stored['environment']['timestamp']})")
+        regressions = compare(results, stored["results"], args.threshold)
+        if regressions and args.fail_on_regression:
+            return 1
+    else:
+        print_report(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2, ensure_ascii=False)
+        print(f"Baseline gravado em {args.save_baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
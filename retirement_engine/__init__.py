@@ -0,0 +1,99 @@
+"""Motor de simulação do Simulador Avançado de Aposentadoria.
+
+Pode ser importado sem Streamlit::
+
+    from retirement_engine import SimulationConfig, run_simulation
+
+    config = SimulationConfig.from_dict(json.load(open("example_config.json")))
+    result = run_simulation(config)
+"""
+
+from .cache import LRUCache, SharedCache, estimate_nbytes
+from .core import (
+    BALANCE_NOISE_TOLERANCE,
+    ENGINE_VERSION,
+    METHOD_AUTO,
+    METHOD_CLOSED_FORM,
+    METHOD_LOOP,
+    MODE_CUSTOM,
+    MODE_STRATEGY,
+    RESULT_COLUMNS,
+    STRATEGY_DRAWDOWN,
+    STRATEGY_PERPETUAL,
+    IncomeSource,
+    ResultColumns,
+    RetirementPath,
+    SimulationConfig,
+    SimulationResult,
+    assemble_result,
+    build_income_matrix,
+    config_hash,
+    fingerprint,
+    first_negative_index,
+    geometric_path,
+    income_at_retirement,
+    linear_recurrence,
+    monthly_rate_from_annual,
+    retirement_income_schedule,
+    run_simulation,
+    simulate_accumulation,
+    simulate_retirement,
+    simulation_timeline,
+    source_income_at,
+    strategy_withdrawal,
+    withdrawal_policy,
+)
+from .monte_carlo import (
+    MonteCarloResult,
+    MonteCarloSettings,
+    draw_monthly_returns,
+    run_monte_carlo,
+    simulate_paths,
+    summarize_paths,
+    verify_monte_carlo,
+)
+
+__all__ = [
+    "BALANCE_NOISE_TOLERANCE",
+    "ENGINE_VERSION",
+    "METHOD_AUTO",
+    "METHOD_CLOSED_FORM",
+    "METHOD_LOOP",
+    "MODE_CUSTOM",
+    "MODE_STRATEGY",
+    "RESULT_COLUMNS",
+    "STRATEGY_DRAWDOWN",
+    "STRATEGY_PERPETUAL",
+    "IncomeSource",
+    "LRUCache",
+    "MonteCarloResult",
+    "MonteCarloSettings",
+    "ResultColumns",
+    "RetirementPath",
+    "SharedCache",
+    "SimulationConfig",
+    "SimulationResult",
+    "assemble_result",
+    "build_income_matrix",
+    "config_hash",
+    "draw_monthly_returns",
+    "estimate_nbytes",
+    "fingerprint",
+    "first_negative_index",
+    "geometric_path",
+    "income_at_retirement",
+    "linear_recurrence",
+    "monthly_rate_from_annual",
+    "retirement_income_schedule",
+    "run_monte_carlo",
+    "run_simulation",
+    "simulate_accumulation",
+    "simulate_paths",
+    "simulate_retirement",
+    "simulation_timeline",
+    "source_income_at",
+    "strategy_withdrawal",
+    "summarize_paths",
+    "verify_monte_carlo",
+    "withdrawal_policy",
+]
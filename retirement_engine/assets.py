@@ -0,0 +1,234 @@
+# =============================================================================
+# CARTEIRA COM VÁRIAS CLASSES DE ATIVOS
+# =============================================================================
+# Descrição: Classes de ativos com retorno esperado e volatilidade próprios,
+#            uma matriz de correlação entre elas e uma trajetória de alocação
+#            (glide path) que muda os pesos ao longo da vida, por exemplo de
+#            ações para renda fixa à medida que a aposentadoria se aproxima.
+#            Os choques correlacionados são sorteados com o fator de Cholesky
+#            da correlação e combinados pelos pesos de cada mês, em operações
+#            sobre blocos (meses × caminhos × ativos) de tamanho limitado.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import functools
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# 2. CONSTANTES
+# -----------------------------------------------------------------------------
+# Caminhos sorteados por bloco: o bloco temporário tem meses × caminhos × ativos
+# valores (256 caminhos de 75 anos com 2 ativos ocupam ~3,7 MB). Blocos que
+# cabem no cache do processador são mais rápidos que blocos grandes.
+DEFAULT_CHUNK_PATHS = 256
+# Tolerância na checagem de simetria e da diagonal da matriz de correlação
+CORRELATION_TOLERANCE = 1e-9
+
+
+# -----------------------------------------------------------------------------
+# 3. PARÂMETROS
+# -----------------------------------------------------------------------------
+@dataclass(frozen=True)
+class AssetClass:
+    """Classe de ativos com retorno real esperado e volatilidade anuais, em %."""
+
+    name: str
+    expected_return: float
+    volatility: float
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AssetClass":
+        return cls(
+            name=str(data["name"]),
+            expected_return=float(data["expected_return"]),
+            volatility=float(data["volatility"]),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "expected_return": self.expected_return, "volatility": self.volatility}
+
+
+@dataclass(frozen=True)
+class GlidePath:
+    """Alocação (pesos por ativo) em algumas idades, interpolada linearmente entre elas.
+
+    Antes da primeira idade vale a primeira alocação e depois da última, a
+    última. Os pesos de cada idade são normalizados para somar 1; a carteira
+    é rebalanceada todo mês.
+    """
+
+    ages: Tuple[float, ...]
+    weights: Tuple[Tuple[float, ...], ...]
+
+    def validate(self, n_assets: int) -> None:
+        if not self.ages or len(self.ages) != len(self.weights):
+            raise ValueError("A trajetória de alocação precisa de um conjunto de pesos por idade.")
+        if any(b <= a for a, b in zip(self.ages, self.ages[1:])):
+            raise ValueError("As idades da trajetória de alocação devem ser crescentes.")
+        for row in self.weights:
+            if len(row) != n_assets:
+                raise ValueError("Cada alocação deve ter um peso por classe de ativos.")
+            if min(row) < 0 or sum(row) <= 0:
+                raise ValueError("Os pesos da alocação devem ser não negativos, com soma positiva.")
+
+    def weights_at(self, ages: Any) -> np.ndarray:
+        """Pesos normalizados em cada idade de `ages`, em formato (idades × ativos)."""
+        weights = np.asarray(self.weights, dtype=float)
+        weights = weights / weights.sum(axis=1, keepdims=True)
+        ages = np.asarray(ages, dtype=float)
+        return np.column_stack([np.interp(ages, self.ages, weights[:, a]) for a in range(weights.shape[1])])
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GlidePath":
+        return cls(
+            ages=tuple(float(age) for age in data["ages"]),
+            weights=tuple(tuple(float(w) for w in row) for row in data["weights"]),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"ages": list(self.ages), "weights": [list(row) for row in self.weights]}
+
+
+@dataclass(frozen=True)
+class AssetModel:
+    """Classes de ativos, correlação entre os seus retornos e trajetória de alocação.
+
+    Na simulação de Monte Carlo, substitui as taxas e volatilidades das duas
+    fases: o retorno de cada mês é a média dos retornos dos ativos ponderada
+    pela alocação da idade no início do mês.
+    """
+
+    assets: Tuple[AssetClass, ...]
+    correlation: Tuple[Tuple[float, ...], ...]
+    glide_path: GlidePath
+
+    @property
+    def n_assets(self) -> int:
+        return len(self.assets)
+
+    def validate(self) -> None:
+        n = self.n_assets
+        if not n:
+            raise ValueError("Informe pelo menos uma classe de ativos.")
+        if any(asset.volatility < 0 or asset.expected_return <= -100 for asset in self.assets):
+            raise ValueError("As volatilidades devem ser não negativas e os retornos maiores que -100%.")
+        correlation = np.asarray(self.correlation, dtype=float)
+        if correlation.shape != (n, n):
+            raise ValueError("A matriz de correlação deve ter uma linha e uma coluna por classe de ativos.")
+        if (
+            not np.allclose(correlation, correlation.T, atol=CORRELATION_TOLERANCE)
+            or not np.allclose(np.diag(correlation), 1.0, atol=CORRELATION_TOLERANCE)
+            or np.abs(correlation).max() > 1 + CORRELATION_TOLERANCE
+        ):
+            raise ValueError("A matriz de correlação deve ser simétrica, com 1 na diagonal e valores entre -1 e 1.")
+        cholesky_factor(self.correlation)
+        self.glide_path.validate(n)
+
+    def monthly_parameters(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Média e desvio-padrão mensais do log-retorno de cada ativo.
+
+        Mesma parametrização de `draw_monthly_returns`: o retorno bruto
+        esperado de cada mês é a taxa mensal equivalente ao retorno anual.
+        """
+        sigma = np.array([asset.volatility for asset in self.assets]) / 100 / math.sqrt(12)
+        mu = np.log(1 + np.array([asset.expected_return for asset in self.assets]) / 100) / 12 - sigma ** 2 / 2
+        return mu, sigma
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AssetModel":
+        return cls(
+            assets=tuple(AssetClass.from_dict(asset) for asset in data["assets"]),
+            correlation=tuple(tuple(float(c) for c in row) for row in data["correlation"]),
+            glide_path=GlidePath.from_dict(data["glide_path"]),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "assets": [asset.to_dict() for asset in self.assets],
+            "correlation": [list(row) for row in self.correlation],
+            "glide_path": self.glide_path.to_dict(),
+        }
+
+
+@functools.lru_cache(maxsize=32)
+def cholesky_factor(correlation: Tuple[Tuple[float, ...], ...]) -> np.ndarray:
+    """Fator triangular inferior ``L`` com ``L @ L.T == correlation``, calculado uma vez por matriz."""
+    try:
+        factor = np.linalg.cholesky(np.asarray(correlation, dtype=float))
+    except np.linalg.LinAlgError:
+        raise ValueError("A matriz de correlação deve ser positiva definida.") from None
+    factor.setflags(write=False)
+    return factor
+
+
+# -----------------------------------------------------------------------------
+# 4. GERAÇÃO DE RETORNOS
+# -----------------------------------------------------------------------------
+def draw_portfolio_returns(
+    model: AssetModel,
+    weights: np.ndarray,
+    n_paths: int,
+    rng: np.random.Generator,
+    chunk_paths: Optional[int] = None,
+) -> np.ndarray:
+    """Sorteia retornos mensais da carteira com formato (caminhos × meses).
+
+    `weights` traz a alocação de cada mês (meses × ativos). Para cada bloco
+    de até `chunk_paths` caminhos, os choques normais (meses × caminhos ×
+    ativos) são correlacionados por uma multiplicação pelo fator de
+    Cholesky, convertidos em retornos log-normais de cada ativo e reduzidos
+    pela alocação a um retorno por mês e caminho; só o bloco corrente fica
+    na memória além do resultado. Como em `draw_monthly_returns`, a matriz é
+    preenchida em ordem mês-a-mês e devolvida transposta.
+    """
+    weights = np.asarray(weights, dtype=float)
+    months = weights.shape[0]
+    factor_t = cholesky_factor(model.correlation).T
+    mu, sigma = model.monthly_parameters()
+    chunk_paths = chunk_paths or DEFAULT_CHUNK_PATHS
+    returns = np.empty((months, n_paths))
+    for start in range(0, n_paths, chunk_paths):
+        stop = min(start + chunk_paths, n_paths)
+        shocks = rng.standard_normal((months, stop - start, model.n_assets))
+        shocks = shocks @ factor_t
+        shocks *= sigma
+        shocks += mu
+        np.expm1(shocks, out=shocks)
+        # (meses × caminhos × ativos) @ (meses × ativos × 1): um produto por mês
+        np.matmul(shocks, weights[:, :, None], out=returns[:, start:stop, None])
+    return returns.T
+
+
+def month_start_ages(current_age: float, retirement_age: float, acc_months: int, ret_months: int) -> np.ndarray:
+    """Idade no início de cada mês simulado (acumulação seguida da aposentadoria)."""
+    return np.concatenate([
+        current_age + np.arange(acc_months) / 12,
+        retirement_age + np.arange(ret_months) / 12,
+    ])
+
+
+def default_asset_model(
+    current_age: float,
+    retirement_age: float,
+    life_expectancy: float,
+    allocation: Sequence[float] = (80.0, 50.0, 30.0),
+) -> AssetModel:
+    """Carteira de ações e renda fixa que reduz a parcela em ações até a aposentadoria.
+
+    `allocation` é o percentual em ações hoje, na aposentadoria e no fim da
+    expectativa de vida.
+    """
+    return AssetModel(
+        assets=(AssetClass("Ações", 6.0, 18.0), AssetClass("Renda Fixa", 3.0, 6.0)),
+        correlation=((1.0, 0.2), (0.2, 1.0)),
+        glide_path=GlidePath(
+            ages=(current_age, retirement_age, life_expectancy),
+            weights=tuple((share, 100.0 - share) for share in allocation),
+        ),
+    )
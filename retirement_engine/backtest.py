@@ -0,0 +1,281 @@
+# =============================================================================
+# BACKTEST HISTÓRICO
+# =============================================================================
+# Descrição: Avalia o plano contra sequências reais de retornos. Cada mês do
+#            histórico em que uma simulação completa cabe é uma coorte; um
+#            bootstrap por blocos gera sequências adicionais preservando a
+#            autocorrelação de curto prazo. Coortes e amostras são avançadas
+#            juntas pela mesma recursão vetorizada do Monte Carlo.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import csv
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .core import SimulationConfig, simulation_timeline
+from .monte_carlo import MonteCarloResult, MonteCarloSettings, simulate_paths, summarize_paths
+
+# -----------------------------------------------------------------------------
+# 2. HISTÓRICO DE RETORNOS
+# -----------------------------------------------------------------------------
+CACHE_SUFFIX = ".npy"
+META_SUFFIX = ".meta.json"
+
+
+@dataclass
+class ReturnHistory:
+    """Retornos reais mensais, em fração (``0.004`` = 0,4%), com formato (meses × ativos).
+
+    `returns` normalmente é um ``np.memmap`` somente leitura: colunas e janelas
+    são lidas do disco sob demanda, sem copiar o histórico inteiro.
+    """
+
+    dates: Tuple[str, ...]
+    assets: Tuple[str, ...]
+    returns: np.ndarray
+    fingerprint: str = ""
+
+    @property
+    def n_months(self) -> int:
+        return self.returns.shape[0]
+
+    def portfolio_returns(self, weights: Optional[Sequence[float]] = None) -> np.ndarray:
+        """Retorno mensal da carteira; sem pesos, usa a primeira coluna (sem cópia)."""
+        if weights is None:
+            return self.returns[:, 0]
+        weights = np.asarray(weights, dtype=float)
+        if weights.shape != (len(self.assets),):
+            raise ValueError(f"Informe um peso para cada ativo: {', '.join(self.assets)}.")
+        return self.returns @ (weights / weights.sum())
+
+
+def _file_fingerprint(path: Path) -> str:
+    stat = path.stat()
+    return f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _parse_csv(path: Path) -> Tuple[Tuple[str, ...], Tuple[str, ...], np.ndarray]:
+    """Lê um CSV com a data (ex.: ``1928-01``) na primeira coluna e um ativo por coluna."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        if len(header) < 2:
+            raise ValueError("O CSV de retornos precisa de uma coluna de data e ao menos um ativo.")
+        dates = []
+        rows = []
+        for line_number, row in enumerate(reader, start=2):
+            if not row:
+                continue
+            try:
+                rows.append([float(value) for value in row[1:]])
+            except ValueError:
+                raise ValueError(f"Valor não numérico na linha {line_number} de {path.name}.") from None
+            dates.append(row[0])
+    returns = np.asarray(rows, dtype=float).reshape(len(rows), len(header) - 1)
+    if not np.all(np.isfinite(returns)):
+        raise ValueError(f"{path.name} contém retornos ausentes ou inválidos.")
+    return tuple(dates), tuple(header[1:]), returns
+
+
+def load_return_history(path: Union[str, Path]) -> ReturnHistory:
+    """Carrega o histórico mapeado em memória.
+
+    Na primeira leitura o CSV é convertido para um ``.npy`` ao lado do
+    arquivo (e um ``.meta.json`` com datas e ativos); as leituras seguintes
+    apenas mapeiam o ``.npy``. A conversão é refeita se o CSV for alterado.
+    Sem permissão de escrita no diretório, o histórico é lido na memória.
+    """
+    path = Path(path)
+    fingerprint = _file_fingerprint(path)
+    cache_path = path.with_name(path.name + CACHE_SUFFIX)
+    meta_path = path.with_name(path.name + META_SUFFIX)
+
+    if meta_path.exists() and cache_path.exists():
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("fingerprint") == fingerprint:
+            returns = np.load(cache_path, mmap_mode="r")
+            return ReturnHistory(tuple(meta["dates"]), tuple(meta["assets"]), returns, fingerprint)
+
+    dates, assets, returns = _parse_csv(path)
+    try:
+        # Escrita atômica: outra sessão pode estar lendo o cache ao mesmo tempo.
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, returns)
+        os.replace(tmp_path, cache_path)
+        tmp_meta = meta_path.with_name(meta_path.name + ".tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint, "dates": dates, "assets": assets}, f)
+        os.replace(tmp_meta, meta_path)
+    except OSError:
+        return ReturnHistory(dates, assets, returns, fingerprint)
+    return ReturnHistory(dates, assets, np.load(cache_path, mmap_mode="r"), fingerprint)
+
+
+# -----------------------------------------------------------------------------
+# 3. SEQUÊNCIAS DE RETORNOS
+# -----------------------------------------------------------------------------
+def rolling_cohorts(returns: np.ndarray, months: int) -> np.ndarray:
+    """Todas as janelas de `months` meses consecutivos, (coortes × meses), sem cópia."""
+    if months > len(returns):
+        return np.empty((0, months))
+    return sliding_window_view(returns, months)
+
+
+def block_bootstrap(
+    returns: np.ndarray,
+    months: int,
+    n_samples: int,
+    block_months: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Sequências (amostras × meses) formadas por blocos contíguos sorteados.
+
+    Os blocos são circulares (o fim do histórico continua no início), o que
+    dá a todos os meses a mesma chance de aparecer.
+    """
+    n = len(returns)
+    n_blocks = -(-months // block_months)
+    starts = rng.integers(0, n, size=(n_samples, n_blocks, 1))
+    index = (starts + np.arange(block_months)) % n
+    return np.asarray(returns)[index.reshape(n_samples, n_blocks * block_months)[:, :months]]
+
+
+# -----------------------------------------------------------------------------
+# 4. PARÂMETROS E RESULTADOS
+# -----------------------------------------------------------------------------
+@dataclass(frozen=True)
+class BacktestSettings:
+    """Parâmetros do backtest.
+
+    `weights` combina as colunas do histórico em uma carteira (``None`` usa
+    a primeira coluna). Os retornos substituem as taxas reais das duas fases.
+    """
+
+    weights: Optional[Tuple[float, ...]] = None
+    n_bootstrap: int = 1_000
+    block_months: int = 12
+    seed: Optional[int] = None
+
+    def validate(self) -> None:
+        if self.n_bootstrap < 0:
+            raise ValueError("O número de amostras do bootstrap não pode ser negativo.")
+        if self.block_months < 1:
+            raise ValueError("Os blocos do bootstrap devem ter pelo menos um mês.")
+        if self.weights is not None and (min(self.weights, default=0) < 0 or sum(self.weights) <= 0):
+            raise ValueError("Os pesos da carteira devem ser não negativos, com soma positiva.")
+
+
+@dataclass
+class CohortPath:
+    """Trajetória do patrimônio de uma coorte histórica."""
+
+    start: str
+    portfolio: np.ndarray
+    depletion_age: float
+
+
+@dataclass
+class BacktestResult:
+    """Coortes históricas e distribuição das amostras do bootstrap.
+
+    `worst`, `median` e `best` ordenam as coortes pelo tempo até o
+    esgotamento e, entre as que não se esgotam, pelo saldo final; são
+    ``None`` quando o histórico é mais curto que a simulação.
+    """
+
+    ages: np.ndarray
+    cohort_starts: Tuple[str, ...]
+    cohort_depletion_ages: np.ndarray
+    cohort_final_balances: np.ndarray
+    worst: Optional[CohortPath]
+    median: Optional[CohortPath]
+    best: Optional[CohortPath]
+    bootstrap: Optional[MonteCarloResult]
+    settings: BacktestSettings = field(repr=False, default_factory=BacktestSettings)
+
+    @property
+    def n_cohorts(self) -> int:
+        return len(self.cohort_starts)
+
+    @property
+    def cohort_success_rate(self) -> float:
+        """Fração das coortes históricas em que o patrimônio não se esgota."""
+        if not self.n_cohorts:
+            return float("nan")
+        return float(np.mean(np.isnan(self.cohort_depletion_ages)))
+
+
+# -----------------------------------------------------------------------------
+# 5. ORQUESTRAÇÃO
+# -----------------------------------------------------------------------------
+def run_backtest(
+    config: SimulationConfig,
+    history: ReturnHistory,
+    settings: BacktestSettings = BacktestSettings(),
+) -> BacktestResult:
+    """Simula todas as coortes e amostras do bootstrap em um único lote."""
+    config.validate()
+    settings.validate()
+    acc_months = config.accumulation_months
+    total_months = acc_months + config.retirement_months
+    returns = history.portfolio_returns(settings.weights)
+
+    cohorts = rolling_cohorts(returns, total_months)
+    n_cohorts = len(cohorts)
+    rng = np.random.default_rng(settings.seed)
+    samples = block_bootstrap(returns, total_months, settings.n_bootstrap, settings.block_months, rng)
+    if n_cohorts + len(samples) == 0:
+        raise ValueError("Nenhuma sequência para simular: aumente o histórico ou o número de amostras.")
+
+    sequences = np.concatenate([cohorts, samples]) if n_cohorts else samples
+    balances, depletion_month = simulate_paths(config, sequences[:, :acc_months], sequences[:, acc_months:])
+
+    ages = simulation_timeline(config)
+    cohort_depletion = depletion_month[:n_cohorts]
+    cohort_final = balances[-1, :n_cohorts].copy()
+    cohort_depletion_ages = np.where(
+        cohort_depletion >= 0, config.retirement_age + cohort_depletion / 12, np.nan
+    )
+    cohort_starts = tuple(history.dates[:n_cohorts])
+
+    worst = median = best = None
+    if n_cohorts:
+        months_survived = np.where(cohort_depletion >= 0, cohort_depletion, config.retirement_months + 1)
+        order = np.lexsort((cohort_final, months_survived))
+
+        def cohort_path(i: int) -> CohortPath:
+            return CohortPath(cohort_starts[i], balances[:, i].copy(), float(cohort_depletion_ages[i]))
+
+        worst, median, best = (cohort_path(order[k]) for k in (0, n_cohorts // 2, -1))
+
+    bootstrap = None
+    if len(samples):
+        bootstrap = summarize_paths(
+            config,
+            balances[:, n_cohorts:],
+            depletion_month[n_cohorts:],
+            MonteCarloSettings(n_paths=len(samples), seed=settings.seed),
+        )
+
+    return BacktestResult(
+        ages=ages,
+        cohort_starts=cohort_starts,
+        cohort_depletion_ages=cohort_depletion_ages,
+        cohort_final_balances=cohort_final,
+        worst=worst,
+        median=median,
+        best=best,
+        bootstrap=bootstrap,
+        settings=settings,
+    )
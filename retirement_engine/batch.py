@@ -0,0 +1,482 @@
+# =============================================================================
+# EXECUÇÃO EM LOTE
+# =============================================================================
+# Descrição: Linha de comando que simula muitas configurações (no mesmo
+#            formato do JSON exportado pela interface) em paralelo, gravando
+#            uma tabela consolidada e as séries mensais de cada cliente.
+#
+# Uso:
+#   python -m retirement_engine.batch configs/ --output resultados/
+#   python -m retirement_engine.batch clientes.jsonl --output resultados/ --workers 8
+#   python -m retirement_engine.batch clientes.jsonl --output resultados/ --store resultados.db
+#   python -m retirement_engine.batch clientes.jsonl --output resultados/ --monte-carlo-paths parquet
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import argparse
+import csv
+import datetime
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+from itertools import count, islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from .core import MODE_STRATEGY, ResultColumns, SimulationConfig, config_hash, run_simulation
+from .store import ResultStore
+
+# -----------------------------------------------------------------------------
+# 2. CONSTANTES
+# -----------------------------------------------------------------------------
+SUMMARY_FILE_NAME = "summary.csv"
+SERIES_DIR_NAME = "series"
+# "files": um Parquet por configuração; demais: um único arquivo por execução
+SERIES_FORMATS = ("files", "parquet", "csv", "csv.gz", "xlsx")
+# Caminhos de Monte Carlo: um arquivo por configuração com o bloco ``monte_carlo``
+MONTE_CARLO_DIR_NAME = "monte-carlo"
+MONTE_CARLO_FORMATS = ("parquet", "csv", "csv.gz", "xlsx")
+SUMMARY_COLUMNS = [
+    "config_id",
+    "config_hash",
+    "portfolio_at_retirement",
+    "recommended_total_spending",
+    "depletion_age",
+    "final_balance",
+    "error",
+]
+
+# Identificador e dados da configuração (ou o erro de leitura)
+ConfigItem = Tuple[str, Union[Dict[str, Any], ValueError]]
+SeriesItem = Tuple[str, ResultColumns]
+
+# -----------------------------------------------------------------------------
+# 3. LEITURA DAS CONFIGURAÇÕES
+# -----------------------------------------------------------------------------
+def iter_configs(source: Path) -> Iterator[ConfigItem]:
+    """Percorre as configurações de um diretório de JSONs ou de um arquivo JSONL.
+
+    O identificador de cada configuração é o nome do arquivo (sem extensão)
+    ou, no JSONL, o campo ``config_id``/``client_id`` quando existir, senão o
+    número da linha. Um arquivo ou linha ilegível não interrompe a leitura:
+    no lugar dos dados vem o erro (`ValueError`), registrado na coluna
+    ``error`` da tabela consolidada como os erros de validação.
+    """
+    if source.is_dir():
+        for path in sorted(source.glob("*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+                data = ValueError(f"JSON inválido: {e}")
+            yield path.stem, data
+        return
+    with open(source, encoding="utf-8", errors="replace") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            config_id = f"linha-{line_number:06d}"
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield config_id, ValueError(f"JSON inválido: {e}")
+                continue
+            if isinstance(data, dict):
+                config_id = str(data.get("config_id") or data.get("client_id") or config_id)
+            yield config_id, data
+
+
+def is_completed(row: Dict[str, Optional[str]]) -> bool:
+    """Linha concluída: todas as colunas presentes e sem erro.
+
+    Uma linha cortada (execução interrompida durante a gravação) tem colunas
+    ausentes (``None``) e não conta como concluída.
+    """
+    return all(row.get(column) is not None for column in SUMMARY_COLUMNS) and not row["error"]
+
+
+def completed_ids(summary_path: Path) -> Set[str]:
+    """Identificadores concluídos sem erro na tabela consolidada (para retomar execuções)."""
+    if not summary_path.exists():
+        return set()
+    with open(summary_path, newline="", encoding="utf-8") as f:
+        return {row["config_id"] for row in csv.DictReader(f) if is_completed(row)}
+
+
+def resume_summary(summary_path: Path) -> Set[str]:
+    """Prepara a tabela consolidada para retomar uma execução e devolve os concluídos.
+
+    As linhas com erro ou incompletas são removidas (a tabela é regravada de
+    forma atômica), de modo que essas configurações sejam simuladas de novo
+    e cada identificador tenha uma única linha ao final.
+    """
+    if not summary_path.exists():
+        return set()
+    done: Set[str] = set()
+    kept = []
+    with open(summary_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        if is_completed(row) and row["config_id"] not in done:
+            done.add(row["config_id"])
+            kept.append({column: row[column] for column in SUMMARY_COLUMNS})
+    if len(kept) != len(rows):
+        tmp_path = summary_path.with_name(summary_path.name + ".tmp")
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+            writer.writeheader()
+            writer.writerows(kept)
+        os.replace(tmp_path, summary_path)
+    return done
+
+
+# -----------------------------------------------------------------------------
+# 4. PROCESSAMENTO (EXECUTADO NOS PROCESSOS DO POOL)
+# -----------------------------------------------------------------------------
+# Uma conexão por processo e banco, reaproveitada entre os lotes
+_STORES: Dict[Path, ResultStore] = {}
+
+
+def open_store(path: Path) -> ResultStore:
+    store = _STORES.get(path)
+    if store is None:
+        store = _STORES[path] = ResultStore(path)
+    return store
+
+
+def simulate_item(
+    config_id: str,
+    data: Union[Dict[str, Any], ValueError],
+    series_dir: Optional[Path],
+    reference_date: datetime.date,
+    series_dtype: str = "float64",
+    series_out: Optional[List[SeriesItem]] = None,
+    store_path: Optional[Path] = None,
+    monte_carlo_path: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Simula uma configuração e devolve a linha da tabela consolidada.
+
+    As séries mensais são gravadas em `series_dir` ou, se `series_out` for
+    informado, acrescentadas a essa lista para serem gravadas pelo processo
+    principal. Com `store_path`, o resultado é procurado no banco antes de
+    simular e, se calculado, gravado nele com o identificador como cliente
+    (e as etiquetas do campo ``tags``, uma lista ou uma única etiqueta, se houver).
+    Com `monte_carlo_path`, uma configuração com o bloco ``monte_carlo`` tem
+    todos os caminhos gravados nesse arquivo (ver `write_paths_file`).
+
+    Qualquer erro (configuração inválida ou malformada, falha ao gravar as
+    séries) fica na coluna ``error`` da linha, sem interromper o lote.
+    """
+    row: Dict[str, Any] = {column: "" for column in SUMMARY_COLUMNS}
+    row["config_id"] = config_id
+    try:
+        if isinstance(data, ValueError):
+            raise data
+        if not isinstance(data, dict):
+            raise ValueError("A configuração deve ser um objeto JSON.")
+        data = dict(data)
+        data.setdefault("reference_date", str(reference_date))
+        config = SimulationConfig.from_dict(data)
+        if store_path is not None:
+            result, _ = open_store(store_path).get_or_compute(
+                config, lambda: run_simulation(config), client=config_id, tags=data.get("tags") or ()
+            )
+        else:
+            result = run_simulation(config)
+        columns = result.columns.astype(series_dtype) if series_out is not None else None
+        if series_out is None and series_dir is not None:
+            write_series(result, series_dir / f"{safe_file_name(config_id)}.parquet", series_dtype)
+        if monte_carlo_path is not None and data.get("monte_carlo") is not None:
+            write_paths_file(config, data["monte_carlo"], monte_carlo_path)
+    except Exception as e:
+        row["error"] = str(e) or type(e).__name__
+        return row
+
+    row["config_hash"] = config_hash(config)
+    row["portfolio_at_retirement"] = result.portfolio_at_retirement
+    if config.strategy_mode == MODE_STRATEGY:
+        row["recommended_total_spending"] = result.recommended_total_spending
+    if result.depleted:
+        row["depletion_age"] = result.depletion_age
+    row["final_balance"] = result.final_balance
+    if columns is not None:
+        series_out.append((config_id, columns))
+    return row
+
+
+def simulate_chunk(
+    items: Sequence[ConfigItem],
+    series_dir: Optional[Path],
+    reference_date: datetime.date,
+    series_dtype: str = "float64",
+    collect_series: bool = False,
+    store_path: Optional[Path] = None,
+    monte_carlo_dir: Optional[Path] = None,
+    monte_carlo_format: str = "parquet",
+) -> Tuple[List[Dict[str, Any]], List[SeriesItem]]:
+    series: List[SeriesItem] = []
+    series_out = series if collect_series else None
+    rows = []
+    for config_id, data in items:
+        monte_carlo_path = None
+        if monte_carlo_dir is not None:
+            monte_carlo_path = monte_carlo_dir / f"{safe_file_name(config_id)}.{monte_carlo_format}"
+        rows.append(
+            simulate_item(
+                config_id, data, series_dir, reference_date, series_dtype, series_out, store_path, monte_carlo_path
+            )
+        )
+    return rows, series
+
+
+def write_series(result, path: Path, dtype: str = "float64") -> None:
+    """Grava as séries mensais em Parquet de forma atômica (arquivo temporário + rename)."""
+    from .exports import results_frame
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    results_frame(result, dtype).to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def write_paths_file(config: SimulationConfig, monte_carlo: Any, path: Path) -> None:
+    """Grava todos os caminhos de Monte Carlo da configuração, um por linha e mês.
+
+    `monte_carlo` é o bloco do JSON exportado (semente incluída, para
+    reproduzir os mesmos caminhos). A gravação é em fluxo
+    (`write_monte_carlo_paths`) em um arquivo oculto, renomeado só no fim.
+    """
+    from .monte_carlo import MonteCarloSettings
+    from .writers import write_monte_carlo_paths
+
+    if not isinstance(monte_carlo, dict):
+        raise ValueError("`monte_carlo` deve ser um objeto JSON.")
+    tmp_path = path.with_name("." + path.name)
+    write_monte_carlo_paths(config, MonteCarloSettings.from_dict(monte_carlo), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def safe_file_name(config_id: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in config_id)
+
+
+def series_run_dir(output_dir: Path) -> Path:
+    """Próximo diretório ``series-NNN`` livre (cada execução grava as suas partes)."""
+    run = 1
+    while (output_dir / f"{SERIES_DIR_NAME}-{run:03d}").exists():
+        run += 1
+    return output_dir / f"{SERIES_DIR_NAME}-{run:03d}"
+
+
+def write_series_part(series: Sequence[SeriesItem], path: Path) -> None:
+    """Grava as séries de um lote em um arquivo próprio, já fechado ao ser renomeado.
+
+    O arquivo temporário começa com ``.``, que os leitores de diretórios
+    Parquet ignoram; só o ``os.replace`` final torna a parte visível.
+    """
+    from .exports import COLUMN_LABELS
+    from .writers import open_table_writer
+
+    path.parent.mkdir(exist_ok=True)
+    tmp_path = path.with_name("." + path.name)
+    with open_table_writer(tmp_path, ["config_id", *COLUMN_LABELS.values()]) as writer:
+        writer.write(series_chunk(series))
+    os.replace(tmp_path, path)
+
+
+def series_chunk(series: Sequence[SeriesItem]) -> Dict[str, np.ndarray]:
+    """Concatena as séries de várias configurações em um bloco com a coluna ``config_id``."""
+    from .exports import COLUMN_LABELS
+
+    lengths = [len(columns) for _, columns in series]
+    chunk = {"config_id": np.repeat(np.array([config_id for config_id, _ in series], dtype=object), lengths)}
+    for name, label in COLUMN_LABELS.items():
+        chunk[label] = np.concatenate([columns[name] for _, columns in series])
+    return chunk
+
+
+# -----------------------------------------------------------------------------
+# 5. ORQUESTRAÇÃO
+# -----------------------------------------------------------------------------
+def chunked(items: Iterable[ConfigItem], size: int) -> Iterator[List[ConfigItem]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(
+    source: Path,
+    output_dir: Path,
+    workers: Optional[int] = None,
+    chunk_size: int = 64,
+    write_series_files: bool = True,
+    reference_date: Optional[datetime.date] = None,
+    series_dtype: str = "float64",
+    series_format: str = "files",
+    store_path: Optional[Path] = None,
+    monte_carlo_format: Optional[str] = None,
+) -> Dict[str, int]:
+    """Simula todas as configurações de `source` e grava os resultados em `output_dir`.
+
+    Configurações já concluídas em ``summary.csv`` são ignoradas, de modo que
+    uma execução interrompida pode ser retomada com o mesmo comando; as que
+    terminaram com erro saem da tabela e são simuladas de novo. As linhas só
+    são gravadas depois que as séries correspondentes estão no disco.
+    Com ``series_dtype="float32"`` as séries ocupam metade do espaço; a
+    tabela consolidada continua em precisão dupla.
+
+    Com `series_format` diferente de ``"files"``, os workers devolvem as
+    séries e o processo principal grava as de cada lote em uma parte
+    ``series-NNN/part-KKKKK.<formato>``, fechada antes que as linhas do lote
+    entrem na tabela consolidada (Parquet e Excel só ficam legíveis depois de
+    fechados); a memória fica limitada pelos lotes em andamento. O diretório
+    de uma execução Parquet pode ser lido de uma vez com
+    ``pandas.read_parquet``.
+
+    Com `store_path`, todos os workers compartilham o banco de resultados
+    (`ResultStore`): configurações já simuladas por outro job, ou pela
+    interface, são lidas em vez de recalculadas.
+
+    Com `monte_carlo_format`, as configurações com o bloco ``monte_carlo``
+    têm todos os caminhos gravados em ``monte-carlo/<config_id>.<formato>``,
+    um caminho-mês por linha; as demais não geram arquivo.
+    """
+    if series_format not in SERIES_FORMATS:
+        raise ValueError(f"Formato de séries inválido: {series_format}")
+    if monte_carlo_format is not None and monte_carlo_format not in MONTE_CARLO_FORMATS:
+        raise ValueError(f"Formato de caminhos de Monte Carlo inválido: {monte_carlo_format}")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stream_series = write_series_files and series_format != "files"
+    series_dir = output_dir / SERIES_DIR_NAME if write_series_files and not stream_series else None
+    if series_dir is not None:
+        series_dir.mkdir(exist_ok=True)
+    monte_carlo_dir = output_dir / MONTE_CARLO_DIR_NAME if monte_carlo_format is not None else None
+    if monte_carlo_dir is not None:
+        monte_carlo_dir.mkdir(exist_ok=True)
+    series_run = series_run_dir(output_dir) if stream_series else None
+    parts = count(1)
+    summary_path = output_dir / SUMMARY_FILE_NAME
+    done = resume_summary(summary_path)
+    reference_date = reference_date or datetime.date.today()
+    workers = workers or os.cpu_count() or 1
+
+    pending = (item for item in iter_configs(source) if item[0] not in done)
+    stats = {"skipped": len(done), "completed": 0, "failed": 0}
+
+    write_header = not summary_path.exists()
+    with ExitStack() as stack:
+        f = stack.enter_context(open(summary_path, "a", newline="", encoding="utf-8"))
+        executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+        if write_header:
+            writer.writeheader()
+
+        def submit(chunk: List[ConfigItem]) -> Future:
+            return executor.submit(
+                simulate_chunk,
+                chunk,
+                series_dir,
+                reference_date,
+                series_dtype,
+                stream_series,
+                store_path,
+                monte_carlo_dir,
+                monte_carlo_format or MONTE_CARLO_FORMATS[0],
+            )
+
+        # Mantém um número limitado de lotes em andamento para não carregar
+        # o arquivo de entrada inteiro na memória.
+        chunks = chunked(pending, chunk_size)
+        in_flight = set()
+        for chunk in islice(chunks, 2 * workers):
+            in_flight.add(submit(chunk))
+        while in_flight:
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                rows, series = future.result()
+                if series:
+                    write_series_part(series, series_run / f"part-{next(parts):05d}.{series_format}")
+                for row in rows:
+                    writer.writerow(row)
+                    stats["failed" if row["error"] else "completed"] += 1
+                f.flush()
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    in_flight.add(submit(next_chunk))
+    return stats
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m retirement_engine.batch",
+        description="Simula configurações de aposentadoria em lote.",
+    )
+    parser.add_argument("input", type=Path, help="Diretório com arquivos .json ou arquivo .jsonl")
+    parser.add_argument("--output", "-o", type=Path, required=True, help="Diretório de saída")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="Número de processos (padrão: núcleos da CPU)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Configurações por tarefa enviada ao pool")
+    parser.add_argument("--no-series", action="store_true", help="Não grava as séries mensais em Parquet")
+    parser.add_argument("--float32", action="store_true", help="Grava as séries mensais em precisão simples")
+    parser.add_argument(
+        "--series-format",
+        choices=SERIES_FORMATS,
+        default="files",
+        help="'files': um Parquet por configuração; demais: todas as séries em um único arquivo gravado em fluxo",
+    )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=None,
+        help="Banco SQLite de resultados compartilhado entre execuções (criado se não existir)",
+    )
+    parser.add_argument(
+        "--monte-carlo-paths",
+        choices=MONTE_CARLO_FORMATS,
+        default=None,
+        metavar="FORMATO",
+        help=(
+            "Grava todos os caminhos de Monte Carlo das configurações com o bloco 'monte_carlo' "
+            f"em {MONTE_CARLO_DIR_NAME}/ ({', '.join(MONTE_CARLO_FORMATS)})"
+        ),
+    )
+    parser.add_argument(
+        "--reference-date",
+        type=datetime.date.fromisoformat,
+        default=None,
+        help="Data usada para calcular a idade atual (AAAA-MM-DD, padrão: hoje)",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.input.exists():
+        parser.error(f"Entrada não encontrada: {args.input}")
+    stats = run_batch(
+        args.input,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        write_series_files=not args.no_series,
+        reference_date=args.reference_date,
+        series_dtype="float32" if args.float32 else "float64",
+        series_format=args.series_format,
+        store_path=args.store,
+        monte_carlo_format=args.monte_carlo_paths,
+    )
+    print(
+        f"Concluídas: {stats['completed']} | Com erro: {stats['failed']} | "
+        f"Já existentes: {stats['skipped']}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+# =============================================================================
+# CACHE DE RESULTADOS
+# =============================================================================
+# Descrição: Cache LRU de tamanho limitado para resultados do motor, indexado
+#            pelo hash canônico da configuração (ver `config_hash`), e uma
+#            versão compartilhada entre as sessões do app (threads do mesmo
+#            processo), limitada pela memória estimada dos valores e com
+#            validade (TTL) opcional.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import dataclasses
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+import numpy as np
+
+# Variáveis de ambiente com o limite de memória (MB) e a validade (s) do cache compartilhado
+SHARED_CACHE_MB_ENV_VAR = "RETIREMENT_SHARED_CACHE_MB"
+SHARED_CACHE_TTL_ENV_VAR = "RETIREMENT_SHARED_CACHE_TTL"
+DEFAULT_SHARED_CACHE_MB = 256
+DEFAULT_SHARED_CACHE_TTL = 3600.0
+
+# -----------------------------------------------------------------------------
+# 2. CACHE LRU
+# -----------------------------------------------------------------------------
+class LRUCache:
+    """Mapeamento com no máximo `maxsize` entradas e descarte LRU.
+
+    Cada acesso bem-sucedido move a entrada para o fim da fila; ao exceder o
+    limite, a entrada usada há mais tempo é removida.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        if maxsize < 1:
+            raise ValueError("maxsize deve ser pelo menos 1.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if key not in self._data:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Devolve o valor em cache ou calcula, armazena e devolve."""
+        if key in self._data:
+            return self.get(key)
+        self.misses += 1
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# -----------------------------------------------------------------------------
+# 3. CACHE COMPARTILHADO ENTRE SESSÕES
+# -----------------------------------------------------------------------------
+def estimate_nbytes(value: Any, _seen: Optional[Set[int]] = None) -> int:
+    """Estimativa da memória ocupada por `value` e pelos objetos que ele referencia.
+
+    Arrays contam pelo tamanho dos dados; uma view conta só a parte do bloco
+    que enxerga, de modo que resultados que dividem um mesmo bloco (como os
+    de `simulate_scenarios`) não contam o bloco inteiro cada um. Gráficos
+    Plotly (e objetos com ``to_plotly_json``) contam pelos dados e pelo layout
+    que descrevem, sem os validadores compartilhados pelo processo.
+    Contêineres, dataclasses e objetos comuns são percorridos recursivamente
+    (cada objeto conta uma vez).
+    """
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        # O tamanho de uma view não inclui os dados, que pertencem ao bloco de origem
+        size = sys.getsizeof(value)
+        return size if value.base is None else size + value.nbytes
+    if isinstance(value, (str, bytes, bytearray, int, float, complex, bool, type(None))):
+        return sys.getsizeof(value)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        return size + sum(estimate_nbytes(k, seen) + estimate_nbytes(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_nbytes(item, seen) for item in value)
+    if callable(getattr(value, "to_plotly_json", None)):
+        return size + estimate_nbytes(value.to_plotly_json(), seen)
+    if dataclasses.is_dataclass(value) and not hasattr(value, "__dict__"):
+        return size + sum(estimate_nbytes(getattr(value, f.name), seen) for f in dataclasses.fields(value))
+    if hasattr(value, "__dict__"):
+        return size + estimate_nbytes(vars(value), seen)
+    return size
+
+
+class SharedCache:
+    """Cache LRU seguro entre threads, limitado pela memória estimada dos valores.
+
+    Pensado para ser um único objeto por processo (no app, criado com
+    ``st.cache_resource``), compartilhado pelas sessões: a mesma configuração
+    aberta por vários usuários é calculada uma vez. As chaves devem
+    identificar todo o conteúdo do valor (hashes canônicos, nunca o estado de
+    uma sessão) e os valores devem ser tratados como somente leitura.
+
+    - `max_bytes`: ao ultrapassar o limite, as entradas usadas há mais tempo
+      são descartadas; um valor maior que o limite inteiro não é guardado.
+    - `ttl`: segundos de validade de cada entrada desde o cálculo (``None``
+      para não expirar).
+    - `get_or_compute`: se outra thread já está calculando a mesma chave,
+      espera o resultado dela em vez de repetir o cálculo.
+
+    Tem a mesma interface de `LRUCache` (``get``, ``put``, ``get_or_compute``,
+    ``hits``, ``misses``), de modo que pode substituí-lo.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_SHARED_CACHE_MB * 1024 * 1024,
+        ttl: Optional[float] = DEFAULT_SHARED_CACHE_TTL,
+        sizeof: Callable[[Any], int] = estimate_nbytes,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_bytes < 1:
+            raise ValueError("max_bytes deve ser pelo menos 1.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl deve ser positivo.")
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._sizeof = sizeof
+        self._clock = clock
+        self._lock = threading.Lock()
+        # chave -> (valor, tamanho estimado, momento em que expira)
+        self._data: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._pending: Dict[Hashable, threading.Event] = {}
+        self._bytes = 0
+
+    @classmethod
+    def from_env(cls, **kwargs: Any) -> "SharedCache":
+        """Cache com o limite e a validade de `SHARED_CACHE_MB_ENV_VAR` e `SHARED_CACHE_TTL_ENV_VAR`.
+
+        Um TTL igual a 0 desativa a expiração.
+        """
+        max_mb = float(os.environ.get(SHARED_CACHE_MB_ENV_VAR) or DEFAULT_SHARED_CACHE_MB)
+        ttl = float(os.environ.get(SHARED_CACHE_TTL_ENV_VAR) or DEFAULT_SHARED_CACHE_TTL)
+        return cls(max_bytes=int(max_mb * 1024 * 1024), ttl=ttl or None, **kwargs)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._lookup(key) is not None
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[Any, int, float]]:
+        """Entrada válida de `key` (removendo-a se expirou); chamada com o lock."""
+        entry = self._data.get(key)
+        if entry is not None and entry[2] <= self._clock():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _remove(self, key: Hashable) -> None:
+        _, nbytes, _ = self._data.pop(key)
+        self._bytes -= nbytes
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        # A estimativa percorre o valor inteiro; é feita fora do lock.
+        nbytes = self._sizeof(value)
+        expires = self._clock() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._expire()
+            if nbytes > self.max_bytes:
+                return
+            self._data[key] = (value, nbytes, expires)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Devolve o valor em cache ou calcula, armazena e devolve.
+
+        O cálculo é feito fora do lock; as outras threads que pedirem a mesma
+        chave enquanto isso esperam por ele (e contam como acerto).
+        """
+        while True:
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    self.hits += 1
+                    self._data.move_to_end(key)
+                    return entry[0]
+                pending = self._pending.get(key)
+                if pending is None:
+                    self.misses += 1
+                    pending = self._pending[key] = threading.Event()
+                    break
+            # Outra thread está calculando: espera e procura de novo (se o
+            # cálculo dela falhar, esta thread tenta calcular).
+            pending.wait()
+        try:
+            value = compute()
+            self.put(key, value)
+            return value
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+
+    def _expire(self) -> int:
+        """Remove as entradas vencidas; chamada com o lock."""
+        if self.ttl is None:
+            return 0
+        now = self._clock()
+        expired = [key for key, (_, _, expires) in self._data.items() if expires <= now]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def expire(self) -> int:
+        """Remove as entradas vencidas e devolve quantas foram removidas (também feito a cada `put`)."""
+        with self._lock:
+            return self._expire()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores e ocupação atuais (para o painel de diagnóstico e o log)."""
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
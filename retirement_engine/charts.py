@@ -0,0 +1,620 @@
+# =============================================================================
+# GRÁFICOS
+# =============================================================================
+# Descrição: Construção das figuras Plotly exibidas pela interface, separada
+#            do Streamlit para que possa ser reutilizada e medida. Acima de um
+#            orçamento de pontos, as barras mensais são agregadas em faixas de
+#            idade e as linhas são reduzidas por LTTB e desenhadas em WebGL,
+#            de modo que o tamanho da figura não cresça com o horizonte.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+
+from .backtest import BacktestResult
+from .core import MODE_CUSTOM, MODE_STRATEGY, SimulationResult
+from .monte_carlo import MonteCarloResult
+from .sweep import SWEEP_PARAMETERS, SweepResult
+
+# -----------------------------------------------------------------------------
+# 2. ESTILO COMUM
+# -----------------------------------------------------------------------------
+SOURCE_COLORS = ['#3498db', '#2ecc71', '#f1c40f', '#9b59b6', '#1abc9c', '#34495e']
+DEFAULT_MARGIN = dict(l=60, r=30, t=80, b=60)
+DEFAULT_POINT_BUDGET = 2000
+DEFAULT_LEGEND = dict(
+    yanchor="top",
+    y=0.99,
+    xanchor="left",
+    x=0.01,
+    bgcolor='rgba(255,255,255,0.8)'
+)
+
+
+def _title(text: str) -> Dict[str, Any]:
+    return {
+        'text': text,
+        'y': 0.95,
+        'x': 0.5,
+        'xanchor': 'center',
+        'yanchor': 'top'
+    }
+
+
+# -----------------------------------------------------------------------------
+# 3. NÍVEL DE DETALHE
+# -----------------------------------------------------------------------------
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Índices escolhidos pelo Largest-Triangle-Three-Buckets.
+
+    Mantém o primeiro e o último ponto e, em cada um dos `n_out - 2` blocos
+    intermediários, o ponto que forma o maior triângulo com o ponto
+    escolhido no bloco anterior e a média do bloco seguinte. Preserva picos
+    e vales que uma amostragem regular perderia.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts
+    mean_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    indices = np.empty(n_out, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[selected] - mean_x[i]) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (mean_y[i] - y[selected])
+        )
+        selected = start + int(np.argmax(area))
+        indices[i + 1] = selected
+    return indices
+
+
+def decimate_line(
+    x: np.ndarray,
+    y: np.ndarray,
+    point_budget: Optional[int] = DEFAULT_POINT_BUDGET,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduz uma linha a no máximo `point_budget` pontos (``None``: sem redução)."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if point_budget is None or len(x) <= point_budget:
+        return x, y
+    index = lttb_indices(x, y, point_budget)
+    return x[index], y[index]
+
+
+def bucket_years_for(n_series: int, ages: np.ndarray, point_budget: Optional[int]) -> int:
+    """Largura (em anos) das faixas de barras para caber no orçamento; 0 mantém a resolução mensal."""
+    if point_budget is None or n_series * len(ages) <= point_budget or len(ages) == 0:
+        return 0
+    span_years = math.floor(ages[-1]) - math.floor(ages[0]) + 1
+    return max(1, math.ceil(n_series * span_years / point_budget))
+
+
+def aggregate_by_age(
+    ages: np.ndarray,
+    values: np.ndarray,
+    bucket_years: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Média mensal de cada série (última dimensão de `values`) por faixa de idade.
+
+    `ages` deve ser não decrescente, como a linha do tempo da simulação.
+    Devolve a idade inicial de cada faixa e as médias, com formato
+    ``values.shape[:-1] + (n_faixas,)``.
+    """
+    keys = np.floor(np.asarray(ages) / bucket_years) * bucket_years
+    first = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    counts = np.diff(np.append(first, len(keys)))
+    sums = np.add.reduceat(np.asarray(values, dtype=float), first, axis=-1)
+    return keys[first], sums / counts
+
+
+def _line_trace(point_budget: Optional[int], **kwargs: Any) -> go.Scatter:
+    """Linha em WebGL (Scattergl) quando o nível de detalhe está ativo."""
+    trace_type = go.Scatter if point_budget is None else go.Scattergl
+    return trace_type(**kwargs)
+
+
+def _bucket_bars(bucket_starts: np.ndarray, bucket_years: int) -> Dict[str, Any]:
+    """Posição, largura e faixa de idade (para o hover) das barras agregadas."""
+    return dict(
+        x=bucket_starts + bucket_years / 2,
+        width=bucket_years,
+        customdata=np.column_stack([bucket_starts, bucket_starts + bucket_years]),
+    )
+
+
+# -----------------------------------------------------------------------------
+# 4. EVOLUÇÃO DO PATRIMÔNIO
+# -----------------------------------------------------------------------------
+def build_portfolio_figure(
+    result: SimulationResult,
+    point_budget: Optional[int] = DEFAULT_POINT_BUDGET,
+    backtest: Optional[BacktestResult] = None,
+) -> go.Figure:
+    """Saldo do portfólio com as fases de acumulação e aposentadoria sombreadas.
+
+    Com `point_budget=None` todas as séries são desenhadas mês a mês. Se
+    `backtest` for informado, as coortes histórica pior, mediana e melhor são
+    sobrepostas à linha determinística.
+    """
+    config = result.config
+    show_withdrawal_bars = config.strategy_mode == MODE_CUSTOM and len(config.income_sources) > 0
+    fig = go.Figure()
+
+    # Área sombreada para fase de acumulação
+    fig.add_vrect(
+        x0=result.current_age,
+        x1=config.retirement_age,
+        fillcolor="rgba(46, 204, 113, 0.1)",
+        layer="below",
+        line_width=0,
+        annotation_text="Fase de Acumulação",
+        annotation_position="top left"
+    )
+
+    # Área sombreada para fase de aposentadoria
+    fig.add_vrect(
+        x0=config.retirement_age,
+        x1=config.life_expectancy,
+        fillcolor="rgba(52, 152, 219, 0.1)",
+        layer="below",
+        line_width=0,
+        annotation_text="Fase de Aposentadoria",
+        annotation_position="top left"
+    )
+
+    # Linha principal do portfólio
+    ages, portfolio = decimate_line(result.ages, result.portfolio, point_budget)
+    fig.add_trace(_line_trace(
+        point_budget,
+        x=ages,
+        y=portfolio,
+        mode='lines',
+        name='Saldo do Portfólio',
+        line=dict(color='#2ecc71', width=3),
+        hovertemplate='Idade: %{x:.1f} anos<br>Saldo: R$ %{y:,.2f}<extra></extra>'
+    ))
+
+    if backtest is not None:
+        cohorts = [
+            (backtest.worst, "Pior Coorte", '#e74c3c'),
+            (backtest.median, "Coorte Mediana", '#7f8c8d'),
+            (backtest.best, "Melhor Coorte", '#27ae60'),
+        ]
+        for cohort, label, color in cohorts:
+            if cohort is None:
+                continue
+            cohort_ages, cohort_portfolio = decimate_line(backtest.ages, cohort.portfolio, point_budget)
+            fig.add_trace(_line_trace(
+                point_budget,
+                x=cohort_ages,
+                y=cohort_portfolio,
+                mode='lines',
+                name=f"{label} (início em {cohort.start})",
+                line=dict(color=color, width=1.5, dash='dot'),
+                hovertemplate=f'Idade: %{{x:.1f}} anos<br>{label}: R$ %{{y:,.2f}}<extra></extra>'
+            ))
+
+    if show_withdrawal_bars:
+        withdrawals = np.nan_to_num(result.withdrawals)
+        bucket_years = bucket_years_for(1, result.ages, point_budget)
+        if bucket_years:
+            bucket_starts, mean_withdrawals = aggregate_by_age(result.ages, withdrawals, bucket_years)
+            fig.add_trace(go.Bar(
+                y=mean_withdrawals,
+                **_bucket_bars(bucket_starts, bucket_years),
+                name="Retirada Mensal (média)",
+                marker_color='rgba(231, 76, 60, 0.7)',
+                hovertemplate='Idade: %{customdata[0]:.0f}–%{customdata[1]:.0f} anos<br>Retirada média: R$ %{y:,.2f}<extra></extra>',
+                yaxis="y2"
+            ))
+        else:
+            fig.add_trace(go.Bar(
+                x=result.ages,
+                y=withdrawals,
+                name="Retirada Mensal",
+                marker_color='rgba(231, 76, 60, 0.7)',
+                hovertemplate='Idade: %{x:.1f} anos<br>Retirada: R$ %{y:,.2f}<extra></extra>',
+                yaxis="y2"
+            ))
+
+    if config.strategy_mode == MODE_STRATEGY:
+        retire_ages, constant_withdrawal = decimate_line(
+            result.retire_ages,
+            np.full(len(result.retire_ages), result.computed_portfolio_withdrawal),
+            point_budget,
+        )
+        fig.add_trace(_line_trace(
+            point_budget,
+            x=retire_ages,
+            y=constant_withdrawal,
+            mode='lines',
+            name="Retirada Constante",
+            line=dict(color='#e74c3c', dash='dash'),
+            hovertemplate='Retirada: R$ %{y:,.2f}<extra></extra>'
+        ))
+
+    # Configuração do layout
+    fig.update_layout(
+        title=_title("Evolução do seu Patrimônio"),
+        xaxis_title="Idade (anos)",
+        yaxis=dict(
+            title="Saldo do Portfólio (R$)",
+            gridcolor='rgba(0,0,0,0.1)',
+            hoverformat="R$ ,.2f"
+        ),
+        legend=DEFAULT_LEGEND,
+        hovermode="x unified",
+        template="plotly_white",
+        margin=DEFAULT_MARGIN
+    )
+
+    if show_withdrawal_bars:
+        fig.update_layout(
+            yaxis2=dict(
+                title="Retirada Mensal (R$)",
+                overlaying="y",
+                side="right",
+                showgrid=False,
+                hoverformat="R$ ,.2f"
+            )
+        )
+    return fig
+
+
+# -----------------------------------------------------------------------------
+# 5. EVOLUÇÃO DA RENDA
+# -----------------------------------------------------------------------------
+def income_composition(
+    result: SimulationResult,
+    selected_sources: Sequence[int],
+    include_portfolio_withdrawal: bool = True,
+) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """Séries de renda a empilhar (lidas da matriz de rendas do motor) e o total."""
+    config = result.config
+    ages_range = result.income_ages
+    income_data = []
+    total_income = np.zeros(len(ages_range))
+
+    # Retirada do patrimônio
+    if include_portfolio_withdrawal:
+        if config.strategy_mode == MODE_CUSTOM:
+            withdrawal_value = config.monthly_expenses
+        else:
+            withdrawal_value = result.computed_portfolio_withdrawal
+        portfolio_withdrawals = np.where(ages_range < config.retirement_age, 0.0, withdrawal_value)
+        income_data.append({
+            'name': 'Retirada do Patrimônio',
+            'ages': ages_range,
+            'values': portfolio_withdrawals,
+            'color': '#e74c3c'
+        })
+        total_income += portfolio_withdrawals
+
+    # Fontes de renda selecionadas
+    for i, source_index in enumerate(selected_sources):
+        source_income = result.income_matrix[source_index]
+        income_data.append({
+            'name': config.income_sources[source_index].name,
+            'ages': ages_range,
+            'values': source_income,
+            'color': SOURCE_COLORS[i % len(SOURCE_COLORS)]
+        })
+        total_income += source_income
+    return income_data, total_income
+
+
+def build_income_figure(
+    result: SimulationResult,
+    income_data: List[Dict[str, Any]],
+    total_income: np.ndarray,
+    point_budget: Optional[int] = DEFAULT_POINT_BUDGET,
+) -> go.Figure:
+    """Barras empilhadas com a composição da renda e a linha da renda total.
+
+    Se o total de barras exceder `point_budget`, cada fonte é agregada na
+    renda mensal média de faixas de idade (de um ou mais anos).
+    """
+    config = result.config
+    bucket_years = bucket_years_for(len(income_data), result.income_ages, point_budget)
+    fig_income = go.Figure()
+
+    # Área sombreada para fase de aposentadoria
+    fig_income.add_vrect(
+        x0=config.retirement_age,
+        x1=config.life_expectancy,
+        fillcolor="rgba(52, 152, 219, 0.1)",
+        layer="below",
+        line_width=0,
+        annotation_text="Fase de Aposentadoria",
+        annotation_position="top left"
+    )
+
+    # Cada fonte de renda como barra empilhada
+    if bucket_years:
+        values = np.vstack([source['values'] for source in income_data] + [total_income])
+        bucket_starts, means = aggregate_by_age(result.income_ages, values, bucket_years)
+        for source, mean_values in zip(income_data, means):
+            fig_income.add_trace(go.Bar(
+                y=mean_values,
+                **_bucket_bars(bucket_starts, bucket_years),
+                name=source['name'],
+                marker_color=source['color'],
+                hovertemplate='Idade: %{customdata[0]:.0f}–%{customdata[1]:.0f} anos<br>Renda média: R$ %{y:,.2f}<extra></extra>'
+            ))
+        total_ages, total_values = bucket_starts + bucket_years / 2, means[-1]
+    else:
+        for source in income_data:
+            fig_income.add_trace(go.Bar(
+                x=source['ages'],
+                y=source['values'],
+                name=source['name'],
+                marker_color=source['color'],
+                hovertemplate='Idade: %{x:.1f} anos<br>Renda: R$ %{y:,.2f}<extra></extra>'
+            ))
+        total_ages, total_values = decimate_line(result.income_ages, total_income, point_budget)
+
+    # Configuração do layout para barras empilhadas
+    fig_income.update_layout(
+        title=_title("Composição da Renda ao Longo do Tempo"),
+        xaxis_title="Idade (anos)",
+        yaxis_title="Renda Mensal (R$)",
+        hovermode="x unified",
+        template="plotly_white",
+        showlegend=True,
+        legend=DEFAULT_LEGEND,
+        margin=DEFAULT_MARGIN,
+        barmode='stack',  # Define o modo de empilhamento das barras
+        bargap=0,  # Remove o espaço entre as barras
+        bargroupgap=0  # Remove o espaço entre grupos de barras
+    )
+
+    # Linha do total
+    fig_income.add_trace(_line_trace(
+        point_budget,
+        x=total_ages,
+        y=total_values,
+        name='Renda Total',
+        mode='lines',
+        line=dict(color='#2c3e50', width=2, dash='dash'),
+        hovertemplate='Idade: %{x:.1f} anos<br>Total: R$ %{y:,.2f}<extra></extra>'
+    ))
+    return fig_income
+
+
+# -----------------------------------------------------------------------------
+# 6. MONTE CARLO
+# -----------------------------------------------------------------------------
+def build_monte_carlo_figure(
+    mc_result: MonteCarloResult,
+    result: Optional[SimulationResult] = None,
+    point_budget: Optional[int] = DEFAULT_POINT_BUDGET,
+) -> go.Figure:
+    """Faixas de percentis dos caminhos, mediana e, opcionalmente, o cenário determinístico.
+
+    As faixas usam os mesmos pontos (escolhidos por LTTB sobre a mediana)
+    para que o preenchimento entre elas continue alinhado.
+    """
+    fig_mc = go.Figure()
+    ages = mc_result.ages
+    index = slice(None)
+    if point_budget is not None and len(ages) > point_budget:
+        index = lttb_indices(ages, mc_result.band(50.0), point_budget)
+    ages = ages[index]
+    band_pairs = [(5.0, 95.0, 'rgba(46, 204, 113, 0.15)'), (25.0, 75.0, 'rgba(46, 204, 113, 0.3)')]
+    for lower, upper, fillcolor in band_pairs:
+        fig_mc.add_trace(_line_trace(
+            point_budget,
+            x=ages,
+            y=mc_result.band(upper)[index],
+            mode='lines',
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        fig_mc.add_trace(_line_trace(
+            point_budget,
+            x=ages,
+            y=mc_result.band(lower)[index],
+            mode='lines',
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor=fillcolor,
+            name=f"Percentis {lower:.0f}–{upper:.0f}",
+            hoverinfo='skip'
+        ))
+    fig_mc.add_trace(_line_trace(
+        point_budget,
+        x=ages,
+        y=mc_result.band(50.0)[index],
+        mode='lines',
+        name='Mediana',
+        line=dict(color='#2ecc71', width=3),
+        hovertemplate='Idade: %{x:.1f} anos<br>Mediana: R$ %{y:,.2f}<extra></extra>'
+    ))
+    if result is not None:
+        deterministic_ages, deterministic_portfolio = decimate_line(result.ages, result.portfolio, point_budget)
+        fig_mc.add_trace(_line_trace(
+            point_budget,
+            x=deterministic_ages,
+            y=deterministic_portfolio,
+            mode='lines',
+            name='Cenário Determinístico',
+            line=dict(color='#2c3e50', width=2, dash='dash'),
+            hovertemplate='Idade: %{x:.1f} anos<br>Determinístico: R$ %{y:,.2f}<extra></extra>'
+        ))
+    fig_mc.update_layout(
+        title=_title("Distribuição do Patrimônio"),
+        xaxis_title="Idade (anos)",
+        yaxis_title="Saldo do Portfólio (R$)",
+        hovermode="x unified",
+        template="plotly_white",
+        margin=DEFAULT_MARGIN
+    )
+    return fig_mc
+
+
+def build_depletion_histogram(depleted_ages: np.ndarray) -> go.Figure:
+    """Histograma (anual) das idades de esgotamento dos caminhos que se esgotam."""
+    fig_depletion = go.Figure(go.Histogram(
+        x=depleted_ages,
+        xbins=dict(size=1),
+        marker_color='rgba(231, 76, 60, 0.7)',
+        hovertemplate='Idade: %{x} anos<br>Cenários: %{y}<extra></extra>'
+    ))
+    fig_depletion.update_layout(
+        title=_title("Idade de Esgotamento do Patrimônio"),
+        xaxis_title="Idade (anos)",
+        yaxis_title="Número de Cenários",
+        template="plotly_white",
+        margin=DEFAULT_MARGIN
+    )
+    return fig_depletion
+
+
+# -----------------------------------------------------------------------------
+# 7. ANÁLISE DE SENSIBILIDADE
+# -----------------------------------------------------------------------------
+def build_sweep_heatmap(
+    sweep_result: SweepResult,
+    metric: np.ndarray,
+    title: str,
+    colorscale: str,
+    hover: str,
+) -> go.Figure:
+    """Mapa de calor de uma métrica de uma varredura com dois eixos."""
+    (x_name, x_values), (y_name, y_values) = sweep_result.axes.items()
+    fig_sweep = go.Figure(go.Heatmap(
+        x=x_values,
+        y=y_values,
+        z=metric.T,
+        colorscale=colorscale,
+        hovertemplate=f"{SWEEP_PARAMETERS[x_name]}: %{{x:.2f}}<br>{SWEEP_PARAMETERS[y_name]}: %{{y:.2f}}<br>{hover}<extra></extra>"
+    ))
+    fig_sweep.update_layout(
+        title=_title(title),
+        xaxis_title=SWEEP_PARAMETERS[x_name],
+        yaxis_title=SWEEP_PARAMETERS[y_name],
+        template="plotly_white",
+        margin=DEFAULT_MARGIN
+    )
+    return fig_sweep
+
+
+# -----------------------------------------------------------------------------
+# 8. COMPARAÇÃO DE CENÁRIOS
+# -----------------------------------------------------------------------------
+SCENARIO_COLORS = ['#2c3e50', '#e67e22', '#3498db', '#9b59b6', '#1abc9c', '#e74c3c', '#f1c40f']
+
+
+def build_scenario_portfolio_figure(
+    names: Sequence[str],
+    results: Sequence[SimulationResult],
+    point_budget: Optional[int] = DEFAULT_POINT_BUDGET,
+) -> go.Figure:
+    """Saldo do portfólio de cada cenário sobreposto; o primeiro (referência) em destaque.
+
+    Um marcador indica o patrimônio de cada cenário na idade de aposentadoria.
+    """
+    fig = go.Figure()
+    for i, (name, result) in enumerate(zip(names, results)):
+        color = SCENARIO_COLORS[i % len(SCENARIO_COLORS)]
+        ages, portfolio = decimate_line(result.ages, result.portfolio, point_budget)
+        fig.add_trace(_line_trace(
+            point_budget,
+            x=ages,
+            y=portfolio,
+            mode='lines',
+            name=name,
+            legendgroup=name,
+            line=dict(color=color, width=3 if i == 0 else 2),
+            hovertemplate=f'{name}: R$ %{{y:,.2f}}<extra></extra>'
+        ))
+        fig.add_trace(go.Scatter(
+            x=[result.config.retirement_age],
+            y=[result.portfolio_at_retirement],
+            mode='markers',
+            legendgroup=name,
+            showlegend=False,
+            marker=dict(color=color, size=9, symbol='diamond'),
+            hovertemplate=f'{name}: aposentadoria aos %{{x:.1f}} anos<br>Patrimônio: R$ %{{y:,.2f}}<extra></extra>'
+        ))
+    fig.update_layout(
+        title=_title("Evolução do Patrimônio por Cenário"),
+        xaxis_title="Idade (anos)",
+        yaxis=dict(
+            title="Saldo do Portfólio (R$)",
+            gridcolor='rgba(0,0,0,0.1)',
+            hoverformat="R$ ,.2f"
+        ),
+        legend=DEFAULT_LEGEND,
+        hovermode="x unified",
+        template="plotly_white",
+        margin=DEFAULT_MARGIN
+    )
+    return fig
+
+
+def build_scenario_income_figure(
+    names: Sequence[str],
+    results: Sequence[SimulationResult],
+    point_budget: Optional[int] = DEFAULT_POINT_BUDGET,
+) -> go.Figure:
+    """Composição da renda de cada cenário: renda total (linha cheia) e rendas adicionais (pontilhada).
+
+    A diferença entre as duas linhas de um cenário é a retirada do patrimônio.
+    """
+    fig_income = go.Figure()
+    for i, (name, result) in enumerate(zip(names, results)):
+        color = SCENARIO_COLORS[i % len(SCENARIO_COLORS)]
+        all_sources = range(len(result.config.income_sources))
+        _, total_income = income_composition(result, all_sources, include_portfolio_withdrawal=True)
+        ages, total_values = decimate_line(result.income_ages, total_income, point_budget)
+        fig_income.add_trace(_line_trace(
+            point_budget,
+            x=ages,
+            y=total_values,
+            mode='lines',
+            name=f"{name} — Renda Total",
+            legendgroup=name,
+            line=dict(color=color, width=2.5 if i == 0 else 2, shape='hv'),
+            hovertemplate=f'{name} (total): R$ %{{y:,.2f}}<extra></extra>'
+        ))
+        if len(result.config.income_sources):
+            ages, additional = decimate_line(result.income_ages, result.income_matrix.sum(axis=0), point_budget)
+            fig_income.add_trace(_line_trace(
+                point_budget,
+                x=ages,
+                y=additional,
+                mode='lines',
+                name=f"{name} — Rendas Adicionais",
+                legendgroup=name,
+                line=dict(color=color, width=1.5, dash='dot', shape='hv'),
+                hovertemplate=f'{name} (rendas adicionais): R$ %{{y:,.2f}}<extra></extra>'
+            ))
+    fig_income.update_layout(
+        title=_title("Composição da Renda por Cenário"),
+        xaxis_title="Idade (anos)",
+        yaxis_title="Renda Mensal (R$)",
+        hovermode="x unified",
+        template="plotly_white",
+        legend=DEFAULT_LEGEND,
+        margin=DEFAULT_MARGIN
+    )
+    return fig_income
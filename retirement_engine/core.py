@@ -0,0 +1,725 @@
+# =============================================================================
+# MOTOR DE SIMULAÇÃO DE APOSENTADORIA
+# =============================================================================
+# Descrição: Cálculos das fases de acumulação e aposentadoria, independentes
+#            da interface Streamlit. Depende apenas da biblioteca padrão e do
+#            NumPy, para que jobs em lote possam importá-lo rapidamente.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import dataclasses
+import datetime
+import hashlib
+import json
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .withdrawal import (
+    DYNAMIC_STRATEGIES,
+    STRATEGY_DRAWDOWN,
+    STRATEGY_PERPETUAL,
+    STRATEGY_TYPES,
+    WithdrawalPolicy,
+    WithdrawalRule,
+)
+
+# -----------------------------------------------------------------------------
+# 2. CONSTANTES
+# -----------------------------------------------------------------------------
+MODE_CUSTOM = "Retirada Personalizada"
+MODE_STRATEGY = "Retirada Baseada em Estratégia"
+
+# Como as fases são calculadas: fórmulas sobre arrays com recursão mês a mês
+# apenas quando necessário ("auto"), só as fórmulas ou só a recursão
+METHOD_AUTO = "auto"
+METHOD_CLOSED_FORM = "closed_form"
+METHOD_LOOP = "loop"
+
+# Saldos com módulo até esta fração da escala da recursão (saldo inicial e
+# fluxos capitalizados) são ruído de arredondamento e são tratados como zero;
+# assim o Drawdown termina em zero, e não em um esgotamento espúrio no último mês.
+BALANCE_NOISE_TOLERANCE = 1e-9
+
+# Versão dos resultados do motor, gravada junto de cada resultado persistido.
+# Deve ser incrementada sempre que uma mudança no cálculo alterar os resultados
+# de uma mesma configuração: os resultados de versões anteriores deixam de ser
+# servidos e são recalculados.
+ENGINE_VERSION = 1
+
+
+def monthly_rate_from_annual(annual_rate: float) -> float:
+    """Converte uma taxa anual em % na taxa mensal equivalente (decimal)."""
+    return (1 + annual_rate / 100) ** (1 / 12) - 1
+
+
+# -----------------------------------------------------------------------------
+# 3. ESTRUTURAS DE CONFIGURAÇÃO
+# -----------------------------------------------------------------------------
+@dataclass(frozen=True)
+class IncomeSource:
+    """Fonte de renda adicional recebida a partir de `income_start_age`."""
+
+    name: str
+    monthly_income: float
+    income_start_age: float
+    lifetime: bool = True
+    duration_years: Optional[float] = None
+    annual_rate: float = 0.0
+
+    @property
+    def monthly_rate(self) -> float:
+        return monthly_rate_from_annual(self.annual_rate)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IncomeSource":
+        lifetime = bool(data.get("lifetime", True))
+        duration = data.get("duration_years")
+        return cls(
+            name=str(data.get("name", "")),
+            monthly_income=float(data.get("monthly_income", 0.0)),
+            income_start_age=float(data.get("income_start_age", 0)),
+            lifetime=lifetime,
+            duration_years=None if lifetime or duration is None else float(duration),
+            annual_rate=float(data.get("annual_rate", 0.0)),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        source = {
+            "name": self.name,
+            "monthly_income": self.monthly_income,
+            "income_start_age": self.income_start_age,
+            "lifetime": self.lifetime,
+            "annual_rate": self.annual_rate,
+        }
+        if not self.lifetime and self.duration_years is not None:
+            source["duration_years"] = self.duration_years
+        return source
+
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    """Entradas da simulação, no mesmo formato do JSON de configurações."""
+
+    birth_date: datetime.date
+    total_investments_today: float
+    monthly_investment: float
+    annual_rate_acc: float
+    retirement_age: float
+    life_expectancy: float
+    annual_rate_ret: float
+    strategy_mode: str = MODE_CUSTOM
+    monthly_expenses: Optional[float] = None
+    strategy_type: Optional[str] = None
+    income_sources: Tuple[IncomeSource, ...] = ()
+    reference_date: Optional[datetime.date] = None
+    withdrawal_rule: WithdrawalRule = WithdrawalRule()
+
+    @property
+    def today(self) -> datetime.date:
+        return self.reference_date or datetime.date.today()
+
+    @property
+    def current_age(self) -> float:
+        return (self.today - self.birth_date).days / 365.25
+
+    @property
+    def accumulation_months(self) -> int:
+        return math.ceil((self.retirement_age - self.current_age) * 12)
+
+    @property
+    def retirement_months(self) -> int:
+        return math.ceil((self.life_expectancy - self.retirement_age) * 12)
+
+    @property
+    def monthly_rate_acc(self) -> float:
+        return monthly_rate_from_annual(self.annual_rate_acc)
+
+    @property
+    def monthly_rate_ret(self) -> float:
+        return monthly_rate_from_annual(self.annual_rate_ret)
+
+    @property
+    def dynamic_withdrawal(self) -> bool:
+        """Se a retirada é recalculada ao longo da aposentadoria (regras dinâmicas)."""
+        return self.strategy_mode == MODE_STRATEGY and self.strategy_type in DYNAMIC_STRATEGIES
+
+    def validate(self) -> None:
+        """Aplica as mesmas validações exibidas na interface."""
+        if self.retirement_age <= self.current_age:
+            raise ValueError("A idade de aposentadoria deve ser maior que sua idade atual.")
+        if self.life_expectancy <= self.retirement_age:
+            raise ValueError("A expectativa de vida deve ser maior que a idade de aposentadoria.")
+        if self.strategy_mode == MODE_CUSTOM:
+            if self.monthly_expenses is None:
+                raise ValueError("Informe as despesas mensais para o modo 'Retirada Personalizada'.")
+        elif self.strategy_mode == MODE_STRATEGY:
+            if self.strategy_type not in STRATEGY_TYPES:
+                raise ValueError(f"Tipo de estratégia desconhecido: {self.strategy_type!r}")
+            if self.strategy_type in DYNAMIC_STRATEGIES:
+                self.withdrawal_rule.validate()
+        else:
+            raise ValueError(f"Modo de retirada desconhecido: {self.strategy_mode!r}")
+        for source in self.income_sources:
+            if not source.lifetime and source.duration_years is None:
+                raise ValueError(f"A fonte '{source.name}' não é vitalícia e precisa de duração.")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SimulationConfig":
+        """Cria a configuração a partir do dicionário exportado pela interface."""
+        birth_date = data["birth_date"]
+        if isinstance(birth_date, str):
+            birth_date = datetime.datetime.strptime(birth_date, "%Y-%m-%d").date()
+        reference_date = data.get("reference_date")
+        if isinstance(reference_date, str):
+            reference_date = datetime.datetime.strptime(reference_date, "%Y-%m-%d").date()
+        strategy_mode = str(data.get("strategy_mode", MODE_CUSTOM))
+        monthly_expenses = data.get("monthly_expenses")
+        strategy_type = data.get("strategy_type")
+        return cls(
+            birth_date=birth_date,
+            total_investments_today=float(data.get("total_investments_today", 0.0)),
+            monthly_investment=float(data.get("monthly_investment", 0.0)),
+            annual_rate_acc=float(data.get("annual_rate_acc", 0.0)),
+            retirement_age=float(data["retirement_age"]),
+            life_expectancy=float(data["life_expectancy"]),
+            annual_rate_ret=float(data.get("annual_rate_ret", 0.0)),
+            strategy_mode=strategy_mode,
+            monthly_expenses=float(monthly_expenses) if monthly_expenses is not None else None,
+            strategy_type=str(strategy_type) if strategy_type is not None else None,
+            income_sources=tuple(IncomeSource.from_dict(s) for s in data.get("income_sources") or []),
+            reference_date=reference_date,
+            withdrawal_rule=WithdrawalRule.from_dict(data.get("withdrawal_rule")),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        config = {
+            "birth_date": str(self.birth_date),
+            "total_investments_today": self.total_investments_today,
+            "monthly_investment": self.monthly_investment,
+            "annual_rate_acc": self.annual_rate_acc,
+            "retirement_age": self.retirement_age,
+            "life_expectancy": self.life_expectancy,
+            "annual_rate_ret": self.annual_rate_ret,
+            "strategy_mode": self.strategy_mode,
+            "monthly_expenses": self.monthly_expenses if self.strategy_mode == MODE_CUSTOM else None,
+            "strategy_type": self.strategy_type if self.strategy_mode == MODE_STRATEGY else None,
+            "n_sources": len(self.income_sources),
+            "income_sources": [source.to_dict() for source in self.income_sources],
+        }
+        if self.dynamic_withdrawal:
+            # Só nas regras dinâmicas, para não alterar o hash das demais configurações
+            config["withdrawal_rule"] = self.withdrawal_rule.to_dict()
+        if self.reference_date is not None:
+            config["reference_date"] = str(self.reference_date)
+        return config
+
+
+def fingerprint(*parts: Any) -> str:
+    """Hash canônico (SHA-256) de valores serializáveis em JSON ou dataclasses."""
+    canonical = json.dumps(_normalize_numbers(list(parts)), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def config_hash(config: SimulationConfig, *extra: Any) -> str:
+    """Hash canônico (SHA-256) das entradas que afetam a simulação.
+
+    A data de referência é resolvida para o dia atual, já que a idade atual
+    depende dela. Números são normalizados para `float`, de modo que ``65`` e
+    ``65.0`` produzem o mesmo hash. Parâmetros adicionais (por exemplo, as
+    configurações de Monte Carlo) podem ser incluídos em `extra`.
+    """
+    payload = config.to_dict()
+    payload["reference_date"] = str(config.today)
+    payload["extra"] = list(extra)
+    canonical = json.dumps(_normalize_numbers(payload), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _normalize_numbers(value: Any) -> Any:
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, int) and float(value) != value:
+        return value  # inteiros além da precisão do float (sementes) ficam exatos
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, dict):
+        return {str(k): _normalize_numbers(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_numbers(v) for v in value]
+    if dataclasses.is_dataclass(value):
+        return _normalize_numbers(dataclasses.asdict(value))
+    return str(value)
+
+
+# -----------------------------------------------------------------------------
+# 4. ESTRUTURA DE RESULTADOS
+# -----------------------------------------------------------------------------
+# Esquema fixo das séries mensais, além do índice inteiro "month"
+RESULT_COLUMNS: Tuple[str, ...] = ("age", "portfolio", "withdrawal", "additional_income")
+
+
+@dataclass
+class ResultColumns:
+    """Séries mensais em formato colunar com esquema fixo.
+
+    `values` é um único bloco (colunas × meses) em float64 ou float32, na
+    ordem de `RESULT_COLUMNS`; cada coluna é uma linha contígua do bloco e é
+    exposta como view, sem cópia. `month` é o índice do mês (0 = hoje), em
+    int32. Valores ausentes são ``NaN``.
+    """
+
+    month: np.ndarray
+    values: np.ndarray
+
+    @classmethod
+    def allocate(cls, n_months: int, dtype: Any = np.float64) -> "ResultColumns":
+        return cls(np.arange(n_months, dtype=np.int32), np.empty((len(RESULT_COLUMNS), n_months), dtype=dtype))
+
+    def __len__(self) -> int:
+        return self.values.shape[1]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name == "month":
+            return self.month
+        return self.values[RESULT_COLUMNS.index(name)]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.values.dtype
+
+    @property
+    def nbytes(self) -> int:
+        return self.month.nbytes + self.values.nbytes
+
+    def astype(self, dtype: Any) -> "ResultColumns":
+        """Cópia com outro tipo de ponto flutuante (sem cópia se o tipo for o mesmo)."""
+        return ResultColumns(self.month, self.values.astype(dtype, copy=False))
+
+    def to_dict(self) -> Dict[str, np.ndarray]:
+        """Colunas por nome, começando por "month"; os arrays são views do bloco."""
+        return {"month": self.month, **{name: self.values[i] for i, name in enumerate(RESULT_COLUMNS)}}
+
+
+@dataclass
+class SimulationResult:
+    """Séries mensais da simulação e métricas derivadas.
+
+    As séries cobrem a acumulação (índices ``0..accumulation_months``) seguida
+    da aposentadoria, que pode terminar antes se o patrimônio se esgotar.
+    Durante a acumulação, retiradas e renda adicional são ``NaN``.
+
+    `income_matrix` (fontes × meses) cobre a linha do tempo completa
+    `income_ages`, até a expectativa de vida, mesmo que o patrimônio se
+    esgote antes.
+    """
+
+    columns: ResultColumns
+    current_age: float
+    accumulation_months: int
+    retirement_months: int
+    portfolio_at_retirement: float
+    initial_additional_income: float = 0.0
+    computed_portfolio_withdrawal: Optional[float] = None
+    recommended_total_spending: Optional[float] = None
+    income_ages: Optional[np.ndarray] = field(default=None, repr=False)
+    income_matrix: Optional[np.ndarray] = field(default=None, repr=False)
+    config: Optional[SimulationConfig] = field(default=None, repr=False)
+
+    @property
+    def ages(self) -> np.ndarray:
+        return self.columns["age"]
+
+    @property
+    def portfolio(self) -> np.ndarray:
+        return self.columns["portfolio"]
+
+    @property
+    def withdrawals(self) -> np.ndarray:
+        return self.columns["withdrawal"]
+
+    @property
+    def additional_income(self) -> np.ndarray:
+        return self.columns["additional_income"]
+
+    @property
+    def retirement_slice(self) -> slice:
+        return slice(self.accumulation_months + 1, None)
+
+    @property
+    def retire_ages(self) -> np.ndarray:
+        return self.ages[self.retirement_slice]
+
+    @property
+    def final_balance(self) -> float:
+        return float(self.portfolio[-1])
+
+    @property
+    def depleted(self) -> bool:
+        return self.final_balance < 0
+
+    @property
+    def depletion_age(self) -> Optional[float]:
+        return float(self.ages[-1]) if self.depleted else None
+
+
+# -----------------------------------------------------------------------------
+# 5. SIMULAÇÃO
+# -----------------------------------------------------------------------------
+def source_income_at(source: IncomeSource, age: float) -> float:
+    """Renda mensal de uma fonte em uma determinada idade."""
+    if age < source.income_start_age:
+        return 0.0
+    if not source.lifetime and age > source.income_start_age + source.duration_years:
+        return 0.0
+    months_since_start = int(round((age - source.income_start_age) * 12))
+    return source.monthly_income * ((1 + source.monthly_rate) ** months_since_start)
+
+
+def simulation_timeline(config: SimulationConfig) -> np.ndarray:
+    """Idades de cada mês da simulação: acumulação (``0..n``) e aposentadoria (``1..n``)."""
+    return np.concatenate([
+        config.current_age + np.arange(config.accumulation_months + 1) / 12,
+        config.retirement_age + np.arange(1, config.retirement_months + 1) / 12,
+    ])
+
+
+def build_income_matrix(sources: Sequence[IncomeSource], ages: np.ndarray) -> np.ndarray:
+    """Matriz (fontes × meses) com a renda mensal de cada fonte em cada idade.
+
+    Versão vetorizada de `source_income_at`, calculada uma única vez por
+    execução e compartilhada entre a simulação e o gráfico de renda.
+    """
+    ages = np.asarray(ages, dtype=float)
+    if not sources:
+        return np.zeros((0, len(ages)))
+    start = np.array([source.income_start_age for source in sources], dtype=float)[:, None]
+    income = np.array([source.monthly_income for source in sources], dtype=float)[:, None]
+    growth = np.array([1 + source.monthly_rate for source in sources], dtype=float)[:, None]
+    end = np.array(
+        [np.inf if source.lifetime else source.income_start_age + source.duration_years for source in sources],
+        dtype=float,
+    )[:, None]
+
+    active = (ages >= start) & (ages <= end)
+    months_since_start = np.rint((ages - start) * 12)
+    matrix = income * np.power(growth, months_since_start)
+    matrix[~active] = 0.0
+    return matrix
+
+
+def retirement_income_schedule(config: SimulationConfig, months: Optional[int] = None) -> np.ndarray:
+    """Renda adicional total em cada mês da aposentadoria (meses ``1..n``).
+
+    `months` estende a série além do horizonte (padrão: ``retirement_months``).
+    """
+    months = config.retirement_months if months is None else months
+    retire_ages = config.retirement_age + np.arange(1, months + 1) / 12
+    return build_income_matrix(config.income_sources, retire_ages).sum(axis=0)
+
+
+def income_at_retirement(config: SimulationConfig) -> float:
+    """Renda adicional disponível no mês da aposentadoria (A0)."""
+    total = 0.0
+    for source in config.income_sources:
+        if config.retirement_age >= source.income_start_age:
+            if not source.lifetime:
+                if config.retirement_age <= source.income_start_age + source.duration_years:
+                    total += source.monthly_income
+            else:
+                total += source.monthly_income
+    return total
+
+
+def withdrawal_policy(portfolio_at_retirement: Any, config: SimulationConfig) -> WithdrawalPolicy:
+    """Política da regra dinâmica de `config` para um ou vários patrimônios iniciais."""
+    return WithdrawalPolicy(
+        config.strategy_type,
+        config.withdrawal_rule,
+        portfolio_at_retirement,
+        config.monthly_rate_ret,
+        config.retirement_months,
+    )
+
+
+def strategy_withdrawal(portfolio_at_retirement: float, config: SimulationConfig) -> float:
+    """Retirada mensal do portfólio segundo a estratégia Drawdown ou Perpétua.
+
+    Nas regras dinâmicas é a retirada do primeiro mês da aposentadoria.
+    """
+    n = config.retirement_months
+    r = config.monthly_rate_ret
+    if config.strategy_type in DYNAMIC_STRATEGIES:
+        initial = withdrawal_policy(portfolio_at_retirement, config).initial_withdrawal
+        return float(initial) if initial.ndim == 0 else initial
+    if config.strategy_type == STRATEGY_DRAWDOWN:
+        if r == 0:
+            return portfolio_at_retirement / n
+        return portfolio_at_retirement * (r * (1 + r) ** n) / ((1 + r) ** n - 1)
+    return portfolio_at_retirement * r
+
+
+def geometric_path(initial: Any, monthly_rate: Any, flow: Any, months: Any) -> np.ndarray:
+    """Saldo após `months` meses de ``b_m = b_{m-1}·(1+r) + f`` com fluxo constante.
+
+    Soma da série geométrica ``b_m = b_0·(1+r)^m + f·((1+r)^m - 1)/r``, sem
+    laço em Python; os argumentos se combinam por broadcasting (por exemplo,
+    meses × cenários). Saldos no nível do ruído de arredondamento são
+    zerados (ver `BALANCE_NOISE_TOLERANCE`).
+    """
+    monthly_rate = np.asarray(monthly_rate, dtype=float)
+    months = np.asarray(months)
+    growth = np.power(1 + monthly_rate, months)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(monthly_rate == 0, months, (growth - 1) / monthly_rate)
+    path = initial * growth + flow * annuity
+    scale = np.abs(initial) * growth + np.abs(flow) * np.abs(annuity)
+    return _drop_noise(path, scale)
+
+
+def linear_recurrence(initial: Any, growth: np.ndarray, flows: np.ndarray) -> np.ndarray:
+    """Saldos ``b_1..b_n`` de ``b_m = b_{m-1}·g_m + f_m`` ao longo do eixo 0.
+
+    Solução por produtos e somas acumulados: com ``G_m = g_1·…·g_m``,
+    ``b_m = G_m·(b_0 + Σ_{k≤m} f_k/G_k)``. Os fluxos podem variar mês a mês
+    (por exemplo, a renda de cada fonte na aposentadoria).
+    """
+    cumulative_growth = np.cumprod(growth, axis=0)
+    path = cumulative_growth * (initial + np.cumsum(flows / cumulative_growth, axis=0))
+    scale = cumulative_growth * (np.abs(initial) + np.cumsum(np.abs(flows) / cumulative_growth, axis=0))
+    return _drop_noise(path, scale)
+
+
+def _drop_noise(path: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    path = np.asarray(path, dtype=float)
+    path[np.abs(path) <= BALANCE_NOISE_TOLERANCE * scale] = 0.0
+    return path
+
+
+def first_negative_index(balances: np.ndarray, limit: Any = None) -> np.ndarray:
+    """Índice do primeiro saldo negativo ao longo do eixo 0, ou ``-1``.
+
+    `limit` restringe a busca aos primeiros `limit` meses (um valor por
+    coluna, por exemplo o horizonte de cada cenário).
+    """
+    negative = balances < 0
+    if limit is not None:
+        months = np.arange(len(balances)).reshape((-1,) + (1,) * (negative.ndim - 1))
+        negative &= months < limit
+    return np.where(negative.any(axis=0), negative.argmax(axis=0), -1)
+
+
+def simulate_accumulation(config: SimulationConfig, method: str = METHOD_AUTO) -> Tuple[np.ndarray, np.ndarray]:
+    """Idades e saldos mensais da fase de acumulação (inclui o mês 0).
+
+    Taxa e aporte são constantes, então os saldos vêm da série geométrica;
+    a recursão mês a mês (``method="loop"``) é usada se a fórmula não der
+    valores finitos.
+    """
+    current_age = config.current_age
+    months = config.accumulation_months
+    monthly_rate_acc = config.monthly_rate_acc
+    ages = current_age + np.arange(months + 1) / 12
+    if method != METHOD_LOOP:
+        balances = geometric_path(
+            config.total_investments_today, monthly_rate_acc, config.monthly_investment, np.arange(months + 1)
+        )
+        if method == METHOD_CLOSED_FORM or np.isfinite(balances).all():
+            return ages, balances
+
+    balances = np.empty(months + 1)
+    balance = config.total_investments_today
+    for m in range(months + 1):
+        balances[m] = balance
+        if m < months:
+            balance = balance * (1 + monthly_rate_acc) + config.monthly_investment
+    return ages, balances
+
+
+@dataclass
+class RetirementPath:
+    """Saída da fase de aposentadoria: séries mensais (meses ``1..n`` ou até o esgotamento)."""
+
+    ages: Sequence[float]
+    portfolio: Sequence[float]
+    net_withdrawals: Sequence[float]
+    additional_income: Sequence[float]
+    initial_additional_income: float = 0.0
+    computed_portfolio_withdrawal: Optional[float] = None
+    recommended_total_spending: Optional[float] = None
+
+
+def simulate_retirement(
+    config: SimulationConfig,
+    portfolio_at_retirement: float,
+    income_schedule: np.ndarray,
+    method: str = METHOD_AUTO,
+) -> RetirementPath:
+    """Saldos da aposentadoria a partir do patrimônio acumulado.
+
+    `income_schedule` é a renda adicional total de cada mês da aposentadoria
+    (usada no modo "Retirada Personalizada"). Com retiradas fixas o caminho
+    inteiro é calculado por fórmulas sobre arrays: a anuidade no modo
+    estratégia e a recorrência linear (`linear_recurrence`) no modo
+    personalizado, em que a renda varia mês a mês; o esgotamento é o
+    primeiro saldo negativo. A recursão mês a mês é usada nas regras
+    dinâmicas, cuja retirada depende do saldo, e se as fórmulas não derem
+    valores finitos.
+    """
+    if method != METHOD_LOOP and not config.dynamic_withdrawal:
+        path = _retirement_closed_form(config, portfolio_at_retirement, income_schedule)
+        if method == METHOD_CLOSED_FORM or np.isfinite(path.portfolio).all():
+            return path
+    return _retirement_loop(config, portfolio_at_retirement, income_schedule)
+
+
+def _retirement_closed_form(
+    config: SimulationConfig,
+    portfolio_at_retirement: float,
+    income_schedule: np.ndarray,
+) -> RetirementPath:
+    retirement_months = config.retirement_months
+    monthly_rate_ret = config.monthly_rate_ret
+    months = np.arange(1, retirement_months + 1)
+    path = RetirementPath([], [], [], [])
+    if config.strategy_mode == MODE_CUSTOM:
+        income = np.asarray(income_schedule, dtype=float)[:retirement_months]
+        net_withdrawals = config.monthly_expenses - income
+        balances = linear_recurrence(
+            portfolio_at_retirement, np.full(retirement_months, 1 + monthly_rate_ret), -net_withdrawals
+        )
+        stops_on_depletion = True
+    else:
+        A0 = income_at_retirement(config)
+        computed_portfolio_withdrawal = strategy_withdrawal(portfolio_at_retirement, config)
+        path.initial_additional_income = A0
+        path.computed_portfolio_withdrawal = computed_portfolio_withdrawal
+        path.recommended_total_spending = computed_portfolio_withdrawal + A0
+        income = np.full(retirement_months, A0)
+        net_withdrawals = np.full(retirement_months, computed_portfolio_withdrawal)
+        balances = geometric_path(portfolio_at_retirement, monthly_rate_ret, -computed_portfolio_withdrawal, months)
+        stops_on_depletion = config.strategy_type != STRATEGY_PERPETUAL
+
+    length = retirement_months
+    if stops_on_depletion:
+        depletion = int(first_negative_index(balances))
+        if depletion >= 0:
+            length = depletion + 1
+    path.ages = config.retirement_age + months[:length] / 12
+    path.portfolio = balances[:length]
+    path.net_withdrawals = net_withdrawals[:length]
+    path.additional_income = income[:length]
+    return path
+
+
+def _retirement_loop(
+    config: SimulationConfig,
+    portfolio_at_retirement: float,
+    income_schedule: np.ndarray,
+) -> RetirementPath:
+    """Recursão mês a mês da aposentadoria (regras dinâmicas e verificação das fórmulas)."""
+    retirement_months = config.retirement_months
+    monthly_rate_ret = config.monthly_rate_ret
+    path = RetirementPath([], [], [], [])
+    balance = portfolio_at_retirement
+    # Escala da recursão, para zerar saldos no nível do ruído como nas fórmulas
+    scale = abs(portfolio_at_retirement)
+
+    if config.strategy_mode == MODE_CUSTOM:
+        # Simula mês a mês com renda dinâmica de cada fonte.
+        for m in range(1, retirement_months + 1):
+            sim_age = config.retirement_age + m / 12
+            total_income = float(income_schedule[m - 1])
+            path.additional_income.append(total_income)
+            net_withdrawal = config.monthly_expenses - total_income
+            path.net_withdrawals.append(net_withdrawal)
+            balance = balance * (1 + monthly_rate_ret) - net_withdrawal
+            scale = scale * (1 + monthly_rate_ret) + abs(net_withdrawal)
+            if abs(balance) <= BALANCE_NOISE_TOLERANCE * scale:
+                balance = 0.0
+            path.ages.append(sim_age)
+            path.portfolio.append(balance)
+            if balance < 0:
+                break
+        return path
+
+    # Modo "Retirada Baseada em Estratégia"
+    A0 = income_at_retirement(config)
+    computed_portfolio_withdrawal = strategy_withdrawal(portfolio_at_retirement, config)
+    path.initial_additional_income = A0
+    path.computed_portfolio_withdrawal = computed_portfolio_withdrawal
+    path.recommended_total_spending = computed_portfolio_withdrawal + A0
+    policy = withdrawal_policy(portfolio_at_retirement, config) if config.dynamic_withdrawal else None
+    for m in range(1, retirement_months + 1):
+        sim_age = config.retirement_age + m / 12
+        balance = balance * (1 + monthly_rate_ret)
+        if policy is not None:
+            withdrawal = float(policy.withdrawal(m - 1, np.float64(balance)))
+        else:
+            withdrawal = computed_portfolio_withdrawal
+        balance -= withdrawal
+        scale = scale * (1 + monthly_rate_ret) + abs(withdrawal)
+        if abs(balance) <= BALANCE_NOISE_TOLERANCE * scale:
+            balance = 0.0
+        path.additional_income.append(A0)
+        path.net_withdrawals.append(withdrawal)
+        path.ages.append(sim_age)
+        path.portfolio.append(balance)
+        if config.strategy_type != STRATEGY_PERPETUAL and balance < 0:
+            break
+    return path
+
+
+def assemble_result(
+    config: SimulationConfig,
+    acc_ages: np.ndarray,
+    acc_balances: np.ndarray,
+    retirement: RetirementPath,
+    income_ages: np.ndarray,
+    income_matrix: np.ndarray,
+    dtype: Any = np.float64,
+) -> SimulationResult:
+    """Junta as fases em um `SimulationResult` com as séries no formato colunar."""
+    accumulation_months = config.accumulation_months
+    columns = ResultColumns.allocate(accumulation_months + 1 + len(retirement.ages), dtype)
+    accumulation, retirement_part = slice(0, accumulation_months + 1), slice(accumulation_months + 1, None)
+    columns["age"][accumulation] = acc_ages
+    columns["age"][retirement_part] = retirement.ages
+    columns["portfolio"][accumulation] = acc_balances
+    columns["portfolio"][retirement_part] = retirement.portfolio
+    columns["withdrawal"][accumulation] = np.nan
+    columns["withdrawal"][retirement_part] = retirement.net_withdrawals
+    columns["additional_income"][accumulation] = np.nan
+    columns["additional_income"][retirement_part] = retirement.additional_income
+    return SimulationResult(
+        columns=columns,
+        current_age=config.current_age,
+        accumulation_months=accumulation_months,
+        retirement_months=config.retirement_months,
+        portfolio_at_retirement=float(acc_balances[-1]),
+        initial_additional_income=retirement.initial_additional_income,
+        computed_portfolio_withdrawal=retirement.computed_portfolio_withdrawal,
+        recommended_total_spending=retirement.recommended_total_spending,
+        income_ages=income_ages,
+        income_matrix=income_matrix,
+        config=config,
+    )
+
+
+def run_simulation(config: SimulationConfig, dtype: Any = np.float64) -> SimulationResult:
+    """Executa a simulação determinística completa para uma configuração.
+
+    A recursão é sempre calculada em float64; `dtype` define apenas o tipo
+    das séries armazenadas (``np.float32`` reduz a memória pela metade).
+    """
+    config.validate()
+    acc_ages, acc_balances = simulate_accumulation(config)
+    income_ages = simulation_timeline(config)
+    income_matrix = build_income_matrix(config.income_sources, income_ages)
+    income_schedule = income_matrix[:, config.accumulation_months + 1:].sum(axis=0)
+    retirement = simulate_retirement(config, float(acc_balances[-1]), income_schedule)
+    return assemble_result(config, acc_ages, acc_balances, retirement, income_ages, income_matrix, dtype)
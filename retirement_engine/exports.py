@@ -0,0 +1,74 @@
+# =============================================================================
+# EXPORTAÇÃO DE RESULTADOS
+# =============================================================================
+# Descrição: Conversão dos resultados da simulação em tabelas e arquivos CSV
+#            e Excel para download. O pandas é importado apenas quando um
+#            arquivo é gerado, para não pesar na importação do módulo.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import io
+from typing import TYPE_CHECKING, Any, Optional
+
+from .core import SimulationResult
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# -----------------------------------------------------------------------------
+# 2. TABELA DE RESULTADOS
+# -----------------------------------------------------------------------------
+COLUMN_MONTH = "Mês"
+COLUMN_AGE = "Idade"
+COLUMN_PORTFOLIO = "Saldo do Portfólio (R$)"
+COLUMN_WITHDRAWAL = "Retirada do Portfólio (R$)"
+COLUMN_ADDITIONAL_INCOME = "Renda Adicional (R$)"
+
+# Rótulo de cada coluna de `ResultColumns` nos arquivos exportados
+COLUMN_LABELS = {
+    "month": COLUMN_MONTH,
+    "age": COLUMN_AGE,
+    "portfolio": COLUMN_PORTFOLIO,
+    "withdrawal": COLUMN_WITHDRAWAL,
+    "additional_income": COLUMN_ADDITIONAL_INCOME,
+}
+
+CSV_FILE_NAME = "simulacao_aposentadoria.csv"
+EXCEL_FILE_NAME = "simulacao_aposentadoria.xlsx"
+EXCEL_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def results_frame(result: SimulationResult, dtype: Optional[Any] = None) -> "pd.DataFrame":
+    """Tabela mensal da simulação, com as colunas exibidas e exportadas pela interface.
+
+    As colunas do DataFrame compartilham a memória das séries do resultado
+    (sem cópia); com `dtype` (por exemplo ``np.float32``) os valores são
+    convertidos antes.
+    """
+    import pandas as pd
+
+    columns = result.columns if dtype is None else result.columns.astype(dtype)
+    return pd.DataFrame(
+        {COLUMN_LABELS[name]: values for name, values in columns.to_dict().items()},
+        copy=False,
+    )
+
+
+# -----------------------------------------------------------------------------
+# 3. ARQUIVOS PARA DOWNLOAD
+# -----------------------------------------------------------------------------
+def export_csv(result: SimulationResult) -> bytes:
+    """Conteúdo do arquivo CSV da simulação."""
+    return results_frame(result).to_csv(index=False).encode("utf-8")
+
+
+def export_excel(result: SimulationResult) -> bytes:
+    """Conteúdo da planilha Excel (aba 'Simulacao') da simulação."""
+    import pandas as pd
+
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+        results_frame(result).to_excel(writer, index=False, sheet_name="Simulacao")
+    return output.getvalue()
@@ -0,0 +1,532 @@
+# =============================================================================
+# SIMULAÇÃO DE MONTE CARLO
+# =============================================================================
+# Descrição: Modo estocástico do motor. Sorteia uma matriz de retornos
+#            mensais (caminhos × meses) para cada fase, com uma taxa e uma
+#            volatilidade por fase ou com uma carteira de vários ativos
+#            correlacionados (ver `assets`), e avança todos os caminhos ao
+#            mesmo tempo com operações vetorizadas do NumPy.
+#
+#            Os caminhos são divididos em blocos de tamanho fixo, cada um com
+#            um fluxo aleatório próprio derivado da semente (como em
+#            ``SeedSequence.spawn``): os blocos podem ser simulados em
+#            qualquer ordem ou em vários processos, com resultado idêntico
+#            bit a bit, e cada resultado traz uma impressão digital que
+#            permite conferi-lo recalculando só alguns blocos.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import dataclasses
+import hashlib
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .assets import AssetModel, draw_portfolio_returns, month_start_ages
+from .mortality import SurvivalCurve, survival_weighted_ruin
+from .core import (
+    MODE_CUSTOM,
+    SimulationConfig,
+    config_hash,
+    retirement_income_schedule,
+    simulation_timeline,
+    strategy_withdrawal,
+    withdrawal_policy,
+)
+
+# -----------------------------------------------------------------------------
+# 2. PARÂMETROS E RESULTADOS
+# -----------------------------------------------------------------------------
+DEFAULT_PERCENTILES = (5.0, 25.0, 50.0, 75.0, 95.0)
+# Caminhos por fluxo aleatório. Faz parte da definição dos sorteios: mudar o
+# valor muda os caminhos de uma mesma semente.
+STREAM_PATHS = 1024
+
+
+@dataclass(frozen=True)
+class MonteCarloSettings:
+    """Parâmetros do modo estocástico.
+
+    As volatilidades são anuais, em %, e os retornos esperados continuam
+    sendo `annual_rate_acc` e `annual_rate_ret` da configuração. Com
+    `asset_model`, os retornos vêm da carteira de vários ativos e da sua
+    trajetória de alocação, e as taxas e volatilidades das fases são
+    ignoradas; `chunk_paths` limita os caminhos sorteados de uma vez.
+
+    Sem `seed`, uma semente nova é sorteada em cada execução e registrada
+    nas configurações do resultado, de modo que ele pode ser reproduzido.
+    """
+
+    n_paths: int = 10_000
+    volatility_acc: float = 15.0
+    volatility_ret: float = 10.0
+    seed: Optional[int] = None
+    percentiles: Tuple[float, ...] = DEFAULT_PERCENTILES
+    asset_model: Optional[AssetModel] = None
+    chunk_paths: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MonteCarloSettings":
+        """Lê o bloco ``monte_carlo`` do JSON exportado; campos ausentes ficam com o padrão."""
+        defaults = cls()
+        return cls(
+            n_paths=int(data.get("n_paths", defaults.n_paths)),
+            volatility_acc=float(data.get("volatility_acc", defaults.volatility_acc)),
+            volatility_ret=float(data.get("volatility_ret", defaults.volatility_ret)),
+            seed=int(data["seed"]) if data.get("seed") is not None else None,
+            percentiles=tuple(float(p) for p in data.get("percentiles", defaults.percentiles)),
+            asset_model=AssetModel.from_dict(data["asset_model"]) if data.get("asset_model") else None,
+            chunk_paths=int(data["chunk_paths"]) if data.get("chunk_paths") else None,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "n_paths": self.n_paths,
+            "volatility_acc": self.volatility_acc,
+            "volatility_ret": self.volatility_ret,
+            "seed": self.seed,
+            "percentiles": list(self.percentiles),
+            "asset_model": self.asset_model.to_dict() if self.asset_model is not None else None,
+            "chunk_paths": self.chunk_paths,
+        }
+
+
+@dataclass
+class MonteCarloResult:
+    """Resumo estatístico dos caminhos simulados.
+
+    `bands` tem formato (percentis × meses) e segue a mesma linha do tempo
+    de `ages`: acumulação (meses ``0..accumulation_months``) e aposentadoria.
+    `depletion_ages` traz a idade de esgotamento de cada caminho, ou ``NaN``
+    quando o patrimônio dura até a expectativa de vida.
+
+    Com uma curva de sobrevivência, `lifespans` traz a idade de morte
+    sorteada para cada caminho. Como a morte pode vir depois da expectativa
+    de vida, cada caminho segue (com a mesma regra de retirada) até a idade
+    máxima da curva, e `lifetime_depletion_ages` traz o esgotamento nesse
+    horizonte estendido; dele vêm `longevity_ruin_probability` e
+    `survival_ruin_probability`, a chance de estar vivo quando o patrimônio
+    se esgota (ver `mortality`).
+
+    `stream_digests` traz o hash de cada fluxo de `STREAM_PATHS` caminhos e
+    `fingerprint` combina esses hashes com a configuração e os parâmetros
+    (ver `verify_monte_carlo`).
+    """
+
+    ages: np.ndarray
+    percentiles: Tuple[float, ...]
+    bands: np.ndarray
+    depletion_ages: np.ndarray
+    portfolio_at_retirement: np.ndarray
+    final_balances: np.ndarray
+    accumulation_months: int
+    settings: MonteCarloSettings = field(repr=False, default_factory=MonteCarloSettings)
+    lifespans: Optional[np.ndarray] = field(repr=False, default=None)
+    lifetime_depletion_ages: Optional[np.ndarray] = field(repr=False, default=None)
+    survival_ruin_probability: Optional[float] = None
+    stream_digests: Tuple[str, ...] = field(repr=False, default=())
+    fingerprint: str = ""
+
+    @property
+    def n_paths(self) -> int:
+        return len(self.final_balances)
+
+    @property
+    def success_probability(self) -> float:
+        """Fração dos caminhos em que o patrimônio não se esgota."""
+        return float(np.mean(np.isnan(self.depletion_ages)))
+
+    @property
+    def longevity_ruin_probability(self) -> Optional[float]:
+        """Fração dos caminhos em que o patrimônio se esgota antes da morte sorteada."""
+        if self.lifespans is None:
+            return None
+        return float(np.mean(self.lifetime_depletion_ages < self.lifespans))
+
+    @property
+    def beyond_horizon_probability(self) -> Optional[float]:
+        """Fração dos caminhos em que a pessoa vive além do fim da simulação."""
+        if self.lifespans is None:
+            return None
+        return float(np.mean(self.lifespans > self.ages[-1]))
+
+    def band(self, percentile: float) -> np.ndarray:
+        return self.bands[self.percentiles.index(percentile)]
+
+
+# -----------------------------------------------------------------------------
+# 3. GERAÇÃO DE RETORNOS
+# -----------------------------------------------------------------------------
+def draw_monthly_returns(
+    annual_rate: float,
+    annual_volatility: float,
+    n_paths: int,
+    months: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Sorteia retornos mensais log-normais com formato (caminhos × meses).
+
+    O retorno bruto esperado de cada mês é igual à taxa mensal determinística
+    equivalente a `annual_rate`. A matriz é gerada em ordem mês-a-mês e
+    devolvida transposta, de modo que ``returns.T`` é contígua e a recursão
+    percorre um mês de todos os caminhos sem saltos de memória.
+    """
+    sigma = annual_volatility / 100 / math.sqrt(12)
+    mu = math.log(1 + annual_rate / 100) / 12 - sigma ** 2 / 2
+    returns = rng.standard_normal((months, n_paths))
+    returns *= sigma
+    returns += mu
+    np.expm1(returns, out=returns)
+    return returns.T
+
+
+def months_beyond_horizon(config: SimulationConfig, age: float) -> int:
+    """Meses entre a expectativa de vida da configuração e `age` (zero se `age` vier antes)."""
+    horizon_age = config.retirement_age + config.retirement_months / 12
+    return max(int(math.ceil(round((age - horizon_age) * 12, 6))), 0)
+
+
+def draw_beyond_returns(
+    config: SimulationConfig,
+    settings: MonteCarloSettings,
+    n_paths: int,
+    months: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Retornos mensais (caminhos × meses) dos meses seguintes ao fim da aposentadoria simulada."""
+    if settings.asset_model is None:
+        return draw_monthly_returns(config.annual_rate_ret, settings.volatility_ret, n_paths, months, rng)
+    ages = config.retirement_age + (config.retirement_months + np.arange(months)) / 12
+    weights = settings.asset_model.glide_path.weights_at(ages)
+    return draw_portfolio_returns(settings.asset_model, weights, n_paths, rng, settings.chunk_paths)
+
+
+def draw_phase_returns(
+    config: SimulationConfig,
+    settings: MonteCarloSettings,
+    n_paths: int,
+    rng: np.random.Generator,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Retornos mensais (caminhos × meses) da acumulação e da aposentadoria."""
+    acc_months = config.accumulation_months
+    if settings.asset_model is None:
+        returns_acc = draw_monthly_returns(config.annual_rate_acc, settings.volatility_acc, n_paths, acc_months, rng)
+        returns_ret = draw_monthly_returns(
+            config.annual_rate_ret, settings.volatility_ret, n_paths, config.retirement_months, rng
+        )
+        return returns_acc, returns_ret
+    ages = month_start_ages(config.current_age, config.retirement_age, acc_months, config.retirement_months)
+    weights = settings.asset_model.glide_path.weights_at(ages)
+    returns = draw_portfolio_returns(settings.asset_model, weights, n_paths, rng, settings.chunk_paths)
+    return returns[:, :acc_months], returns[:, acc_months:]
+
+
+# -----------------------------------------------------------------------------
+# 4. RECURSÃO VETORIZADA
+# -----------------------------------------------------------------------------
+def simulate_paths(
+    config: SimulationConfig,
+    returns_acc: np.ndarray,
+    returns_ret: np.ndarray,
+    out: Optional[np.ndarray] = None,
+    returns_beyond: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Avança todos os caminhos pelas duas fases.
+
+    Recebe matrizes de retornos mensais (caminhos × meses) e devolve os saldos
+    em ordem mês-a-mês (meses × caminhos) e o índice do mês de esgotamento de
+    cada caminho (``-1`` quando não se esgota). Após o esgotamento o saldo é
+    mantido em zero. Nas regras dinâmicas a retirada de cada mês é decidida
+    para todos os caminhos de uma vez, a partir dos saldos do mês. Com
+    `out` (meses × caminhos, por exemplo um trecho da matriz de todos os
+    fluxos), os saldos são gravados nele.
+
+    Com `returns_beyond` (caminhos × meses após o horizonte), a recursão
+    continua depois da expectativa de vida com a mesma regra de retirada,
+    só para registrar o esgotamento: os saldos desses meses não são
+    guardados e o mês de esgotamento pode passar de ``retirement_months``.
+    """
+    acc_months = config.accumulation_months
+    ret_months = config.retirement_months
+    rates_acc = np.ascontiguousarray(np.asarray(returns_acc).T)
+    rates_ret = np.ascontiguousarray(np.asarray(returns_ret).T)
+    n_paths = rates_acc.shape[1]
+    if rates_acc.shape[0] != acc_months or rates_ret.shape != (ret_months, n_paths):
+        raise ValueError("As matrizes de retornos não correspondem aos meses da simulação.")
+    if returns_beyond is not None:
+        rates_ret = np.concatenate([rates_ret, np.asarray(returns_beyond).T])
+    total_months = len(rates_ret)
+
+    balances = np.empty((acc_months + 1 + ret_months, n_paths)) if out is None else out
+    balance = np.full(n_paths, float(config.total_investments_today))
+    balances[0] = balance
+    for m in range(acc_months):
+        balance *= 1 + rates_acc[m]
+        balance += config.monthly_investment
+        balances[m + 1] = balance
+
+    policy = None
+    if config.strategy_mode == MODE_CUSTOM:
+        withdrawals = config.monthly_expenses - retirement_income_schedule(config, total_months)
+        per_path = False
+    elif config.dynamic_withdrawal:
+        policy = withdrawal_policy(balance.copy(), config)
+    else:
+        # Cada caminho calcula a retirada sobre o seu próprio saldo inicial.
+        withdrawals = strategy_withdrawal(balance.copy(), config)
+        per_path = True
+
+    depletion_month = np.full(n_paths, -1)
+    alive = np.ones(n_paths, dtype=bool)
+    offset = acc_months + 1
+    for m in range(total_months):
+        balance *= 1 + rates_ret[m]
+        if policy is not None:
+            balance -= policy.withdrawal(m, balance)
+        else:
+            balance -= withdrawals if per_path else withdrawals[m]
+        newly_depleted = alive & (balance < 0)
+        if newly_depleted.any():
+            depletion_month[newly_depleted] = m + 1
+            alive &= ~newly_depleted
+        balance[~alive] = 0.0
+        if m < ret_months:
+            balances[offset + m] = balance
+    return balances, depletion_month
+
+
+# -----------------------------------------------------------------------------
+# 5. ORQUESTRAÇÃO
+# -----------------------------------------------------------------------------
+def resolve_seed(settings: MonteCarloSettings) -> MonteCarloSettings:
+    """Configurações com uma semente definida (sorteia uma nova se `seed` for ``None``).
+
+    A semente sorteada tem 53 bits: cabe no campo inteiro da interface (que
+    aceita até ``2**53 - 1``), em qualquer cliente JSON e no `config_hash`,
+    que normaliza os números para `float`.
+    """
+    if settings.seed is not None:
+        return settings
+    return dataclasses.replace(settings, seed=int(np.random.SeedSequence().entropy) % 2 ** 53)
+
+
+def n_streams(n_paths: int) -> int:
+    return -(-n_paths // STREAM_PATHS)
+
+
+def stream_rng(seed: int, index: int) -> np.random.Generator:
+    """Gerador do fluxo `index`: o mesmo filho de ``SeedSequence(seed).spawn``, sem criar os anteriores."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+
+
+def simulate_stream(
+    config: SimulationConfig,
+    settings: MonteCarloSettings,
+    index: int,
+    survival: Optional[SurvivalCurve] = None,
+    out: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """Simula os caminhos do fluxo `index` (até `STREAM_PATHS`) com o seu próprio gerador.
+
+    Devolve os saldos (meses × caminhos), o mês de esgotamento e, com
+    `survival`, as idades de morte, sorteadas depois dos retornos; em
+    seguida são sorteados os retornos dos meses até a idade máxima da curva,
+    e o esgotamento é acompanhado até lá (ver `simulate_paths`). O
+    resultado depende só da semente e de `index`, não de quais outros fluxos
+    são simulados nem onde. `settings.seed` deve estar definida; `out` é
+    repassado a `simulate_paths`.
+    """
+    first_path = index * STREAM_PATHS
+    n_paths = min(STREAM_PATHS, settings.n_paths - first_path)
+    rng = stream_rng(settings.seed, index)
+    returns_acc, returns_ret = draw_phase_returns(config, settings, n_paths, rng)
+    lifespans = returns_beyond = None
+    if survival is not None:
+        lifespans = survival.draw_lifespans(n_paths, rng)
+        months = months_beyond_horizon(config, float(survival.ages[-1]))
+        returns_beyond = draw_beyond_returns(config, settings, n_paths, months, rng)
+    balances, depletion_month = simulate_paths(config, returns_acc, returns_ret, out, returns_beyond)
+    return balances, depletion_month, lifespans
+
+
+def stream_digest(balances: np.ndarray, depletion_month: np.ndarray, lifespans: Optional[np.ndarray]) -> str:
+    """Hash (SHA-256) de um fluxo: saldos de 12 em 12 meses e do último mês, esgotamentos e idades de morte."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(balances[::12]).tobytes())
+    digest.update(balances[-1].tobytes())
+    digest.update(depletion_month.astype(np.int64).tobytes())
+    if lifespans is not None:
+        digest.update(lifespans.tobytes())
+    return digest.hexdigest()
+
+
+def monte_carlo_fingerprint(config: SimulationConfig, settings: MonteCarloSettings, digests: Sequence[str]) -> str:
+    """Impressão digital do resultado: configuração, parâmetros (com a semente) e hash de cada fluxo."""
+    return config_hash(config, settings, STREAM_PATHS, list(digests))
+
+
+def run_monte_carlo(
+    config: SimulationConfig,
+    settings: MonteCarloSettings = MonteCarloSettings(),
+    survival: Optional[SurvivalCurve] = None,
+    workers: Optional[int] = None,
+) -> MonteCarloResult:
+    """Executa a simulação estocástica e resume a distribuição dos caminhos.
+
+    Os caminhos são simulados por fluxo (ver `simulate_stream`); com
+    `workers` > 1, os fluxos são distribuídos entre processos e o resultado
+    é idêntico, bit a bit, ao da execução em um único processo.
+
+    Com `survival` (a curva a partir da idade atual), sorteia também uma
+    idade de morte por caminho, depois dos retornos de cada fluxo, de modo
+    que os caminhos são os mesmos com ou sem a curva, e acompanha o
+    esgotamento de cada caminho além da expectativa de vida, até a idade
+    máxima da curva.
+    """
+    config.validate()
+    if settings.asset_model is not None:
+        settings.asset_model.validate()
+    settings = resolve_seed(settings)
+    indices = range(n_streams(settings.n_paths))
+    balances = np.empty((config.accumulation_months + 1 + config.retirement_months, settings.n_paths))
+    depletion_month = np.empty(settings.n_paths, dtype=int)
+    lifespans = np.empty(settings.n_paths) if survival is not None else None
+    digests: List[str] = []
+
+    def collect(index: int, stream_balances: np.ndarray, stream_depletion: np.ndarray,
+                stream_lifespans: Optional[np.ndarray]) -> None:
+        paths = slice(index * STREAM_PATHS, index * STREAM_PATHS + stream_balances.shape[1])
+        if stream_balances.base is not balances:
+            balances[:, paths] = stream_balances
+        depletion_month[paths] = stream_depletion
+        if lifespans is not None:
+            lifespans[paths] = stream_lifespans
+        digests.append(stream_digest(stream_balances, stream_depletion, stream_lifespans))
+
+    if workers is not None and workers > 1 and len(indices) > 1:
+        # Os fluxos chegam na ordem dos índices e são copiados para o seu trecho.
+        with ProcessPoolExecutor(max_workers=min(workers, len(indices))) as executor:
+            streams = executor.map(simulate_stream, repeat(config), repeat(settings), indices, repeat(survival))
+            for index, stream in zip(indices, streams):
+                collect(index, *stream)
+    else:
+        # Em um só processo, cada fluxo grava os saldos direto no seu trecho.
+        for index in indices:
+            paths = slice(index * STREAM_PATHS, (index + 1) * STREAM_PATHS)
+            collect(index, *simulate_stream(config, settings, index, survival, out=balances[:, paths]))
+
+    result = summarize_paths(config, balances, depletion_month, settings)
+    if lifespans is not None:
+        result.lifespans = lifespans
+        result.lifetime_depletion_ages = np.where(
+            depletion_month >= 0, config.retirement_age + depletion_month / 12, np.nan
+        )
+        result.survival_ruin_probability = survival_weighted_ruin(survival, result.lifetime_depletion_ages)
+    result.stream_digests = tuple(digests)
+    result.fingerprint = monte_carlo_fingerprint(config, settings, digests)
+    return result
+
+
+def verify_monte_carlo(
+    config: SimulationConfig,
+    result: MonteCarloResult,
+    streams: Optional[Sequence[int]] = None,
+    survival: Optional[SurvivalCurve] = None,
+) -> bool:
+    """Confere um resultado (de um cache, do banco ou de outro processo) sem refazer todos os caminhos.
+
+    Verifica se a impressão digital corresponde à configuração, aos
+    parâmetros e aos hashes dos fluxos, e recalcula os fluxos `streams`
+    (por padrão, o primeiro e o último), comparando os seus hashes.
+    Resultados com idades de morte precisam da mesma curva `survival`.
+    """
+    settings = result.settings
+    if settings.seed is None or len(result.stream_digests) != n_streams(settings.n_paths):
+        return False
+    if result.fingerprint != monte_carlo_fingerprint(config, settings, result.stream_digests):
+        return False
+    if (result.lifespans is None) != (survival is None):
+        raise ValueError("Informe a curva de sobrevivência usada no resultado (e somente nesse caso).")
+    last = len(result.stream_digests) - 1
+    for index in sorted(set(streams if streams is not None else (0, last))):
+        if not 0 <= index <= last:
+            raise ValueError(f"Fluxo inexistente: {index} (o resultado tem {last + 1}).")
+        if stream_digest(*simulate_stream(config, settings, index, survival)) != result.stream_digests[index]:
+            return False
+    return True
+
+
+def iter_path_chunks(
+    config: SimulationConfig,
+    settings: MonteCarloSettings,
+    chunk_paths: int = STREAM_PATHS,
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """Simula os caminhos em blocos de fluxos inteiros, um bloco por vez.
+
+    Cada bloco reúne ``max(1, chunk_paths // STREAM_PATHS)`` fluxos.
+    Devolve, para cada bloco, o índice do primeiro caminho, os saldos
+    (meses × caminhos) e o mês de esgotamento; os caminhos são os mesmos de
+    `run_monte_carlo` com a mesma semente.
+    """
+    config.validate()
+    if settings.asset_model is not None:
+        settings.asset_model.validate()
+    settings = resolve_seed(settings)
+    per_block = max(1, chunk_paths // STREAM_PATHS)
+    total = n_streams(settings.n_paths)
+    for first_stream in range(0, total, per_block):
+        streams = [
+            simulate_stream(config, settings, index)
+            for index in range(first_stream, min(first_stream + per_block, total))
+        ]
+        balances = streams[0][0] if len(streams) == 1 else np.hstack([stream[0] for stream in streams])
+        depletion_month = np.concatenate([stream[1] for stream in streams])
+        yield first_stream * STREAM_PATHS, balances, depletion_month
+
+
+def summarize_paths(
+    config: SimulationConfig,
+    balances: np.ndarray,
+    depletion_month: np.ndarray,
+    settings: MonteCarloSettings = MonteCarloSettings(),
+) -> MonteCarloResult:
+    """Calcula faixas de percentis e a distribuição das idades de esgotamento.
+
+    Para evitar uma cópia da matriz (meses × caminhos), cada mês de
+    `balances` é ordenado no lugar; ordenar uma vez é mais rápido do que
+    particionar para cada percentil.
+    """
+    acc_months = config.accumulation_months
+    ages = simulation_timeline(config)
+    # Esgotamentos após o horizonte (ver `simulate_paths`) não contam aqui
+    within_horizon = (depletion_month >= 0) & (depletion_month <= config.retirement_months)
+    depletion_ages = np.where(within_horizon, config.retirement_age + depletion_month / 12, np.nan)
+    portfolio_at_retirement = balances[acc_months].copy()
+    final_balances = balances[-1].copy()
+    balances.sort(axis=1)
+    return MonteCarloResult(
+        ages=ages,
+        percentiles=tuple(settings.percentiles),
+        bands=sorted_percentiles(balances, settings.percentiles),
+        depletion_ages=depletion_ages,
+        portfolio_at_retirement=portfolio_at_retirement,
+        final_balances=final_balances,
+        accumulation_months=acc_months,
+        settings=settings,
+    )
+
+
+def sorted_percentiles(sorted_rows: np.ndarray, percentiles: Tuple[float, ...]) -> np.ndarray:
+    """Percentis (interpolação linear) de linhas já ordenadas, em formato (percentis × linhas)."""
+    n = sorted_rows.shape[1]
+    position = np.asarray(percentiles, dtype=float) / 100 * (n - 1)
+    lower = np.floor(position).astype(int)
+    upper = np.minimum(lower + 1, n - 1)
+    weight = position - lower
+    return (sorted_rows[:, lower] * (1 - weight) + sorted_rows[:, upper] * weight).T
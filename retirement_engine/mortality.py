@@ -0,0 +1,187 @@
+# =============================================================================
+# TÁBUAS DE MORTALIDADE E RISCO DE LONGEVIDADE
+# =============================================================================
+# Descrição: Lê tábuas de mortalidade locais (probabilidade anual de morte
+#            `qx` por idade e sexo) e deriva curvas de sobrevivência mensais,
+#            calculadas uma vez por tábua, sexo e idade atual. Com elas, o
+#            esgotamento do patrimônio é ponderado pela chance de a pessoa
+#            estar viva naquela idade, e a simulação de Monte Carlo sorteia
+#            uma idade de morte por caminho.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import csv
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Tuple, Union
+
+import numpy as np
+
+from .cache import LRUCache
+
+# -----------------------------------------------------------------------------
+# 2. TÁBUA DE MORTALIDADE
+# -----------------------------------------------------------------------------
+# Curvas e tábuas são compartilhadas entre as sessões do app (threads)
+_CACHE_LOCK = threading.Lock()
+_TABLE_CACHE = LRUCache(maxsize=8)
+_SURVIVAL_CACHE = LRUCache(maxsize=64)
+
+
+@dataclass
+class MortalityTable:
+    """Probabilidade de morte em um ano (`qx`, em fração) por idade inteira, uma coluna por sexo.
+
+    As idades são consecutivas; depois da última idade da tábua a morte é
+    certa.
+    """
+
+    ages: np.ndarray
+    qx: Dict[str, np.ndarray]
+    fingerprint: str = ""
+
+    @property
+    def sexes(self) -> Tuple[str, ...]:
+        return tuple(self.qx)
+
+    @property
+    def max_age(self) -> int:
+        return int(self.ages[-1]) + 1
+
+    def survival_curve(self, sex: str, current_age: float) -> "SurvivalCurve":
+        """Curva de sobrevivência a partir de `current_age` (calculada uma vez e mantida em cache)."""
+        if sex not in self.qx:
+            raise ValueError(f"Sexo não encontrado na tábua: {sex!r} (disponíveis: {', '.join(self.sexes)}).")
+        key = (self.fingerprint or id(self), sex, round(float(current_age), 6))
+        with _CACHE_LOCK:
+            curve = _SURVIVAL_CACHE.get(key)
+        if curve is None:
+            curve = build_survival_curve(self.ages, self.qx[sex], current_age)
+            with _CACHE_LOCK:
+                _SURVIVAL_CACHE.put(key, curve)
+        return curve
+
+
+def _parse_csv(path: Path) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Lê um CSV com a idade na primeira coluna e o `qx` de cada sexo nas demais."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        if len(header) < 2:
+            raise ValueError("A tábua de mortalidade precisa de uma coluna de idade e ao menos uma de qx.")
+        rows = []
+        for line_number, row in enumerate(reader, start=2):
+            if not row:
+                continue
+            try:
+                rows.append([float(value) for value in row])
+            except ValueError:
+                raise ValueError(f"Valor não numérico na linha {line_number} de {path.name}.") from None
+    values = np.asarray(rows, dtype=float).reshape(len(rows), len(header))
+    ages = values[:, 0]
+    if not len(ages) or np.any(np.diff(ages) != 1) or np.any(ages != np.round(ages)):
+        raise ValueError(f"As idades de {path.name} devem ser inteiras e consecutivas.")
+    qx = values[:, 1:]
+    if not np.all((qx >= 0) & (qx <= 1)):
+        raise ValueError(f"{path.name} contém qx fora do intervalo de 0 a 1.")
+    return ages.astype(int), {name.strip(): qx[:, i].copy() for i, name in enumerate(header[1:])}
+
+
+def load_mortality_table(path: Union[str, Path]) -> MortalityTable:
+    """Carrega a tábua de um CSV local (``idade,Masculino,Feminino``), com cache por arquivo.
+
+    A leitura é refeita se o arquivo for alterado.
+    """
+    path = Path(path)
+    stat = path.stat()
+    fingerprint = f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+    with _CACHE_LOCK:
+        table = _TABLE_CACHE.get(fingerprint)
+    if table is None:
+        ages, qx = _parse_csv(path)
+        table = MortalityTable(ages, qx, fingerprint)
+        with _CACHE_LOCK:
+            _TABLE_CACHE.put(fingerprint, table)
+    return table
+
+
+# -----------------------------------------------------------------------------
+# 3. CURVA DE SOBREVIVÊNCIA
+# -----------------------------------------------------------------------------
+@dataclass
+class SurvivalCurve:
+    """Probabilidade de estar vivo em cada mês a partir de `start_age`.
+
+    ``survival[t]`` vale para a idade ``start_age + t / 12``; começa em 1 e
+    termina em 0 na idade máxima da tábua.
+    """
+
+    start_age: float
+    survival: np.ndarray
+
+    @property
+    def ages(self) -> np.ndarray:
+        return self.start_age + np.arange(len(self.survival)) / 12
+
+    @property
+    def life_expectancy(self) -> float:
+        """Idade esperada de morte (regra dos trapézios sobre a curva mensal)."""
+        return self.start_age + float(self.survival[:-1].sum() + self.survival[1:].sum()) / 24
+
+    def probability_alive(self, ages: Any) -> np.ndarray:
+        """Probabilidade de estar vivo em cada idade de `ages` (interpolação linear; ``NaN`` → 0)."""
+        ages = np.asarray(ages, dtype=float)
+        months = (ages - self.start_age) * 12
+        alive = np.interp(months, np.arange(len(self.survival)), self.survival, left=1.0, right=0.0)
+        return np.where(np.isnan(ages), 0.0, alive)
+
+    def age_at_probability(self, probability: float) -> float:
+        """Idade em que a chance de estar vivo cai para `probability` (ex.: 0,1 → 10% sobrevivem)."""
+        month = int(np.searchsorted(-self.survival, -probability, side="left"))
+        return self.start_age + min(month, len(self.survival) - 1) / 12
+
+    def draw_lifespans(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """Sorteia `n` idades de morte pela inversa da curva (um único ``searchsorted``).
+
+        A morte ocorre no mês em que a sobrevivência cruza um número uniforme
+        sorteado, no ponto do mês dado pela mesma interpolação linear de
+        `probability_alive`; assim a fração de idades sorteadas acima de
+        ``x`` converge para ``probability_alive(x)``.
+        """
+        uniforms = rng.random(n)
+        months = np.searchsorted(-self.survival, -uniforms, side="left")
+        before, after = self.survival[months - 1], self.survival[months]
+        fraction = (before - uniforms) / (before - after)
+        return self.start_age + (months - 1 + fraction) / 12
+
+
+def build_survival_curve(ages: np.ndarray, qx: np.ndarray, current_age: float) -> SurvivalCurve:
+    """Curva mensal a partir de `current_age`, com força de mortalidade constante em cada ano de idade.
+
+    A sobrevivência mensal na idade ``x`` é ``(1 - qx[x]) ** (1 / 12)``; antes
+    da primeira idade da tábua vale o primeiro `qx`.
+    """
+    n_months = max(int(np.ceil((ages[-1] + 1 - current_age) * 12)), 1)
+    month_ages = current_age + np.arange(n_months) / 12
+    index = np.clip(np.floor(month_ages).astype(int) - ages[0], 0, len(ages) - 1)
+    q = np.where(month_ages >= ages[-1] + 1, 1.0, qx[index])
+    monthly = np.power(1 - q, np.full(n_months, 1 / 12))
+    survival = np.concatenate([[1.0], np.cumprod(monthly)])
+    survival[-1] = 0.0
+    return SurvivalCurve(float(current_age), survival)
+
+
+# -----------------------------------------------------------------------------
+# 4. RISCO DE LONGEVIDADE
+# -----------------------------------------------------------------------------
+def survival_weighted_ruin(curve: SurvivalCurve, depletion_ages: Any) -> float:
+    """Probabilidade de estar vivo quando o patrimônio se esgota.
+
+    É a média, sobre os cenários, da sobrevivência na idade de esgotamento
+    (``NaN`` — sem esgotamento no horizonte — conta como 0). Com um único
+    cenário (a simulação determinística) é a sobrevivência naquela idade.
+    """
+    return float(np.mean(curve.probability_alive(depletion_ages)))
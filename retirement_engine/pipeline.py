@@ -0,0 +1,258 @@
+# =============================================================================
+# RECÁLCULO INCREMENTAL POR ETAPAS
+# =============================================================================
+# Descrição: Divide a simulação determinística em etapas (acumulação →
+#            renda → aposentadoria → apresentação), cada uma com um cache
+#            próprio indexado pela impressão digital das suas entradas. A cada
+#            execução só as etapas cujas entradas mudaram são recalculadas;
+#            as demais são reaproveitadas e o relatório indica quais foram.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from .cache import LRUCache, SharedCache
+from .core import (
+    MODE_CUSTOM,
+    MODE_STRATEGY,
+    SimulationConfig,
+    SimulationResult,
+    assemble_result,
+    build_income_matrix,
+    config_hash,
+    fingerprint,
+    simulate_accumulation,
+    simulate_retirement,
+)
+from .store import ResultStore
+
+# -----------------------------------------------------------------------------
+# 2. ETAPAS
+# -----------------------------------------------------------------------------
+STAGE_ACCUMULATION = "accumulation"
+STAGE_INCOME = "income"
+STAGE_RETIREMENT = "retirement"
+STAGE_PRESENTATION = "presentation"
+STAGES: Tuple[str, ...] = (STAGE_ACCUMULATION, STAGE_INCOME, STAGE_RETIREMENT, STAGE_PRESENTATION)
+
+STAGE_LABELS = {
+    STAGE_ACCUMULATION: "Acumulação",
+    STAGE_INCOME: "Renda",
+    STAGE_RETIREMENT: "Aposentadoria",
+    STAGE_PRESENTATION: "Apresentação",
+}
+
+
+@dataclass
+class StageReport:
+    """Quantas unidades de cada etapa foram reaproveitadas ou recalculadas.
+
+    A etapa de renda conta uma unidade por fonte; a de apresentação, uma por
+    gráfico solicitado.
+    """
+
+    reused: Dict[str, int] = field(default_factory=dict)
+    recomputed: Dict[str, int] = field(default_factory=dict)
+    from_store: bool = False
+
+    def record(self, stage: str, reused: bool) -> None:
+        counts = self.reused if reused else self.recomputed
+        counts[stage] = counts.get(stage, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"reused": dict(self.reused), "recomputed": dict(self.recomputed), "from_store": self.from_store}
+
+    def was_recomputed(self, stage: str) -> bool:
+        return self.recomputed.get(stage, 0) > 0
+
+    def summary(self) -> str:
+        """Resumo em uma linha, por exemplo ``Acumulação: reaproveitada · Renda: 1 de 3 recalculadas``."""
+        parts = []
+        for stage in STAGES:
+            n_reused = self.reused.get(stage, 0)
+            n_recomputed = self.recomputed.get(stage, 0)
+            total = n_reused + n_recomputed
+            if not total:
+                continue
+            if not n_recomputed:
+                status = "reaproveitada"
+            elif not n_reused:
+                status = "recalculada"
+            else:
+                status = f"{n_recomputed} de {total} recalculadas"
+            parts.append(f"{STAGE_LABELS[stage]}: {status}")
+        if self.from_store:
+            parts.append("resultado lido do armazenamento")
+        return " · ".join(parts)
+
+
+# -----------------------------------------------------------------------------
+# 3. SIMULADOR INCREMENTAL
+# -----------------------------------------------------------------------------
+class StagedSimulator:
+    """Executa `run_simulation` reaproveitando as etapas cujas entradas não mudaram.
+
+    As impressões digitais incluem apenas o que cada etapa lê:
+
+    - acumulação: meses até a aposentadoria, aportes e taxa (não a data de
+      nascimento em si, de modo que mudá-la sem alterar o número de meses
+      reaproveita os saldos);
+    - renda: cada fonte separadamente, com o trecho da aposentadoria
+      indexado pela idade de aposentadoria e pela expectativa de vida, e o
+      trecho da acumulação pela idade atual (fontes que só começam depois
+      da acumulação não dependem dela);
+    - aposentadoria: saldo acumulado, renda da aposentadoria e parâmetros
+      de retirada;
+    - apresentação: o resultado e as opções de cada gráfico (ver `present`).
+
+    Com um `ResultStore`, resultados que não estão na memória são procurados
+    no banco antes de simular, e os calculados são gravados nele, de modo que
+    sobrevivem a reinícios e são compartilhados com outros processos.
+
+    Com um `SharedCache`, os resultados completos e os objetos da etapa de
+    apresentação ficam nele (compartilhados entre as sessões do processo);
+    só os caches das etapas intermediárias continuam próprios do simulador.
+
+    Os valores numéricos são idênticos aos de `run_simulation`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 32,
+        store: Optional[ResultStore] = None,
+        shared: Optional[SharedCache] = None,
+    ):
+        self.store = store
+        self.shared = shared
+        self._caches: Dict[str, Any] = {stage: LRUCache(maxsize) for stage in STAGES}
+        # Uma entrada por fonte e trecho da linha do tempo
+        self._caches[STAGE_INCOME] = LRUCache(maxsize * 8)
+        self._results: Any = LRUCache(maxsize)
+        if shared is not None:
+            self._caches[STAGE_PRESENTATION] = shared
+            self._results = shared
+        self.last_report = StageReport()
+
+    def _lookup(self, stage: str, key: Hashable, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        computed = []
+
+        def tracked() -> Any:
+            computed.append(True)
+            return compute()
+
+        # Conta como reaproveitada se esta chamada não calculou o valor (com o
+        # cache compartilhado, ele pode ter sido calculado por outra sessão).
+        return self._caches[stage].get_or_compute(key, tracked), not computed
+
+    def run(self, config: SimulationConfig, dtype: Any = np.float64) -> SimulationResult:
+        """Simulação determinística; o relatório da execução fica em `last_report`."""
+        config.validate()
+        report = StageReport()
+        self.last_report = report
+
+        result_key = config_hash(config, np.dtype(dtype).name)
+        cached = self._results.get(result_key)
+        if cached is not None:
+            for stage in (STAGE_ACCUMULATION, STAGE_INCOME, STAGE_RETIREMENT):
+                report.record(stage, reused=True)
+            return cached
+        if self.store is not None:
+            stored = self.store.get(config, dtype)
+            if stored is not None:
+                for stage in (STAGE_ACCUMULATION, STAGE_INCOME, STAGE_RETIREMENT):
+                    report.record(stage, reused=True)
+                report.from_store = True
+                self._results.put(result_key, stored)
+                return stored
+
+        # Acumulação: os saldos não dependem da idade atual, só do número de meses.
+        acc_months = config.accumulation_months
+        acc_key = fingerprint(
+            STAGE_ACCUMULATION,
+            acc_months,
+            config.total_investments_today,
+            config.monthly_investment,
+            config.annual_rate_acc,
+        )
+        (_, acc_balances), hit = self._lookup(STAGE_ACCUMULATION, acc_key, lambda: simulate_accumulation(config))
+        report.record(STAGE_ACCUMULATION, hit)
+        acc_ages = config.current_age + np.arange(acc_months + 1) / 12
+        retire_ages = config.retirement_age + np.arange(1, config.retirement_months + 1) / 12
+
+        # Renda: uma linha por fonte, em dois trechos da linha do tempo.
+        income_keys: List[str] = []
+        acc_rows: List[np.ndarray] = []
+        retire_rows: List[np.ndarray] = []
+        for source in config.income_sources:
+            retire_key = fingerprint(STAGE_INCOME, source, config.retirement_age, config.retirement_months)
+            retire_row, retire_hit = self._lookup(
+                STAGE_INCOME, retire_key, lambda source=source: build_income_matrix((source,), retire_ages)[0]
+            )
+            if source.income_start_age > acc_ages[-1]:
+                acc_row, acc_hit = np.zeros(acc_months + 1), True
+            else:
+                acc_row, acc_hit = self._lookup(
+                    STAGE_INCOME,
+                    fingerprint(STAGE_INCOME, source, config.current_age, acc_months),
+                    lambda source=source: build_income_matrix((source,), acc_ages)[0],
+                )
+            report.record(STAGE_INCOME, retire_hit and acc_hit)
+            income_keys.append(retire_key)
+            acc_rows.append(acc_row)
+            retire_rows.append(retire_row)
+        income_ages = np.concatenate([acc_ages, retire_ages])
+        if config.income_sources:
+            income_matrix = np.hstack([np.vstack(acc_rows), np.vstack(retire_rows)])
+        else:
+            income_matrix = np.zeros((0, len(income_ages)))
+
+        # Aposentadoria: depende da acumulação e da renda apenas pelas chaves acima.
+        retirement_key = fingerprint(
+            STAGE_RETIREMENT,
+            acc_key,
+            income_keys,
+            config.retirement_age,
+            config.life_expectancy,
+            config.annual_rate_ret,
+            config.strategy_mode,
+            config.monthly_expenses if config.strategy_mode == MODE_CUSTOM else None,
+            config.strategy_type if config.strategy_mode == MODE_STRATEGY else None,
+            config.withdrawal_rule if config.dynamic_withdrawal else None,
+        )
+        retirement, hit = self._lookup(
+            STAGE_RETIREMENT,
+            retirement_key,
+            lambda: simulate_retirement(
+                config, float(acc_balances[-1]), income_matrix[:, acc_months + 1:].sum(axis=0)
+            ),
+        )
+        report.record(STAGE_RETIREMENT, hit)
+
+        result = assemble_result(config, acc_ages, acc_balances, retirement, income_ages, income_matrix, dtype)
+        self._results.put(result_key, result)
+        if self.store is not None and result.columns.dtype == np.float64:
+            self.store.put(config, result)
+        return result
+
+    def present(self, name: str, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Etapa de apresentação: devolve o objeto `name` (por exemplo, um gráfico) em cache.
+
+        `key` deve identificar tudo o que `build` lê, normalmente a chave do
+        resultado e as opções de exibição. O uso é registrado em `last_report`.
+        """
+        value, hit = self._lookup(STAGE_PRESENTATION, (name, key), build)
+        self.last_report.record(STAGE_PRESENTATION, hit)
+        return value
+
+    def clear(self) -> None:
+        """Esvazia os caches próprios do simulador (o cache compartilhado é mantido)."""
+        for cache in self._caches.values():
+            if cache is not self.shared:
+                cache.clear()
+        if self._results is not self.shared:
+            self._results.clear()
@@ -0,0 +1,171 @@
+# =============================================================================
+# DIAGNÓSTICO DE DESEMPENHO
+# =============================================================================
+# Descrição: Instrumentação opcional de uma execução da interface: tempo de
+#            cada seção, tamanho dos arrays produzidos e acertos dos caches.
+#            Ao final, o perfil é registrado como uma única linha JSON, fácil
+#            de agregar em produção.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import datetime
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from .cache import LRUCache
+
+# -----------------------------------------------------------------------------
+# 2. ATIVAÇÃO E REGISTRO
+# -----------------------------------------------------------------------------
+# Variável de ambiente que ativa o diagnóstico em todas as sessões
+PROFILE_ENV_VAR = "RETIREMENT_PROFILE"
+LOGGER_NAME = "retirement_engine.profile"
+
+_TRUE_VALUES = ("1", "true", "yes", "on", "sim")
+
+
+def profiling_requested(flag: Optional[str] = None) -> bool:
+    """Diagnóstico ativo se `flag` (ex.: ``?profile=1`` na URL) ou `PROFILE_ENV_VAR` pedirem."""
+    for value in (flag, os.environ.get(PROFILE_ENV_VAR)):
+        if value is not None and str(value).strip().lower() in _TRUE_VALUES:
+            return True
+    return False
+
+
+def profile_logger() -> logging.Logger:
+    """Logger das linhas JSON; sem configuração externa, escreve em stderr."""
+    logger = logging.getLogger(LOGGER_NAME)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+# -----------------------------------------------------------------------------
+# 3. PERFIL DE UMA EXECUÇÃO
+# -----------------------------------------------------------------------------
+class RunProfile:
+    """Tempos, tamanhos e caches de uma execução.
+
+    `lap` fecha uma seção sequencial (o tempo desde a volta anterior);
+    `section` mede um trecho pontual, que pode se repetir e é acumulado.
+    O tempo medido por `section` é descontado da volta em andamento, de
+    modo que a soma de todas as seções é o tempo total.
+
+    As medições são sempre feitas (custam microssegundos); `enabled` só
+    controla o registro da linha JSON em `finish`.
+    """
+
+    def __init__(self, enabled: bool = False, clock: Callable[[], float] = time.perf_counter):
+        self.enabled = enabled
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self.sections: Dict[str, float] = {}
+        self.arrays: Dict[str, Dict[str, Any]] = {}
+        self.caches: Dict[str, Dict[str, int]] = {}
+        self.extra: Dict[str, Any] = {}
+        self.finished = False
+        self._clock = clock
+        self._start = self._last_lap = clock()
+        self._end: Optional[float] = None
+        self._sections_in_lap = 0.0
+        self._tracked: Dict[str, Tuple[LRUCache, int, int]] = {}
+
+    def _add(self, name: str, seconds: float) -> None:
+        self.sections[name] = self.sections.get(name, 0.0) + seconds
+
+    def lap(self, name: str) -> None:
+        now = self._clock()
+        self._add(name, now - self._last_lap - self._sections_in_lap)
+        self._last_lap = now
+        self._sections_in_lap = 0.0
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        start = self._clock()
+        try:
+            yield
+        finally:
+            elapsed = self._clock() - start
+            self._add(name, elapsed)
+            self._sections_in_lap += elapsed
+
+    def deferred(self, name: str, compute: Callable[[], Any]) -> Callable[[], Any]:
+        """Envolve um cálculo adiado (ex.: arquivo de download gerado sob demanda).
+
+        Se ele rodar depois de `finish`, o tempo é registrado em uma linha
+        JSON própria, com o mesmo `run_id`.
+        """
+
+        def timed() -> Any:
+            start = self._clock()
+            value = compute()
+            elapsed = self._clock() - start
+            if not self.finished:
+                self._add(name, elapsed)
+                self._sections_in_lap += elapsed
+            elif self.enabled:
+                self._emit({"event": "deferred", "run_id": self.run_id, "section": name, "ms": round(elapsed * 1000, 3)})
+            return value
+
+        return timed
+
+    def record_array(self, name: str, array: np.ndarray) -> None:
+        self.arrays[name] = {"shape": list(array.shape), "dtype": str(array.dtype), "nbytes": int(array.nbytes)}
+
+    def track_cache(self, name: str, cache: LRUCache) -> None:
+        """Passa a contar os acertos e faltas de `cache` a partir deste ponto."""
+        self._tracked[name] = (cache, cache.hits, cache.misses)
+
+    def record(self, name: str, value: Any) -> None:
+        """Valor adicional (serializável em JSON) incluído na linha do perfil."""
+        self.extra[name] = value
+
+    @property
+    def total_seconds(self) -> float:
+        end = self._end if self._end is not None else self._clock()
+        return end - self._start
+
+    def to_dict(self) -> Dict[str, Any]:
+        caches = dict(self.caches)
+        for name, (cache, hits, misses) in self._tracked.items():
+            caches[name] = {"hits": cache.hits - hits, "misses": cache.misses - misses, "size": len(cache)}
+        return {
+            "event": "rerun",
+            "run_id": self.run_id,
+            "timestamp": self.started_at.isoformat(timespec="milliseconds"),
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "sections_ms": {name: round(seconds * 1000, 3) for name, seconds in self.sections.items()},
+            "arrays": self.arrays,
+            "caches": caches,
+            **self.extra,
+        }
+
+    def finish(self) -> Dict[str, Any]:
+        """Encerra o perfil e, se ativo, registra a linha JSON. Devolve o perfil."""
+        if self.finished:
+            return self.to_dict()
+        self._end = self._clock()
+        profile = self.to_dict()
+        self.caches = profile["caches"]
+        self._tracked.clear()
+        self.finished = True
+        if self.enabled:
+            self._emit(profile)
+        return profile
+
+    def _emit(self, payload: Dict[str, Any]) -> None:
+        profile_logger().info(json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
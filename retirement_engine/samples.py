@@ -0,0 +1,69 @@
+# =============================================================================
+# CONFIGURAÇÕES DE REFERÊNCIA
+# =============================================================================
+# Descrição: Configurações sintéticas e determinísticas (data de referência
+#            fixa) usadas pelos benchmarks e pelos testes: horizontes de
+#            acumulação e aposentadoria e número de fontes de renda variam
+#            em grades fixas, para que os resultados sejam comparáveis entre
+#            execuções e máquinas.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import datetime
+from typing import Optional
+
+from .core import MODE_CUSTOM, IncomeSource, SimulationConfig
+
+# -----------------------------------------------------------------------------
+# 2. CONSTANTES
+# -----------------------------------------------------------------------------
+REFERENCE_DATE = datetime.date(2025, 1, 1)
+CURRENT_AGE = 30
+# Anos de aposentadoria e número de fontes de renda das grades de referência
+HORIZONS = (10, 20, 40, 80)
+SOURCE_COUNTS = (0, 10, 100)
+
+
+# -----------------------------------------------------------------------------
+# 3. CONFIGURAÇÕES
+# -----------------------------------------------------------------------------
+def make_config(
+    accumulation_years: int,
+    retirement_years: int,
+    n_sources: int = 0,
+    strategy_mode: str = MODE_CUSTOM,
+    strategy_type: Optional[str] = None,
+) -> SimulationConfig:
+    """Configuração de referência com `n_sources` fontes de renda variadas.
+
+    As fontes alternam entre vitalícias e temporárias (10 anos), com inícios
+    escalonados a partir da aposentadoria e reajustes de 0% a 1,5% ao ano.
+    """
+    retirement_age = CURRENT_AGE + accumulation_years
+    sources = tuple(
+        IncomeSource(
+            name=f"Fonte {i + 1}",
+            monthly_income=500.0 + 10 * i,
+            income_start_age=retirement_age + i % 15,
+            lifetime=i % 3 != 0,
+            duration_years=None if i % 3 != 0 else 10,
+            annual_rate=0.5 * (i % 4),
+        )
+        for i in range(n_sources)
+    )
+    return SimulationConfig(
+        birth_date=datetime.date(REFERENCE_DATE.year - CURRENT_AGE, REFERENCE_DATE.month, REFERENCE_DATE.day),
+        total_investments_today=100_000.0,
+        monthly_investment=2_000.0,
+        annual_rate_acc=5.0,
+        retirement_age=retirement_age,
+        life_expectancy=retirement_age + retirement_years,
+        annual_rate_ret=3.0,
+        strategy_mode=strategy_mode,
+        monthly_expenses=8_000.0 if strategy_mode == MODE_CUSTOM else None,
+        strategy_type=strategy_type,
+        income_sources=sources,
+        reference_date=REFERENCE_DATE,
+    )
@@ -0,0 +1,221 @@
+# =============================================================================
+# COMPARAÇÃO DE CENÁRIOS
+# =============================================================================
+# Descrição: Simula vários planos completos (por exemplo, o plano atual e
+#            alternativas com aposentadoria mais tarde ou aporte maior) em
+#            uma única computação vetorizada: cada cenário é uma coluna dos
+#            arrays, e todos são calculados juntos. Os resultados são
+#            `SimulationResult` comuns, idênticos aos de `run_simulation`.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .core import (
+    BALANCE_NOISE_TOLERANCE,
+    MODE_CUSTOM,
+    RESULT_COLUMNS,
+    STRATEGY_PERPETUAL,
+    ResultColumns,
+    SimulationConfig,
+    SimulationResult,
+    build_income_matrix,
+    first_negative_index,
+    geometric_path,
+    income_at_retirement,
+    linear_recurrence,
+    run_simulation,
+    simulation_timeline,
+    strategy_withdrawal,
+)
+from .withdrawal import WithdrawalPolicy
+
+# -----------------------------------------------------------------------------
+# 2. CENÁRIOS
+# -----------------------------------------------------------------------------
+@dataclass(frozen=True)
+class Scenario:
+    """Um plano com nome, para comparação lado a lado."""
+
+    name: str
+    config: SimulationConfig
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Scenario":
+        return cls(name=str(data["name"]), config=SimulationConfig.from_dict(data["config"]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "config": self.config.to_dict()}
+
+
+# -----------------------------------------------------------------------------
+# 3. SIMULAÇÃO EM LOTE
+# -----------------------------------------------------------------------------
+def simulate_scenarios(
+    configs: Sequence[SimulationConfig],
+    dtype: Any = np.float64,
+) -> List[SimulationResult]:
+    """Simula todas as configurações de uma vez, uma coluna por cenário.
+
+    As acumulações são alinhadas pelo fim, de modo que todos os cenários se
+    aposentam no mesmo mês da matriz; antes do seu início, um cenário apenas
+    mantém o saldo inicial. Os saldos vêm das mesmas fórmulas de
+    `run_simulation` aplicadas à matriz (meses × cenários); cenários com
+    regras de retirada dinâmicas são agrupados por regra e avançam mês a
+    mês, com a retirada de cada grupo decidida para todas as suas colunas de
+    uma vez. Cada cenário para no seu último mês ou no esgotamento. As
+    séries de todos os cenários ficam em um único bloco (cenários × colunas ×
+    meses); cada resultado expõe uma view do seu trecho. Um cenário cujas
+    fórmulas não dão valores finitos (taxas ou saldos extremos) é refeito
+    por `run_simulation`, que recorre à recursão mês a mês.
+    """
+    configs = list(configs)
+    for config in configs:
+        config.validate()
+    n = len(configs)
+    if not n:
+        return []
+
+    acc_months = np.array([config.accumulation_months for config in configs])
+    ret_months = np.array([config.retirement_months for config in configs])
+    max_acc = int(acc_months.max())
+    max_ret = int(ret_months.max())
+    custom = np.array([config.strategy_mode == MODE_CUSTOM for config in configs])
+    stops_on_depletion = custom | np.array([config.strategy_type != STRATEGY_PERPETUAL for config in configs])
+
+    # Acumulação alinhada pelo fim, pela série geométrica: (meses × cenários)
+    starts = max_acc - acc_months
+    elapsed = np.maximum(np.arange(max_acc + 1)[:, None] - starts, 0)
+    acc_balances = geometric_path(
+        np.array([config.total_investments_today for config in configs], dtype=float),
+        np.array([config.monthly_rate_acc for config in configs]),
+        np.array([config.monthly_investment for config in configs], dtype=float),
+        elapsed,
+    )
+    portfolio_at_retirement = acc_balances[-1].copy()
+
+    # Renda adicional e retiradas de cada mês da aposentadoria: (meses × cenários)
+    timelines = [simulation_timeline(config) for config in configs]
+    income_matrices = [build_income_matrix(config.income_sources, ages) for config, ages in zip(configs, timelines)]
+    additional_income = np.zeros((max_ret, n))
+    withdrawals = np.zeros((max_ret, n))
+    computed_withdrawal: List[Optional[float]] = [None] * n
+    initial_additional_income = [0.0] * n
+    for i, config in enumerate(configs):
+        if custom[i]:
+            additional_income[:ret_months[i], i] = income_matrices[i][:, acc_months[i] + 1:].sum(axis=0)
+            withdrawals[:, i] = config.monthly_expenses - additional_income[:, i]
+        else:
+            initial_additional_income[i] = income_at_retirement(config)
+            computed_withdrawal[i] = strategy_withdrawal(float(portfolio_at_retirement[i]), config)
+            additional_income[:, i] = initial_additional_income[i]
+            withdrawals[:, i] = computed_withdrawal[i]
+
+    # Retiradas fixas: anuidade (estratégia) ou recorrência linear (renda variável)
+    ret_rates = np.array([config.monthly_rate_ret for config in configs])
+    ret_growth = 1 + ret_rates
+    ret_balances = np.where(
+        custom,
+        linear_recurrence(portfolio_at_retirement, np.broadcast_to(ret_growth, (max_ret, n)), -withdrawals),
+        geometric_path(portfolio_at_retirement, ret_rates, -withdrawals[0], np.arange(1, max_ret + 1)[:, None]),
+    )
+
+    # Regras dinâmicas: recursão mês a mês, um grupo de colunas por regra
+    groups: Dict[Tuple[str, Any], List[int]] = {}
+    for i, config in enumerate(configs):
+        if config.dynamic_withdrawal:
+            groups.setdefault((config.strategy_type, config.withdrawal_rule), []).append(i)
+    for (strategy_type, rule), index in groups.items():
+        index = np.array(index)
+        policy = WithdrawalPolicy(
+            strategy_type, rule, portfolio_at_retirement[index], ret_rates[index], ret_months[index]
+        )
+        balance = portfolio_at_retirement[index]
+        scale = np.abs(balance)
+        for m in range(max_ret):
+            balance = balance * ret_growth[index]
+            withdrawals[m, index] = policy.withdrawal(m, balance)
+            balance = balance - withdrawals[m, index]
+            scale = scale * ret_growth[index] + np.abs(withdrawals[m, index])
+            balance[np.abs(balance) <= BALANCE_NOISE_TOLERANCE * scale] = 0.0
+            ret_balances[m, index] = balance
+
+    # Esgotamento: primeiro mês com saldo negativo, dentro do horizonte de cada cenário
+    depletion = np.where(stops_on_depletion, first_negative_index(ret_balances, ret_months), -1)
+    ret_lengths = np.where(depletion >= 0, depletion + 1, ret_months)
+    lengths = acc_months + 1 + ret_lengths
+
+    width = int(lengths.max())
+    block = np.full((n, len(RESULT_COLUMNS), width), np.nan, dtype=dtype)
+    columns = {name: block[:, k] for k, name in enumerate(RESULT_COLUMNS)}
+    months = np.arange(width, dtype=np.int32)
+    results = []
+    for i, config in enumerate(configs):
+        acc, ret = int(acc_months[i]), int(ret_lengths[i])
+        if not (np.isfinite(acc_balances[starts[i]:, i]).all() and np.isfinite(ret_balances[:ret, i]).all()):
+            results.append(run_simulation(config, dtype))
+            continue
+        retirement_part = slice(acc + 1, acc + 1 + ret)
+        columns["age"][i, :acc + 1 + ret] = timelines[i][:acc + 1 + ret]
+        columns["portfolio"][i, :acc + 1] = acc_balances[starts[i]:, i]
+        columns["portfolio"][i, retirement_part] = ret_balances[:ret, i]
+        columns["withdrawal"][i, retirement_part] = withdrawals[:ret, i]
+        columns["additional_income"][i, retirement_part] = additional_income[:ret, i]
+        results.append(SimulationResult(
+            columns=ResultColumns(months[:lengths[i]], block[i, :, :lengths[i]]),
+            current_age=config.current_age,
+            accumulation_months=acc,
+            retirement_months=config.retirement_months,
+            portfolio_at_retirement=float(portfolio_at_retirement[i]),
+            initial_additional_income=initial_additional_income[i],
+            computed_portfolio_withdrawal=computed_withdrawal[i],
+            recommended_total_spending=(
+                computed_withdrawal[i] + initial_additional_income[i] if computed_withdrawal[i] is not None else None
+            ),
+            income_ages=timelines[i],
+            income_matrix=income_matrices[i],
+            config=config,
+        ))
+    return results
+
+
+# -----------------------------------------------------------------------------
+# 4. RESUMO COMPARATIVO
+# -----------------------------------------------------------------------------
+def monthly_spending(result: SimulationResult) -> float:
+    """Gasto mensal total do plano: despesas informadas ou o gasto recomendado pela estratégia."""
+    if result.config.strategy_mode == MODE_CUSTOM:
+        return float(result.config.monthly_expenses)
+    return float(result.recommended_total_spending)
+
+
+def compare_scenarios(names: Sequence[str], results: Sequence[SimulationResult]) -> List[Dict[str, Any]]:
+    """Métricas de cada cenário e a diferença em relação ao primeiro (a referência).
+
+    `final_balance` e `depletion_age` são ``None`` quando não se aplicam (o
+    patrimônio se esgota, ou não se esgota, respectivamente).
+    """
+    rows = []
+    for name, result in zip(names, results):
+        rows.append({
+            "name": name,
+            "retirement_age": result.config.retirement_age,
+            "portfolio_at_retirement": result.portfolio_at_retirement,
+            "monthly_spending": monthly_spending(result),
+            "final_balance": None if result.depleted else result.final_balance,
+            "depletion_age": result.depletion_age,
+        })
+    if rows:
+        reference = rows[0]
+        for row in rows:
+            for key in ("portfolio_at_retirement", "monthly_spending", "final_balance", "depletion_age"):
+                if row[key] is None or reference[key] is None:
+                    row[f"delta_{key}"] = None
+                else:
+                    row[f"delta_{key}"] = row[key] - reference[key]
+    return rows
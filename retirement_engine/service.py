@@ -0,0 +1,554 @@
+# =============================================================================
+# SERVIÇO HTTP DE SIMULAÇÃO
+# =============================================================================
+# Descrição: Servidor HTTP/JSON local que recebe configurações no mesmo
+#            formato do JSON exportado pela interface e devolve as métricas
+#            resumidas ou as séries completas. As requisições são atendidas
+#            por threads, mas as simulações rodam em um pool limitado de
+#            processos: requisições determinísticas que chegam juntas são
+#            agrupadas em lotes simulados em uma única computação vetorizada,
+#            cada simulação de Monte Carlo é uma tarefa própria do pool, a
+#            fila é limitada (503 quando cheia) e cada requisição tem um tempo
+#            máximo de espera (504).
+#
+# Uso:
+#   python -m retirement_engine.service --port 8765 --workers 4
+#   curl -X POST localhost:8765/simulate -d @configuracoes_aposentadoria.json
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import argparse
+import concurrent.futures
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .core import MODE_STRATEGY, SimulationConfig, SimulationResult, config_hash
+from .monte_carlo import MonteCarloResult, MonteCarloSettings, run_monte_carlo
+from .scenarios import simulate_scenarios
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# 2. CONSTANTES
+# -----------------------------------------------------------------------------
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_BATCH_WAIT = 0.005
+DEFAULT_TIMEOUT = 30.0
+# Limites de cada requisição, para que um único cliente não ocupe o pool
+MAX_BODY_BYTES = 1024 ** 2
+MAX_PATHS = 100_000
+# Janela de latências usada nos percentis de /metrics
+LATENCY_WINDOW = 1000
+TIMEOUT_RESPONSE = (HTTPStatus.GATEWAY_TIMEOUT, {"error": "Tempo máximo de espera excedido."})
+
+
+class ServiceOverloaded(Exception):
+    """A fila de requisições está cheia."""
+
+
+# -----------------------------------------------------------------------------
+# 3. PROCESSAMENTO (EXECUTADO NOS PROCESSOS DO POOL)
+# -----------------------------------------------------------------------------
+def parse_request(data: Any) -> Tuple[SimulationConfig, bool, Optional[MonteCarloSettings]]:
+    """Lê o corpo de ``POST /simulate``.
+
+    O corpo é a própria configuração (como no JSON exportado) ou um objeto
+    ``{"config": {...}, "series": false, "monte_carlo": {...}}``. Com
+    ``monte_carlo`` (que pode ser ``{}`` para os valores padrão) a simulação
+    é estocástica; um JSON exportado com o bloco ``monte_carlo`` (semente
+    incluída) reproduz a mesma simulação.
+    """
+    try:
+        return _parse_request(data)
+    except KeyError as e:
+        raise ValueError(f"Campo obrigatório ausente: `{e.args[0]}`.") from None
+
+
+def _parse_request(data: Any) -> Tuple[SimulationConfig, bool, Optional[MonteCarloSettings]]:
+    if not isinstance(data, dict):
+        raise ValueError("O corpo da requisição deve ser um objeto JSON.")
+    if "config" in data:
+        config_data, series, mc_data = data["config"], data.get("series", False), data.get("monte_carlo")
+    else:
+        config_data, series, mc_data = data, False, data.get("monte_carlo")
+    check_type(config_data, dict, "config")
+    check_type(series, bool, "series")
+    check_type(config_data.get("income_sources") or [], list, "income_sources")
+    for source in config_data.get("income_sources") or []:
+        check_type(source, dict, "income_sources[]")
+    check_type(config_data.get("withdrawal_rule") or {}, dict, "withdrawal_rule")
+    config = SimulationConfig.from_dict(config_data)
+    config.validate()
+    settings = None
+    if mc_data is not None:
+        check_type(mc_data, dict, "monte_carlo")
+        check_type(mc_data.get("percentiles", []), list, "percentiles")
+        check_type(mc_data.get("asset_model") or {}, dict, "asset_model")
+        settings = MonteCarloSettings.from_dict(mc_data)
+        if not 1 <= settings.n_paths <= MAX_PATHS:
+            raise ValueError(f"`n_paths` deve estar entre 1 e {MAX_PATHS}.")
+        if settings.volatility_acc < 0 or settings.volatility_ret < 0:
+            raise ValueError("As volatilidades não podem ser negativas.")
+        if settings.chunk_paths is not None and settings.chunk_paths < 1:
+            raise ValueError("`chunk_paths` deve ser positivo.")
+        if not all(0 <= p <= 100 for p in settings.percentiles):
+            raise ValueError("Os percentis devem estar entre 0 e 100.")
+        if settings.asset_model is not None:
+            settings.asset_model.validate()
+    return config, series, settings
+
+
+def check_type(value: Any, expected: type, name: str) -> None:
+    """Recusa campos aninhados com o tipo JSON errado antes de convertê-los."""
+    if not isinstance(value, expected):
+        kind = {dict: "um objeto JSON", list: "uma lista", bool: "verdadeiro ou falso"}[expected]
+        raise ValueError(f"`{name}` deve ser {kind}.")
+
+
+def is_monte_carlo(data: Any) -> bool:
+    """Indica se o corpo pede uma simulação de Monte Carlo (sem validá-lo)."""
+    return isinstance(data, dict) and data.get("monte_carlo") is not None
+
+
+def json_array(values: np.ndarray) -> List[Optional[float]]:
+    """Array como lista JSON, com ``NaN`` como ``null``."""
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def result_payload(config: SimulationConfig, result: SimulationResult, series: bool) -> Dict[str, Any]:
+    """Métricas resumidas (as colunas de ``summary.csv`` do lote) e, se pedido, as séries."""
+    payload: Dict[str, Any] = {
+        "config_hash": config_hash(config),
+        "portfolio_at_retirement": result.portfolio_at_retirement,
+        "recommended_total_spending": (
+            result.recommended_total_spending if config.strategy_mode == MODE_STRATEGY else None
+        ),
+        "depletion_age": result.depletion_age,
+        "final_balance": result.final_balance,
+    }
+    if series:
+        payload["series"] = {name: json_array(column) for name, column in result.columns.to_dict().items()}
+    return payload
+
+
+def monte_carlo_payload(config: SimulationConfig, result: MonteCarloResult, series: bool) -> Dict[str, Any]:
+    """Probabilidade de sucesso e percentis do patrimônio e, se pedido, as faixas mensais."""
+    percentiles = result.percentiles
+    labels = [f"p{p:g}" for p in percentiles]
+    payload: Dict[str, Any] = {
+        "config_hash": config_hash(config),
+        "n_paths": result.n_paths,
+        "seed": result.settings.seed,
+        "fingerprint": result.fingerprint,
+        "success_probability": result.success_probability,
+        "portfolio_at_retirement": dict(zip(labels, np.percentile(result.portfolio_at_retirement, percentiles).tolist())),
+        "final_balance": dict(zip(labels, np.percentile(result.final_balances, percentiles).tolist())),
+    }
+    if series:
+        payload["series"] = {
+            "age": json_array(result.ages),
+            **{label: json_array(band) for label, band in zip(labels, result.bands)},
+        }
+    return payload
+
+
+def simulate_requests(
+    requests: Sequence[Dict[str, Any]],
+    store_path: Optional[Path] = None,
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """Simula um lote de requisições e devolve ``(status HTTP, corpo)`` de cada uma.
+
+    As simulações determinísticas do lote são feitas juntas por
+    `simulate_scenarios` (resultados idênticos aos de `run_simulation`); as
+    de Monte Carlo, uma a uma, já vetorizadas sobre os caminhos. Com
+    `store_path`, resultados determinísticos já armazenados são lidos do
+    banco e os novos são gravados nele.
+    """
+    from .batch import open_store
+
+    responses: List[Optional[Tuple[int, Dict[str, Any]]]] = [None] * len(requests)
+    deterministic: List[Tuple[int, SimulationConfig, bool]] = []
+    for i, data in enumerate(requests):
+        # Cada requisição é tratada à parte: um corpo inválido recebe 422 e
+        # uma falha na simulação, 500, sem afetar as demais do lote.
+        try:
+            config, series, settings = parse_request(data)
+        except Exception as e:
+            responses[i] = (HTTPStatus.UNPROCESSABLE_ENTITY, {"error": str(e) or type(e).__name__})
+            continue
+        if settings is None:
+            deterministic.append((i, config, series))
+            continue
+        try:
+            responses[i] = (HTTPStatus.OK, monte_carlo_payload(config, run_monte_carlo(config, settings), series))
+        except Exception as e:
+            logger.exception("Falha ao simular a requisição")
+            responses[i] = (HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e) or type(e).__name__})
+
+    store = open_store(store_path) if store_path is not None else None
+    pending = []
+    for i, config, series in deterministic:
+        stored = store.get(config) if store is not None else None
+        if stored is not None:
+            responses[i] = (HTTPStatus.OK, result_payload(config, stored, series))
+        else:
+            pending.append((i, config, series))
+    try:
+        results = simulate_scenarios([config for _, config, _ in pending]) if pending else []
+    except Exception:
+        # Refaz uma a uma para isolar a configuração que falhou
+        results = [None] * len(pending)
+    for (i, config, series), result in zip(pending, results):
+        try:
+            if result is None:
+                result = simulate_scenarios([config])[0]
+            if store is not None:
+                store.put(config, result)
+            responses[i] = (HTTPStatus.OK, result_payload(config, result, series))
+        except Exception as e:
+            logger.exception("Falha ao simular a requisição")
+            responses[i] = (HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e) or type(e).__name__})
+    return responses
+
+
+# -----------------------------------------------------------------------------
+# 4. FILA, LOTES E MÉTRICAS
+# -----------------------------------------------------------------------------
+@dataclass
+class PendingRequest:
+    data: Any
+    created: float
+    deadline: float
+    future: Future = field(default_factory=Future)
+
+
+class SimulationService:
+    """Fila limitada de requisições atendida por um pool de processos.
+
+    Uma thread despachante retira da fila até `batch_size` requisições (ou
+    as que chegarem em `batch_wait` segundos) e envia ao pool as
+    determinísticas como um único lote e cada uma de Monte Carlo como uma
+    tarefa separada, para que as simulações caras se distribuam entre os
+    processos em vez de atrasar as baratas. No máximo ``2 × workers``
+    tarefas ficam em andamento; com o pool ocupado a
+    fila enche e `submit` passa a recusar requisições (`ServiceOverloaded`),
+    em vez de acumular trabalho sem limite. Requisições cujo prazo já
+    passou ao sair da fila são descartadas sem simular.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_wait: float = DEFAULT_BATCH_WAIT,
+        timeout: float = DEFAULT_TIMEOUT,
+        store_path: Optional[Path] = None,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.timeout = timeout
+        self.store_path = store_path
+        self._queue: "queue.Queue[PendingRequest]" = queue.Queue(maxsize=queue_size)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        # Cria os processos agora, antes das threads do servidor: criar
+        # processos (fork) com várias threads ativas pode travar o filho.
+        self._executor.submit(int).result()
+        self._slots = threading.BoundedSemaphore(2 * self.workers)
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._counters = {
+            "requests": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "expired": 0,
+            "batches": 0,
+            "batched_requests": 0,
+        }
+        self._in_flight = 0
+        self._max_in_flight = 0
+        self._started = time.monotonic()
+        self._closed = threading.Event()
+        self._dispatcher = threading.Thread(target=self._dispatch, name="simulation-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    # ---- Requisições --------------------------------------------------------
+    def submit(self, data: Any, timeout: Optional[float] = None) -> PendingRequest:
+        """Enfileira uma requisição; falha com `ServiceOverloaded` se a fila estiver cheia."""
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        now = time.monotonic()
+        request = PendingRequest(data, now, now + timeout)
+        with self._lock:
+            self._counters["requests"] += 1
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            self._count("rejected")
+            raise ServiceOverloaded() from None
+        with self._lock:
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+        return request
+
+    def wait(self, request: PendingRequest) -> Tuple[int, Dict[str, Any]]:
+        """Resposta da requisição, ou 504 se o prazo acabar antes."""
+        start = request.created
+        try:
+            status, body = request.future.result(timeout=max(request.deadline - time.monotonic(), 0))
+        except (concurrent.futures.TimeoutError, concurrent.futures.CancelledError):
+            # Se ainda estiver na fila, o despachante a descarta; se já estiver
+            # no pool, a simulação termina, mas o resultado é ignorado.
+            request.future.cancel()
+            self._finish("timed_out", start)
+            return TIMEOUT_RESPONSE
+        except Exception as e:  # falha do pool (por exemplo, um processo encerrado)
+            logger.exception("Falha ao simular o lote")
+            self._finish("failed", start)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+        outcome = {HTTPStatus.OK: "completed", HTTPStatus.GATEWAY_TIMEOUT: "timed_out"}.get(status, "failed")
+        self._finish(outcome, start)
+        return status, body
+
+    def simulate(self, data: Any, timeout: Optional[float] = None) -> Tuple[int, Dict[str, Any]]:
+        """Enfileira e aguarda uma requisição (503 se a fila estiver cheia)."""
+        try:
+            request = self.submit(data, timeout)
+        except ServiceOverloaded:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Serviço sobrecarregado; tente novamente."}
+        return self.wait(request)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _finish(self, outcome: str, start: float) -> None:
+        with self._lock:
+            self._counters[outcome] += 1
+            self._in_flight -= 1
+            self._latencies.append(time.monotonic() - start)
+
+    # ---- Despacho -----------------------------------------------------------
+    def _next_batch(self) -> List[PendingRequest]:
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        limit = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = limit - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        now = time.monotonic()
+        live = []
+        for request in batch:
+            if not request.future.set_running_or_notify_cancel():
+                self._count("expired")  # já respondida com 504 por `wait`
+            elif request.deadline <= now:
+                self._count("expired")
+                request.future.set_result(TIMEOUT_RESPONSE)
+            else:
+                live.append(request)
+        return live
+
+    def _dispatch(self) -> None:
+        while not self._closed.is_set():
+            batch = self._next_batch()
+            deterministic = [r for r in batch if not is_monte_carlo(r.data)]
+            if deterministic:
+                self._submit(deterministic)
+            for request in batch:
+                if is_monte_carlo(request.data):
+                    self._submit([request])
+
+    def _submit(self, batch: List[PendingRequest]) -> None:
+        self._slots.acquire()
+        with self._lock:
+            self._counters["batches"] += 1
+            self._counters["batched_requests"] += len(batch)
+        try:
+            future = self._executor.submit(simulate_requests, [r.data for r in batch], self.store_path)
+        except RuntimeError as e:  # pool encerrado
+            self._slots.release()
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        future.add_done_callback(lambda f, batch=batch: self._deliver(f, batch))
+
+    def _deliver(self, future: Future, batch: List[PendingRequest]) -> None:
+        self._slots.release()
+        error = future.exception()
+        for i, request in enumerate(batch):
+            if error is not None:
+                request.future.set_exception(error)
+            else:
+                request.future.set_result(future.result()[i])
+
+    # ---- Métricas -----------------------------------------------------------
+    def metrics(self) -> Dict[str, Any]:
+        """Contadores, ocupação da fila e do pool e latências recentes (em ms)."""
+        with self._lock:
+            counters = dict(self._counters)
+            latencies = np.array(self._latencies) * 1000
+            in_flight, max_in_flight = self._in_flight, self._max_in_flight
+        return {
+            **counters,
+            "in_flight": in_flight,
+            "max_in_flight": max_in_flight,
+            "queue_depth": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "workers": self.workers,
+            "mean_batch_size": counters["batched_requests"] / counters["batches"] if counters["batches"] else 0.0,
+            "latency_ms": {
+                "p50": float(np.percentile(latencies, 50)) if len(latencies) else None,
+                "p95": float(np.percentile(latencies, 95)) if len(latencies) else None,
+                "max": float(latencies.max()) if len(latencies) else None,
+            },
+            "uptime_s": time.monotonic() - self._started,
+        }
+
+    def close(self) -> None:
+        self._closed.set()
+        self._dispatcher.join()
+        self._executor.shutdown()
+
+
+# -----------------------------------------------------------------------------
+# 5. SERVIDOR HTTP
+# -----------------------------------------------------------------------------
+class SimulationRequestHandler(BaseHTTPRequestHandler):
+    """Rotas: ``POST /simulate``, ``GET /metrics`` e ``GET /health``."""
+
+    server: "SimulationServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        if self.path == "/metrics":
+            self._send(HTTPStatus.OK, self.server.service.metrics())
+        elif self.path == "/health":
+            self._send(HTTPStatus.OK, {"status": "ok"})
+        else:
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"Rota não encontrada: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/simulate":
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"Rota não encontrada: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # Sem um tamanho válido, o corpo não pode ser lido nem descartado
+            self.close_connection = True
+            self._send(HTTPStatus.BAD_REQUEST, {"error": "Cabeçalho `Content-Length` inválido."})
+            return
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Corpo da requisição muito grande."})
+            return
+        try:
+            data = json.loads(self.rfile.read(length))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            self._send(HTTPStatus.BAD_REQUEST, {"error": f"JSON inválido: {e}"})
+            return
+        timeout = data.get("timeout") if isinstance(data, dict) else None
+        if timeout is not None and (
+            isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0
+        ):
+            self._send(HTTPStatus.BAD_REQUEST, {"error": "`timeout` deve ser um número positivo de segundos."})
+            return
+        status, body = self.server.service.simulate(data, timeout)
+        self._send(status, body)
+
+    def _send(self, status: int, body: Dict[str, Any]) -> None:
+        content = json.dumps(body, ensure_ascii=False, allow_nan=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class SimulationServer(ThreadingHTTPServer):
+    """Uma thread por conexão; as simulações ficam no pool de `service`."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address: Tuple[str, int], service: SimulationService):
+        super().__init__(address, SimulationRequestHandler)
+        self.service = service
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m retirement_engine.service",
+        description="Serviço HTTP/JSON local de simulação de aposentadoria.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta (padrão: apenas local)")
+    parser.add_argument("--port", "-p", type=int, default=DEFAULT_PORT, help="Porta de escuta")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="Número de processos (padrão: núcleos da CPU)")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Requisições em espera antes de responder 503")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Máximo de requisições por lote enviado ao pool")
+    parser.add_argument(
+        "--batch-wait-ms",
+        type=float,
+        default=DEFAULT_BATCH_WAIT * 1000,
+        help="Tempo de espera por mais requisições antes de enviar um lote",
+    )
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Tempo máximo por requisição, em segundos")
+    parser.add_argument("--store", type=Path, default=None, help="Banco SQLite de resultados (ver `retirement_engine.store`)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    service = SimulationService(
+        workers=args.workers,
+        queue_size=args.queue_size,
+        batch_size=args.batch_size,
+        batch_wait=args.batch_wait_ms / 1000,
+        timeout=args.timeout,
+        store_path=args.store,
+    )
+    server = SimulationServer((args.host, args.port), service)
+    logger.info("Servindo em http://%s:%d com %d processos", args.host, server.server_port, service.workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+# =============================================================================
+# CALCULADORA DE METAS (GOAL SEEK)
+# =============================================================================
+# Descrição: Inverte o motor de simulação para encontrar o investimento
+#            mensal mínimo, a idade de aposentadoria mais cedo ou o gasto
+#            mensal máximo que atendem a uma meta. Usa as fórmulas fechadas
+#            de anuidade sempre que possível e busca por bisseção nos casos
+#            discretos.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import dataclasses
+import math
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from .core import (
+    MODE_CUSTOM,
+    SimulationConfig,
+    income_at_retirement,
+    retirement_income_schedule,
+    strategy_withdrawal,
+)
+
+# -----------------------------------------------------------------------------
+# 2. FÓRMULAS FECHADAS
+# -----------------------------------------------------------------------------
+def accumulation_factors(config: SimulationConfig) -> Tuple[float, float]:
+    """Fatores (g, s) tais que patrimônio na aposentadoria = P0·g + aporte·s."""
+    n = config.accumulation_months
+    r = config.monthly_rate_acc
+    growth = (1 + r) ** n
+    annuity = n if r == 0 else (growth - 1) / r
+    return growth, annuity
+
+
+def portfolio_at_retirement(config: SimulationConfig) -> float:
+    """Patrimônio ao fim da acumulação pela soma da série geométrica."""
+    growth, annuity = accumulation_factors(config)
+    return config.total_investments_today * growth + config.monthly_investment * annuity
+
+
+def _discount_factors(config: SimulationConfig) -> np.ndarray:
+    """Fatores de desconto v^m para os meses ``1..n`` da aposentadoria."""
+    months = np.arange(1, config.retirement_months + 1)
+    return (1 + config.monthly_rate_ret) ** -months.astype(float)
+
+
+def required_portfolio(config: SimulationConfig, monthly_expenses: Optional[float] = None) -> float:
+    """Menor patrimônio na aposentadoria que não se esgota antes da expectativa de vida.
+
+    No modo "Retirada Personalizada" o saldo do mês k é
+    ``(1+r)^k · (P - Σ_{m≤k} w_m·v^m)``; ele nunca fica negativo se P for
+    maior ou igual ao máximo das somas acumuladas dos saques descontados.
+    """
+    expenses = config.monthly_expenses if monthly_expenses is None else monthly_expenses
+    withdrawals = expenses - retirement_income_schedule(config)
+    discounted = np.cumsum(withdrawals * _discount_factors(config))
+    return max(0.0, float(discounted.max(initial=0.0)))
+
+
+def strategy_spending_per_portfolio(config: SimulationConfig) -> float:
+    """Retirada mensal por real de patrimônio segundo a estratégia.
+
+    Nas regras dinâmicas é a retirada do primeiro mês, que é proporcional ao
+    patrimônio na aposentadoria.
+    """
+    return strategy_withdrawal(1.0, config)
+
+
+def _target_portfolio(config: SimulationConfig, target_spending: Optional[float]) -> float:
+    if config.strategy_mode == MODE_CUSTOM:
+        return required_portfolio(config, target_spending)
+    if target_spending is None:
+        raise ValueError("Informe o gasto mensal desejado para o modo 'Retirada Baseada em Estratégia'.")
+    per_portfolio = strategy_spending_per_portfolio(config)
+    needed = target_spending - income_at_retirement(config)
+    if needed <= 0:
+        return 0.0
+    if per_portfolio <= 0:
+        return math.inf
+    return needed / per_portfolio
+
+
+def _round_up_cents(value: float) -> float:
+    return math.ceil(round(value * 100, 6)) / 100
+
+
+def _round_down_cents(value: float) -> float:
+    return math.floor(round(value * 100, 6)) / 100
+
+
+# -----------------------------------------------------------------------------
+# 3. BUSCA POR BISSEÇÃO
+# -----------------------------------------------------------------------------
+def first_feasible_integer(feasible: Callable[[int], bool], low: int, high: int) -> Optional[int]:
+    """Menor inteiro em [low, high] para o qual `feasible` é verdadeiro.
+
+    Supõe que `feasible` é monótona (falsa e depois verdadeira); faz
+    O(log(high - low)) avaliações.
+    """
+    if low > high or not feasible(high):
+        return None
+    while low < high:
+        middle = (low + high) // 2
+        if feasible(middle):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+# -----------------------------------------------------------------------------
+# 4. SOLUCIONADORES
+# -----------------------------------------------------------------------------
+def solve_monthly_investment(config: SimulationConfig, target_spending: Optional[float] = None) -> Optional[float]:
+    """Investimento mensal mínimo para sustentar o gasto desejado.
+
+    No modo "Retirada Personalizada" o gasto é `monthly_expenses` (ou
+    `target_spending`, se informado) e a meta é não esgotar o patrimônio. No
+    modo estratégia, `target_spending` é o gasto total mensal recomendado
+    (retirada do portfólio + renda adicional). Devolve ``None`` se a meta for
+    inatingível; o valor é arredondado para cima, em centavos.
+    """
+    config.validate()
+    target = _target_portfolio(config, target_spending)
+    if math.isinf(target):
+        return None
+    growth, annuity = accumulation_factors(config)
+    required = (target - config.total_investments_today * growth) / annuity
+    return max(0.0, _round_up_cents(required))
+
+
+def solve_monthly_expenses(config: SimulationConfig) -> float:
+    """Maior despesa mensal sustentável até a expectativa de vida.
+
+    No modo "Retirada Personalizada" a condição ``P ≥ E·A_k - B_k`` para
+    todo mês k (A_k: soma dos descontos, B_k: rendas adicionais descontadas)
+    dá ``E = min_k (P + B_k) / A_k``. No modo estratégia é o gasto total
+    recomendado pela própria estratégia.
+    """
+    config.validate()
+    portfolio = portfolio_at_retirement(config)
+    if config.strategy_mode != MODE_CUSTOM:
+        return portfolio * strategy_spending_per_portfolio(config) + income_at_retirement(config)
+    discount = _discount_factors(config)
+    annuity = np.cumsum(discount)
+    discounted_income = np.cumsum(retirement_income_schedule(config) * discount)
+    return _round_down_cents(float(np.min((portfolio + discounted_income) / annuity)))
+
+
+def solve_retirement_age(
+    config: SimulationConfig,
+    target_spending: Optional[float] = None,
+) -> Optional[int]:
+    """Idade (inteira) mais cedo em que a meta de gasto é sustentável.
+
+    A viabilidade de cada idade é avaliada pelas fórmulas fechadas; a idade
+    é encontrada por bisseção entre a idade atual e a expectativa de vida.
+    """
+    config.validate()
+
+    def feasible(age: int) -> bool:
+        candidate = dataclasses.replace(config, retirement_age=float(age))
+        return portfolio_at_retirement(candidate) >= _target_portfolio(candidate, target_spending)
+
+    low = math.floor(config.current_age) + 1
+    high = math.ceil(config.life_expectancy) - 1
+    return first_feasible_integer(feasible, low, high)
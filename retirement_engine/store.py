@@ -0,0 +1,465 @@
+# =============================================================================
+# ARMAZENAMENTO PERSISTENTE DE RESULTADOS
+# =============================================================================
+# Descrição: Banco SQLite local com configurações, métricas e séries
+#            comprimidas de cada simulação, indexado pelo hash canônico da
+#            configuração. Serve resultados já calculados sem refazer a
+#            simulação (inclusive após reiniciar o servidor), permite buscar
+#            planos por cliente e etiqueta e é compartilhado com os jobs em
+#            lote. O tamanho total é limitado, com descarte dos resultados
+#            usados há mais tempo.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .core import (
+    ENGINE_VERSION,
+    RESULT_COLUMNS,
+    ResultColumns,
+    SimulationConfig,
+    SimulationResult,
+    build_income_matrix,
+    config_hash,
+    simulation_timeline,
+)
+
+# -----------------------------------------------------------------------------
+# 2. CONSTANTES E ESQUEMA
+# -----------------------------------------------------------------------------
+# Variável de ambiente com o caminho do banco usado pela interface
+STORE_ENV_VAR = "RETIREMENT_STORE"
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    config_hash TEXT PRIMARY KEY,
+    engine_version INTEGER NOT NULL DEFAULT 0,
+    client TEXT,
+    config TEXT NOT NULL,
+    portfolio_at_retirement REAL NOT NULL,
+    recommended_total_spending REAL,
+    depletion_age REAL,
+    final_balance REAL NOT NULL,
+    initial_additional_income REAL NOT NULL,
+    computed_portfolio_withdrawal REAL,
+    n_months INTEGER NOT NULL,
+    arrays BLOB NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_client ON results (client, accessed_at);
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at);
+
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    config_hash TEXT NOT NULL REFERENCES results (config_hash) ON DELETE CASCADE,
+    PRIMARY KEY (tag, config_hash)
+);
+CREATE INDEX IF NOT EXISTS tags_config ON tags (config_hash);
+
+-- Tamanho total mantido por gatilhos, para que a checagem do limite não
+-- precise percorrer a tabela (vários processos gravam no mesmo banco).
+CREATE TABLE IF NOT EXISTS store_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    total_bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_stats (id, total_bytes) VALUES (1, 0);
+CREATE TRIGGER IF NOT EXISTS results_insert AFTER INSERT ON results BEGIN
+    UPDATE store_stats SET total_bytes = total_bytes + NEW.size_bytes WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS results_update AFTER UPDATE OF size_bytes ON results BEGIN
+    UPDATE store_stats SET total_bytes = total_bytes + NEW.size_bytes - OLD.size_bytes WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS results_delete AFTER DELETE ON results BEGIN
+    UPDATE store_stats SET total_bytes = total_bytes - OLD.size_bytes WHERE id = 1;
+END;
+"""
+
+# Colunas acrescentadas depois da primeira versão do esquema, criadas ao abrir
+# bancos antigos. Resultados sem versão do motor ficam com a versão 0.
+MIGRATIONS = (("engine_version", "INTEGER NOT NULL DEFAULT 0"),)
+
+METRIC_COLUMNS = (
+    "portfolio_at_retirement",
+    "recommended_total_spending",
+    "depletion_age",
+    "final_balance",
+)
+
+
+@dataclass
+class StoredPlan:
+    """Resumo de um resultado armazenado (sem as séries)."""
+
+    config_hash: str
+    client: Optional[str]
+    tags: Tuple[str, ...]
+    config: SimulationConfig
+    portfolio_at_retirement: float
+    recommended_total_spending: Optional[float]
+    depletion_age: Optional[float]
+    final_balance: float
+    size_bytes: int
+    created_at: float
+    accessed_at: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "config_hash": self.config_hash,
+            "client": self.client,
+            "tags": list(self.tags),
+            **{name: getattr(self, name) for name in METRIC_COLUMNS},
+            "size_bytes": self.size_bytes,
+            "created_at": self.created_at,
+            "accessed_at": self.accessed_at,
+        }
+
+
+# -----------------------------------------------------------------------------
+# 3. SERIALIZAÇÃO
+# -----------------------------------------------------------------------------
+def stored_config(config: SimulationConfig) -> Dict[str, Any]:
+    """Configuração no formato do JSON exportado, com a data de referência resolvida.
+
+    É a mesma data usada em `config_hash`, de modo que a configuração
+    armazenada reproduz o resultado mesmo lida em outro dia.
+    """
+    data = config.to_dict()
+    data["reference_date"] = str(config.today)
+    return data
+
+
+def pack_arrays(result: SimulationResult) -> bytes:
+    """Séries mensais do resultado (o bloco de `ResultColumns`) comprimidas em um blob.
+
+    O bloco é gravado em float64, sem cabeçalho: o formato vem da coluna
+    ``n_months``. Ler o blob é uma descompressão e uma view, bem mais rápido
+    que um arquivo ``.npz``. A matriz de renda não é gravada: ela só depende
+    da configuração e é reconstruída na leitura por `build_income_matrix`,
+    em menos tempo do que levaria para ser descomprimida.
+    """
+    return zlib.compress(np.ascontiguousarray(result.columns.values, dtype=np.float64).tobytes(), 1)
+
+
+def unpack_result(
+    row: sqlite3.Row,
+    dtype: Any = np.float64,
+    config: Optional[SimulationConfig] = None,
+) -> SimulationResult:
+    """Reconstrói o `SimulationResult` de uma linha da tabela ``results``.
+
+    `config` evita ler a configuração gravada quando ela já é conhecida
+    (qualquer configuração com o mesmo hash produz o mesmo resultado).
+    """
+    if config is None:
+        config = SimulationConfig.from_dict(json.loads(row["config"]))
+    n_months = row["n_months"]
+    data = np.frombuffer(bytearray(zlib.decompress(row["arrays"])), dtype=np.float64)
+    values = data.reshape(len(RESULT_COLUMNS), n_months)
+    income_ages = simulation_timeline(config)
+    income_matrix = build_income_matrix(config.income_sources, income_ages)
+    columns = ResultColumns(np.arange(n_months, dtype=np.int32), values).astype(dtype)
+    return SimulationResult(
+        columns=columns,
+        current_age=config.current_age,
+        accumulation_months=config.accumulation_months,
+        retirement_months=config.retirement_months,
+        portfolio_at_retirement=row["portfolio_at_retirement"],
+        initial_additional_income=row["initial_additional_income"],
+        computed_portfolio_withdrawal=row["computed_portfolio_withdrawal"],
+        recommended_total_spending=row["recommended_total_spending"],
+        income_ages=income_ages,
+        income_matrix=income_matrix,
+        config=config,
+    )
+
+
+# -----------------------------------------------------------------------------
+# 4. ARMAZENAMENTO
+# -----------------------------------------------------------------------------
+class ResultStore:
+    """Resultados de simulação persistidos em SQLite, indexados por `config_hash`.
+
+    O banco usa o modo WAL, de modo que a interface e vários processos de um
+    job em lote podem ler e gravar ao mesmo tempo. Uma instância pode ser
+    usada por várias threads (as reexecuções do Streamlit rodam em threads
+    diferentes); os acessos são serializados por um lock.
+
+    Cada resultado guarda a versão do motor que o calculou
+    (`ENGINE_VERSION`): resultados de outras versões não são servidos nem
+    listados, e são recalculados e regravados quando pedidos.
+
+    Quando o tamanho das séries armazenadas passa de `max_bytes`, os
+    resultados usados há mais tempo são descartados, começando pelos de
+    outras versões do motor e depois pelos que não pertencem a nenhum cliente.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES, timeout: float = 30.0):
+        if max_bytes < 1:
+            raise ValueError("max_bytes deve ser positivo.")
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), timeout=timeout, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            # No modo WAL, `NORMAL` só sincroniza o disco nos checkpoints: um
+            # resultado perdido em uma queda de energia é apenas recalculado.
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("PRAGMA foreign_keys=ON")
+            self._connection.executescript(SCHEMA)
+            existing = {row["name"] for row in self._connection.execute("PRAGMA table_info(results)")}
+            for name, definition in MIGRATIONS:
+                if name not in existing:
+                    self._connection.execute(f"ALTER TABLE results ADD COLUMN {name} {definition}")
+
+    @classmethod
+    def from_env(cls, **kwargs: Any) -> Optional["ResultStore"]:
+        """Abre o banco indicado em `STORE_ENV_VAR`, ou devolve ``None`` se não houver."""
+        path = os.environ.get(STORE_ENV_VAR)
+        return cls(path, **kwargs) if path else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __contains__(self, config: SimulationConfig) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM results WHERE config_hash = ? AND engine_version = ?",
+                (config_hash(config), ENGINE_VERSION),
+            ).fetchone()
+        return row is not None
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT total_bytes FROM store_stats WHERE id = 1").fetchone()[0]
+
+    # ---- Leitura e gravação -------------------------------------------------
+    def get(self, config: SimulationConfig, dtype: Any = np.float64) -> Optional[SimulationResult]:
+        """Resultado armazenado para `config`, ou ``None``. Marca o resultado como usado.
+
+        Um resultado calculado por outra versão do motor conta como falta.
+        """
+        key = config_hash(config)
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT * FROM results WHERE config_hash = ? AND engine_version = ?", (key, ENGINE_VERSION)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._connection.execute(
+                "UPDATE results SET accessed_at = ? WHERE config_hash = ?", (time.time(), key)
+            )
+        return unpack_result(row, dtype, config)
+
+    def put(
+        self,
+        config: SimulationConfig,
+        result: SimulationResult,
+        client: Optional[str] = None,
+        tags: Iterable[str] = (),
+    ) -> str:
+        """Grava (ou atualiza) o resultado de `config` e devolve o seu hash.
+
+        Um cliente já associado ao resultado é mantido se `client` for
+        ``None``; as etiquetas são acrescentadas às existentes. As séries são
+        sempre gravadas em precisão dupla.
+        """
+        key = config_hash(config)
+        if result.columns.dtype != np.float64:
+            raise ValueError("Armazene apenas resultados em float64; converta na leitura com `dtype`.")
+        blob = pack_arrays(result)
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                INSERT INTO results (
+                    config_hash, engine_version, client, config, portfolio_at_retirement,
+                    recommended_total_spending, depletion_age, final_balance, initial_additional_income,
+                    computed_portfolio_withdrawal, n_months, arrays, size_bytes, created_at, accessed_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (config_hash) DO UPDATE SET
+                    engine_version = excluded.engine_version,
+                    client = COALESCE(excluded.client, results.client),
+                    config = excluded.config,
+                    portfolio_at_retirement = excluded.portfolio_at_retirement,
+                    recommended_total_spending = excluded.recommended_total_spending,
+                    depletion_age = excluded.depletion_age,
+                    final_balance = excluded.final_balance,
+                    initial_additional_income = excluded.initial_additional_income,
+                    computed_portfolio_withdrawal = excluded.computed_portfolio_withdrawal,
+                    n_months = excluded.n_months,
+                    arrays = excluded.arrays,
+                    size_bytes = excluded.size_bytes,
+                    accessed_at = excluded.accessed_at
+                """,
+                (
+                    key,
+                    ENGINE_VERSION,
+                    client,
+                    json.dumps(stored_config(config), ensure_ascii=False, sort_keys=True),
+                    result.portfolio_at_retirement,
+                    result.recommended_total_spending,
+                    result.depletion_age,
+                    result.final_balance,
+                    result.initial_additional_income,
+                    result.computed_portfolio_withdrawal,
+                    len(result.columns),
+                    blob,
+                    len(blob),
+                    now,
+                    now,
+                ),
+            )
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO tags (tag, config_hash) VALUES (?, ?)",
+                [(tag, key) for tag in _clean_tags(tags)],
+            )
+            self._evict(self.max_bytes, keep=key)
+        return key
+
+    def get_or_compute(
+        self,
+        config: SimulationConfig,
+        compute: Callable[[], SimulationResult],
+        client: Optional[str] = None,
+        tags: Iterable[str] = (),
+    ) -> Tuple[SimulationResult, bool]:
+        """Resultado armazenado ou calculado (e gravado); indica se veio do banco."""
+        result = self.get(config)
+        if result is not None:
+            return result, True
+        result = compute()
+        self.put(config, result, client, tags)
+        return result, False
+
+    def tag(self, config: SimulationConfig, tags: Iterable[str]) -> None:
+        """Acrescenta etiquetas a um resultado já armazenado."""
+        key = config_hash(config)
+        with self._lock, self._connection:
+            if self._connection.execute("SELECT 1 FROM results WHERE config_hash = ?", (key,)).fetchone() is None:
+                raise KeyError(f"Configuração não armazenada: {key}")
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO tags (tag, config_hash) VALUES (?, ?)",
+                [(tag, key) for tag in _clean_tags(tags)],
+            )
+
+    def delete(self, config: SimulationConfig) -> bool:
+        with self._lock, self._connection:
+            cursor = self._connection.execute("DELETE FROM results WHERE config_hash = ?", (config_hash(config),))
+        return cursor.rowcount > 0
+
+    # ---- Consultas ----------------------------------------------------------
+    def find(
+        self,
+        client: Optional[str] = None,
+        tags: Sequence[str] = (),
+        limit: int = 100,
+    ) -> List[StoredPlan]:
+        """Resultados do cliente e/ou com todas as etiquetas, dos usados mais recentemente.
+
+        Só lista resultados da versão atual do motor.
+        """
+        conditions, parameters = ["r.engine_version = ?"], [ENGINE_VERSION]
+        if client is not None:
+            conditions.append("r.client = ?")
+            parameters.append(client)
+        for tag in _clean_tags(tags):
+            conditions.append("EXISTS (SELECT 1 FROM tags t WHERE t.tag = ? AND t.config_hash = r.config_hash)")
+            parameters.append(tag)
+        query = f"""
+            SELECT r.config_hash, r.client, r.config, r.portfolio_at_retirement, r.recommended_total_spending,
+                   r.depletion_age, r.final_balance, r.size_bytes, r.created_at, r.accessed_at,
+                   (SELECT GROUP_CONCAT(tag, char(31)) FROM tags t WHERE t.config_hash = r.config_hash) AS tag_list
+            FROM results r WHERE {' AND '.join(conditions)}
+            ORDER BY r.accessed_at DESC
+            LIMIT ?
+        """
+        with self._lock:
+            rows = self._connection.execute(query, (*parameters, limit)).fetchall()
+        return [
+            StoredPlan(
+                config_hash=row["config_hash"],
+                client=row["client"],
+                tags=tuple(sorted(row["tag_list"].split("\x1f"))) if row["tag_list"] else (),
+                config=SimulationConfig.from_dict(json.loads(row["config"])),
+                portfolio_at_retirement=row["portfolio_at_retirement"],
+                recommended_total_spending=row["recommended_total_spending"],
+                depletion_age=row["depletion_age"],
+                final_balance=row["final_balance"],
+                size_bytes=row["size_bytes"],
+                created_at=row["created_at"],
+                accessed_at=row["accessed_at"],
+            )
+            for row in rows
+        ]
+
+    def clients(self) -> List[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT DISTINCT client FROM results WHERE client IS NOT NULL ORDER BY client"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # ---- Descarte -----------------------------------------------------------
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Descarta resultados até o total caber em `max_bytes`; devolve quantos saíram."""
+        with self._lock, self._connection:
+            return self._evict(self.max_bytes if max_bytes is None else max_bytes)
+
+    def _evict(self, max_bytes: int, keep: Optional[str] = None) -> int:
+        total = self._connection.execute("SELECT total_bytes FROM store_stats WHERE id = 1").fetchone()[0]
+        excess = total - max_bytes
+        if excess <= 0:
+            return 0
+        victims = []
+        rows = self._connection.execute(
+            "SELECT config_hash, size_bytes FROM results WHERE config_hash IS NOT ? "
+            "ORDER BY engine_version = ?, client IS NOT NULL, accessed_at",
+            (keep, ENGINE_VERSION),
+        )
+        for row in rows:
+            if excess <= 0:
+                break
+            victims.append((row["config_hash"],))
+            excess -= row["size_bytes"]
+        self._connection.executemany("DELETE FROM results WHERE config_hash = ?", victims)
+        return len(victims)
+
+
+def _clean_tags(tags: Union[str, Iterable[str]]) -> List[str]:
+    # Uma etiqueta isolada (``"tags": "vip"`` no JSON) não é lida letra a letra
+    if isinstance(tags, str):
+        tags = [tags]
+    return sorted({str(tag).strip() for tag in tags if str(tag).strip()})
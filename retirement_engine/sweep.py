@@ -0,0 +1,203 @@
+# =============================================================================
+# ANÁLISE DE SENSIBILIDADE (VARREDURA DE PARÂMETROS)
+# =============================================================================
+# Descrição: Avalia uma grade de valores para os principais parâmetros do
+#            plano em uma única computação vetorizada: cada ponto da grade é
+#            uma posição dos vetores, e todos avançam juntos mês a mês.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import dataclasses
+from dataclasses import dataclass
+from typing import Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from .core import (
+    BALANCE_NOISE_TOLERANCE,
+    MODE_CUSTOM,
+    STRATEGY_DRAWDOWN,
+    SimulationConfig,
+    retirement_income_schedule,
+)
+from .withdrawal import DYNAMIC_STRATEGIES, WithdrawalPolicy
+
+# -----------------------------------------------------------------------------
+# 2. PARÂMETROS VARRÍVEIS
+# -----------------------------------------------------------------------------
+SWEEP_PARAMETERS: Dict[str, str] = {
+    "retirement_age": "Idade de Aposentadoria",
+    "annual_rate_acc": "Taxa Real na Acumulação (%)",
+    "annual_rate_ret": "Taxa Real na Aposentadoria (%)",
+    "monthly_investment": "Investimento Mensal (R$)",
+    "monthly_expenses": "Despesas Mensais (R$)",
+}
+
+DEFAULT_CHUNK_SIZE = 262_144
+
+
+@dataclass
+class SweepResult:
+    """Métricas de cada ponto da grade, com formato (len(eixo 1), len(eixo 2), ...).
+
+    Pontos inválidos (por exemplo, aposentadoria antes da idade atual) ficam
+    com ``NaN``. `depletion_age` é ``NaN`` quando o patrimônio não se esgota.
+    """
+
+    axes: Dict[str, np.ndarray]
+    portfolio_at_retirement: np.ndarray
+    final_balance: np.ndarray
+    depletion_age: np.ndarray
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.final_balance.shape
+
+
+# -----------------------------------------------------------------------------
+# 3. SIMULAÇÃO EM LOTE
+# -----------------------------------------------------------------------------
+def simulate_batch(
+    base: SimulationConfig,
+    retirement_age: np.ndarray,
+    annual_rate_acc: np.ndarray,
+    annual_rate_ret: np.ndarray,
+    monthly_investment: np.ndarray,
+    monthly_expenses: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Simula N variações de `base`, uma por posição dos vetores de parâmetros.
+
+    Reproduz a recursão mês a mês de `run_simulation`, mas avança todos os
+    pontos juntos; cada ponto para no seu próprio número de meses ou no
+    primeiro saldo negativo. Nas regras dinâmicas cada ponto tem a sua
+    própria retirada, atualizada com máscaras a cada mês. Devolve (patrimônio na aposentadoria, saldo
+    final, mês de esgotamento ou ``-1``).
+    """
+    current_age = base.current_age
+    retirement_age = np.asarray(retirement_age, dtype=float)
+    rate_acc = (1 + np.asarray(annual_rate_acc, dtype=float) / 100) ** (1 / 12) - 1
+    rate_ret = (1 + np.asarray(annual_rate_ret, dtype=float) / 100) ** (1 / 12) - 1
+    monthly_investment = np.asarray(monthly_investment, dtype=float)
+    monthly_expenses = np.asarray(monthly_expenses, dtype=float)
+    acc_months = np.ceil((retirement_age - current_age) * 12).astype(int)
+    ret_months = np.ceil((base.life_expectancy - retirement_age) * 12).astype(int)
+
+    # Fase de acumulação
+    balance = np.full(len(retirement_age), float(base.total_investments_today))
+    for m in range(int(acc_months.max(initial=0))):
+        active = m < acc_months
+        balance = np.where(active, balance * (1 + rate_acc) + monthly_investment, balance)
+    portfolio_at_retirement = balance.copy()
+
+    # Fase de aposentadoria
+    max_ret_months = int(ret_months.max(initial=0))
+    policy = None
+    if base.strategy_mode == MODE_CUSTOM:
+        # A renda adicional depende apenas da idade de aposentadoria, então a
+        # matriz de rendas é calculada uma vez por idade distinta.
+        unique_ages, age_index = np.unique(retirement_age, return_inverse=True)
+        schedules = np.zeros((len(unique_ages), max_ret_months))
+        for i, age in enumerate(unique_ages):
+            months = int(np.ceil((base.life_expectancy - age) * 12))
+            if months > 0:
+                config = dataclasses.replace(base, retirement_age=float(age))
+                schedules[i, :months] = retirement_income_schedule(config)[:max_ret_months]
+        stops_on_depletion = True
+    else:
+        n = ret_months
+        if base.strategy_type in DYNAMIC_STRATEGIES:
+            policy = WithdrawalPolicy(base.strategy_type, base.withdrawal_rule, portfolio_at_retirement, rate_ret, n)
+            stops_on_depletion = True
+        elif base.strategy_type == STRATEGY_DRAWDOWN:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                growth = (1 + rate_ret) ** n
+                withdrawal = np.where(
+                    rate_ret == 0,
+                    portfolio_at_retirement / np.maximum(n, 1),
+                    portfolio_at_retirement * (rate_ret * growth) / (growth - 1),
+                )
+            stops_on_depletion = True
+        else:
+            withdrawal = portfolio_at_retirement * rate_ret
+            stops_on_depletion = False
+
+    depletion_month = np.full(len(retirement_age), -1)
+    alive = np.ones(len(retirement_age), dtype=bool)
+    # Escala da recursão: saldos no nível do ruído são zerados, como em `run_simulation`
+    scale = np.abs(balance)
+    for m in range(1, max_ret_months + 1):
+        active = alive & (m <= ret_months)
+        if policy is not None:
+            grown = balance * (1 + rate_ret)
+            net_withdrawal = policy.withdrawal(m - 1, grown)
+            balance = np.where(active, grown - net_withdrawal, balance)
+        else:
+            if base.strategy_mode == MODE_CUSTOM:
+                net_withdrawal = monthly_expenses - schedules[age_index, m - 1]
+            else:
+                net_withdrawal = withdrawal
+            balance = np.where(active, balance * (1 + rate_ret) - net_withdrawal, balance)
+        scale = np.where(active, scale * (1 + rate_ret) + np.abs(net_withdrawal), scale)
+        balance[np.abs(balance) <= BALANCE_NOISE_TOLERANCE * scale] = 0.0
+        if stops_on_depletion:
+            newly_depleted = active & (balance < 0)
+            depletion_month[newly_depleted] = m
+            alive &= ~newly_depleted
+
+    return portfolio_at_retirement, balance, depletion_month
+
+
+def run_sweep(
+    base: SimulationConfig,
+    grid: Mapping[str, Sequence[float]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> SweepResult:
+    """Avalia o produto cartesiano dos valores em `grid`.
+
+    Parâmetros ausentes de `grid` mantêm o valor de `base`. Os pontos são
+    processados em blocos de até `chunk_size` para limitar a memória.
+    """
+    unknown = set(grid) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Parâmetros não suportados na varredura: {sorted(unknown)}")
+    axes = {name: np.asarray(values, dtype=float) for name, values in grid.items()}
+    shape = tuple(len(values) for values in axes.values())
+
+    base_values = {
+        "retirement_age": base.retirement_age,
+        "annual_rate_acc": base.annual_rate_acc,
+        "annual_rate_ret": base.annual_rate_ret,
+        "monthly_investment": base.monthly_investment,
+        "monthly_expenses": base.monthly_expenses or 0.0,
+    }
+    mesh = np.meshgrid(*axes.values(), indexing="ij") if axes else []
+    points = {name: np.full(int(np.prod(shape)), value, dtype=float) for name, value in base_values.items()}
+    for name, values in zip(axes, mesh):
+        points[name] = values.ravel()
+
+    current_age = base.current_age
+    valid = (points["retirement_age"] > current_age) & (base.life_expectancy > points["retirement_age"])
+    portfolio_at_retirement = np.full(valid.shape, np.nan)
+    final_balance = np.full(valid.shape, np.nan)
+    depletion_age = np.full(valid.shape, np.nan)
+
+    valid_index = np.flatnonzero(valid)
+    for start in range(0, len(valid_index), chunk_size):
+        index = valid_index[start:start + chunk_size]
+        chunk = {name: values[index] for name, values in points.items()}
+        par, final, depletion_month = simulate_batch(base, **chunk)
+        portfolio_at_retirement[index] = par
+        final_balance[index] = final
+        depletion_age[index] = np.where(
+            depletion_month >= 0, chunk["retirement_age"] + depletion_month / 12, np.nan
+        )
+
+    return SweepResult(
+        axes=axes,
+        portfolio_at_retirement=portfolio_at_retirement.reshape(shape),
+        final_balance=final_balance.reshape(shape),
+        depletion_age=depletion_age.reshape(shape),
+    )
+
@@ -0,0 +1,204 @@
+# =============================================================================
+# REGRAS DE RETIRADA
+# =============================================================================
+# Descrição: Estratégias de retirada da fase de aposentadoria. Além das
+#            regras fixas (Drawdown e Renda Perpétua), define regras
+#            dinâmicas cuja retirada depende do saldo de cada mês: guardrails
+#            de Guyton-Klinger, retirada percentual variável (VPW), regra dos
+#            4% com teto de reajuste e piso e teto. A decisão de cada mês é
+#            tomada para todos os caminhos (ou pontos da grade) de uma vez,
+#            com máscaras sobre arrays do NumPy.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# 2. ESTRATÉGIAS
+# -----------------------------------------------------------------------------
+STRATEGY_DRAWDOWN = "Zerar os Ativos (Drawdown)"
+STRATEGY_PERPETUAL = "Renda Perpétua (Preservar o Principal)"
+STRATEGY_GUYTON_KLINGER = "Guardrails de Guyton-Klinger"
+STRATEGY_VPW = "Retirada Percentual Variável (VPW)"
+STRATEGY_FOUR_PERCENT = "Regra dos 4% com Teto de Reajuste"
+STRATEGY_FLOOR_CEILING = "Piso e Teto"
+
+# Estratégias cuja retirada é recalculada ao longo da aposentadoria
+DYNAMIC_STRATEGIES: Tuple[str, ...] = (
+    STRATEGY_GUYTON_KLINGER,
+    STRATEGY_VPW,
+    STRATEGY_FOUR_PERCENT,
+    STRATEGY_FLOOR_CEILING,
+)
+STRATEGY_TYPES: Tuple[str, ...] = (STRATEGY_DRAWDOWN, STRATEGY_PERPETUAL) + DYNAMIC_STRATEGIES
+
+# Taxa inicial de retirada (% ao ano) quando `WithdrawalRule.initial_rate` não é informada
+DEFAULT_INITIAL_RATES: Dict[str, float] = {
+    STRATEGY_GUYTON_KLINGER: 5.0,
+    STRATEGY_FOUR_PERCENT: 4.0,
+    STRATEGY_FLOOR_CEILING: 5.0,
+}
+
+# Guyton-Klinger: nos últimos 15 anos a regra de preservação do capital não corta a retirada
+GUARDRAIL_CUT_HORIZON_MONTHS = 15 * 12
+
+
+@dataclass(frozen=True)
+class WithdrawalRule:
+    """Parâmetros das regras dinâmicas, todos em %.
+
+    - `initial_rate`: retirada anual inicial sobre o patrimônio na
+      aposentadoria (``None`` usa o padrão da estratégia);
+    - `guardrail` e `adjustment` (Guyton-Klinger): a retirada é cortada (ou
+      aumentada) em `adjustment` quando a taxa corrente passa `guardrail`
+      acima (ou abaixo) da taxa inicial;
+    - `inflation` e `inflation_cap` (regra dos 4%): a retirada nominal é
+      reajustada pela inflação limitada ao teto, o que reduz o valor real
+      quando a inflação supera o teto;
+    - `floor` e `ceiling` (piso e teto): limites da retirada em relação à
+      retirada inicial.
+
+    As retiradas são em valores reais, como as taxas da simulação.
+    """
+
+    initial_rate: Optional[float] = None
+    guardrail: float = 20.0
+    adjustment: float = 10.0
+    inflation: float = 4.0
+    inflation_cap: float = 3.0
+    floor: float = 90.0
+    ceiling: float = 125.0
+
+    def rate_for(self, strategy_type: str) -> float:
+        """Taxa anual inicial (%) efetiva para `strategy_type`."""
+        if self.initial_rate is not None:
+            return self.initial_rate
+        return DEFAULT_INITIAL_RATES.get(strategy_type, 0.0)
+
+    def validate(self) -> None:
+        if self.initial_rate is not None and self.initial_rate <= 0:
+            raise ValueError("A taxa inicial de retirada deve ser positiva.")
+        if not 0 <= self.guardrail < 100 or not 0 <= self.adjustment < 100:
+            raise ValueError("Os guardrails e o ajuste devem estar entre 0% e 100%.")
+        if self.inflation <= -100 or self.inflation_cap <= -100:
+            raise ValueError("A inflação e o teto de reajuste devem ser maiores que -100%.")
+        if not 0 <= self.floor <= self.ceiling:
+            raise ValueError("O piso deve estar entre 0% e o teto.")
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "WithdrawalRule":
+        data = data or {}
+        defaults = cls()
+        initial_rate = data.get("initial_rate")
+        return cls(
+            initial_rate=float(initial_rate) if initial_rate is not None else None,
+            guardrail=float(data.get("guardrail", defaults.guardrail)),
+            adjustment=float(data.get("adjustment", defaults.adjustment)),
+            inflation=float(data.get("inflation", defaults.inflation)),
+            inflation_cap=float(data.get("inflation_cap", defaults.inflation_cap)),
+            floor=float(data.get("floor", defaults.floor)),
+            ceiling=float(data.get("ceiling", defaults.ceiling)),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "initial_rate": self.initial_rate,
+            "guardrail": self.guardrail,
+            "adjustment": self.adjustment,
+            "inflation": self.inflation,
+            "inflation_cap": self.inflation_cap,
+            "floor": self.floor,
+            "ceiling": self.ceiling,
+        }
+
+
+# -----------------------------------------------------------------------------
+# 3. POLÍTICA VETORIZADA
+# -----------------------------------------------------------------------------
+def annuity_due_factor(monthly_rate: Any, months: Any) -> np.ndarray:
+    """Fração do saldo retirada agora para zerá-lo em `months` retiradas iguais.
+
+    Anuidade antecipada: a primeira retirada é feita sobre o saldo corrente
+    e as seguintes rendem `monthly_rate`; com ``months == 1`` o fator é 1.
+    """
+    monthly_rate = np.asarray(monthly_rate, dtype=float)
+    months = np.maximum(np.asarray(months), 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        discount = 1 / (1 + monthly_rate)
+        # A potência é sempre calculada sobre arrays: para escalares o NumPy usa
+        # outra rotina, e o resultado deve ser idêntico com um ou vários caminhos.
+        shape = np.broadcast(discount, months).shape
+        powered = np.power(np.atleast_1d(discount), np.atleast_1d(months)).reshape(shape)
+        factor = (1 - discount) / (1 - powered)
+    return np.where(monthly_rate == 0, 1 / months, factor)
+
+
+class WithdrawalPolicy:
+    """Retirada mensal de uma regra dinâmica para vários caminhos ao mesmo tempo.
+
+    Os argumentos são arrays que se combinam por broadcasting: um elemento
+    por caminho de Monte Carlo, por ponto da grade de sensibilidade ou um
+    único valor na simulação determinística. A cada mês `withdrawal` recebe
+    o saldo já corrigido pelo retorno do mês e devolve a retirada de cada
+    caminho; o estado (a retirada corrente) é atualizado com máscaras, sem
+    laços por caminho.
+    """
+
+    def __init__(
+        self,
+        strategy_type: str,
+        rule: WithdrawalRule,
+        portfolio_at_retirement: Any,
+        monthly_rate: Any,
+        retirement_months: Any,
+    ):
+        if strategy_type not in DYNAMIC_STRATEGIES:
+            raise ValueError(f"Estratégia sem regra dinâmica: {strategy_type!r}")
+        self.strategy_type = strategy_type
+        self.rule = rule
+        self.monthly_rate = np.asarray(monthly_rate, dtype=float)
+        self.retirement_months = np.asarray(retirement_months)
+        portfolio = np.asarray(portfolio_at_retirement, dtype=float)
+        self.annual_rate = rule.rate_for(strategy_type) / 100
+        if strategy_type == STRATEGY_VPW:
+            # Mesmo valor do Drawdown: a anuidade sobre todo o horizonte
+            growth = 1 + self.monthly_rate
+            self.initial_withdrawal = portfolio * growth * annuity_due_factor(self.monthly_rate, self.retirement_months)
+        else:
+            self.initial_withdrawal = portfolio * self.annual_rate / 12
+        self.current = self.initial_withdrawal.copy()
+
+    def withdrawal(self, month: int, balance: np.ndarray) -> np.ndarray:
+        """Retirada do mês `month` (``0`` = primeiro mês da aposentadoria)."""
+        if self.strategy_type == STRATEGY_VPW:
+            remaining = self.retirement_months - month
+            self.current = np.maximum(balance, 0.0) * annuity_due_factor(self.monthly_rate, remaining)
+            return self.current
+        if month == 0 or month % 12:
+            return self.current
+
+        # Revisão anual
+        rule = self.rule
+        if self.strategy_type == STRATEGY_GUYTON_KLINGER:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                current_rate = np.where(balance > 0, self.current * 12 / balance, np.inf)
+            guardrail = rule.guardrail / 100
+            can_cut = self.retirement_months - month > GUARDRAIL_CUT_HORIZON_MONTHS
+            cut = can_cut & (current_rate > self.annual_rate * (1 + guardrail))
+            raise_ = current_rate < self.annual_rate * (1 - guardrail)
+            adjustment = np.where(cut, 1 - rule.adjustment / 100, np.where(raise_, 1 + rule.adjustment / 100, 1.0))
+            self.current = self.current * adjustment
+        elif self.strategy_type == STRATEGY_FOUR_PERCENT:
+            inflation = rule.inflation / 100
+            self.current = self.current * (1 + min(inflation, rule.inflation_cap / 100)) / (1 + inflation)
+        else:
+            target = np.maximum(balance, 0.0) * self.annual_rate / 12
+            self.current = np.clip(
+                target, self.initial_withdrawal * rule.floor / 100, self.initial_withdrawal * rule.ceiling / 100
+            )
+        return self.current
@@ -0,0 +1,239 @@
+# =============================================================================
+# GRAVAÇÃO EM FLUXO (STREAMING)
+# =============================================================================
+# Descrição: Gravadores de tabelas que recebem os dados em blocos e os
+#            escrevem imediatamente em CSV (opcionalmente gzip), Parquet
+#            (com compressão) ou Excel (modo de memória constante do
+#            xlsxwriter). A memória usada depende do tamanho do bloco, não do
+#            total de linhas gravadas.
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import gzip
+import io
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from .core import SimulationConfig, simulation_timeline
+from .monte_carlo import MonteCarloSettings, iter_path_chunks
+
+# -----------------------------------------------------------------------------
+# 2. CONSTANTES
+# -----------------------------------------------------------------------------
+DEFAULT_PARQUET_COMPRESSION = "zstd"
+# Nível 1: a formatação dos números já domina o tempo de gravação do CSV
+CSV_GZIP_LEVEL = 1
+EXCEL_MAX_ROWS = 1_048_576
+SUPPORTED_SUFFIXES = (".csv", ".csv.gz", ".parquet", ".xlsx")
+
+Chunk = Mapping[str, np.ndarray]
+
+
+# -----------------------------------------------------------------------------
+# 3. GRAVADORES
+# -----------------------------------------------------------------------------
+class TableWriter(ABC):
+    """Base dos gravadores: `write` recebe um bloco (coluna -> array) por vez.
+
+    Todas as colunas de `columns` devem estar presentes em cada bloco, com o
+    mesmo comprimento. Use como gerenciador de contexto para fechar o arquivo.
+    """
+
+    def __init__(self, path: Union[str, Path], columns: Sequence[str]):
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.rows_written = 0
+
+    def write(self, chunk: Chunk) -> None:
+        arrays = [np.asarray(chunk[name]) for name in self.columns]
+        n_rows = len(arrays[0]) if arrays else 0
+        if any(len(array) != n_rows for array in arrays):
+            raise ValueError("Todas as colunas do bloco devem ter o mesmo comprimento.")
+        if n_rows:
+            self._write(arrays, n_rows)
+            self.rows_written += n_rows
+
+    @abstractmethod
+    def _write(self, arrays: Sequence[np.ndarray], n_rows: int) -> None:
+        """Grava um bloco não vazio, já validado por `write`."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Conclui e fecha o arquivo."""
+
+    def __enter__(self) -> "TableWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class CsvTableWriter(TableWriter):
+    """CSV em UTF-8; com ``compression="gzip"`` (ou sufixo ``.gz``) o arquivo é comprimido.
+
+    Cada bloco é formatado pelo gravador de CSV do pandas; valores ausentes
+    (``NaN``) viram campo vazio, como na exportação da interface.
+    """
+
+    def __init__(self, path: Union[str, Path], columns: Sequence[str], compression: Optional[str] = None):
+        super().__init__(path, columns)
+        if compression is None and self.path.suffix == ".gz":
+            compression = "gzip"
+        if compression not in (None, "gzip"):
+            raise ValueError(f"Compressão não suportada para CSV: {compression}")
+        if compression == "gzip":
+            self._file = io.TextIOWrapper(gzip.open(self.path, "wb", compresslevel=CSV_GZIP_LEVEL), encoding="utf-8", newline="")
+        else:
+            self._file = open(self.path, "w", encoding="utf-8", newline="")
+        self._file.write(",".join(_csv_field(name) for name in self.columns) + "\n")
+
+    def _write(self, arrays: Sequence[np.ndarray], n_rows: int) -> None:
+        import pandas as pd
+
+        frame = pd.DataFrame(dict(zip(self.columns, arrays)), copy=False)
+        frame.to_csv(self._file, header=False, index=False, lineterminator="\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetTableWriter(TableWriter):
+    """Parquet com um row group por bloco; as colunas são passadas ao Arrow sem cópia."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        columns: Sequence[str],
+        compression: Optional[str] = DEFAULT_PARQUET_COMPRESSION,
+    ):
+        super().__init__(path, columns)
+        import pyarrow.parquet
+
+        self._writer: Any = None
+        self._parquet = pyarrow.parquet
+        self._compression = compression or "none"
+
+    def _write(self, arrays: Sequence[np.ndarray], n_rows: int) -> None:
+        import pyarrow
+
+        table = pyarrow.Table.from_arrays(
+            [pyarrow.array(array, from_pandas=True) for array in arrays], names=self.columns
+        )
+        if self._writer is None:
+            self._writer = self._parquet.ParquetWriter(self.path, table.schema, compression=self._compression)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is None:
+            # Nenhum bloco gravado: cria um arquivo vazio com as colunas.
+            import pyarrow
+
+            empty = pyarrow.table({name: pyarrow.array([], pyarrow.float64()) for name in self.columns})
+            self._parquet.write_table(empty, self.path, compression=self._compression)
+        else:
+            self._writer.close()
+
+
+class ExcelTableWriter(TableWriter):
+    """Planilha Excel no modo `constant_memory` do xlsxwriter.
+
+    Cada linha é gravada no disco assim que a seguinte começa; ao atingir o
+    limite de linhas do Excel, os dados continuam em uma nova aba.
+    """
+
+    def __init__(self, path: Union[str, Path], columns: Sequence[str], sheet_name: str = "Simulacao"):
+        super().__init__(path, columns)
+        import xlsxwriter
+
+        self._workbook = xlsxwriter.Workbook(str(self.path), {"constant_memory": True})
+        self._sheet_name = sheet_name
+        self._sheet_count = 0
+        self._new_sheet()
+
+    def _new_sheet(self) -> None:
+        self._sheet_count += 1
+        name = self._sheet_name if self._sheet_count == 1 else f"{self._sheet_name}_{self._sheet_count}"
+        self._worksheet = self._workbook.add_worksheet(name)
+        self._worksheet.write_row(0, 0, self.columns)
+        self._row = 1
+
+    def _write(self, arrays: Sequence[np.ndarray], n_rows: int) -> None:
+        # Converte o bloco para listas Python uma vez; NaN vira célula vazia.
+        columns = [
+            [None if value != value else value for value in array.tolist()]
+            for array in arrays
+        ]
+        for values in zip(*columns):
+            if self._row >= EXCEL_MAX_ROWS:
+                self._new_sheet()
+            self._worksheet.write_row(self._row, 0, values)
+            self._row += 1
+
+    def close(self) -> None:
+        self._workbook.close()
+
+
+def open_table_writer(
+    path: Union[str, Path],
+    columns: Sequence[str],
+    compression: Optional[str] = None,
+) -> TableWriter:
+    """Escolhe o gravador pela extensão: ``.csv``, ``.csv.gz``, ``.parquet`` ou ``.xlsx``."""
+    name = Path(path).name.lower()
+    if name.endswith(".csv") or name.endswith(".csv.gz"):
+        return CsvTableWriter(path, columns, compression)
+    if name.endswith(".parquet"):
+        return ParquetTableWriter(path, columns, compression or DEFAULT_PARQUET_COMPRESSION)
+    if name.endswith(".xlsx"):
+        return ExcelTableWriter(path, columns)
+    raise ValueError(f"Formato não suportado: {name} (use {', '.join(SUPPORTED_SUFFIXES)})")
+
+
+def _csv_field(value: str) -> str:
+    if any(c in value for c in ',"\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+# -----------------------------------------------------------------------------
+# 4. CAMINHOS DE MONTE CARLO
+# -----------------------------------------------------------------------------
+MONTE_CARLO_PATH_COLUMNS = ("path", "month", "age", "portfolio")
+
+
+def write_monte_carlo_paths(
+    config: SimulationConfig,
+    settings: MonteCarloSettings,
+    path: Union[str, Path],
+    chunk_paths: int = 1_000,
+    compression: Optional[str] = None,
+) -> int:
+    """Simula os caminhos em blocos e grava cada caminho-mês como uma linha.
+
+    Em formato longo (`MONTE_CARLO_PATH_COLUMNS`), um bloco de cerca de
+    `chunk_paths` caminhos (fluxos inteiros, ver `iter_path_chunks`) é
+    simulado, gravado e descartado antes do próximo; a memória fica limitada
+    pelo tamanho do bloco. Os caminhos são os mesmos de `run_monte_carlo`
+    com a mesma semente. Devolve o número de linhas gravadas.
+    """
+    ages = simulation_timeline(config)
+    n_months = len(ages)
+    months = np.arange(n_months, dtype=np.int32)
+    with open_table_writer(path, MONTE_CARLO_PATH_COLUMNS, compression) as writer:
+        for first_path, balances, _ in iter_path_chunks(config, settings, chunk_paths):
+            n_paths = balances.shape[1]
+            # Saldos em ordem caminho-a-caminho: transposição de um bloco pequeno.
+            writer.write({
+                "path": np.repeat(np.arange(first_path, first_path + n_paths, dtype=np.int64), n_months),
+                "month": np.tile(months, n_paths),
+                "age": np.tile(ages, n_paths),
+                "portfolio": balances.T.ravel(),
+            })
+        return writer.rows_written
+
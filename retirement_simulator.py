@@ -9,34 +9,74 @@
 # 1. IMPORTAÇÃO DE BIBLIOTECAS
 # -----------------------------------------------------------------------------
 import streamlit as st
-import pandas as pd
+import dataclasses
 import datetime
 import math
-import plotly.graph_objects as go
-import io
 import numpy as np
-from PIL import ImageColor
 import json
+from retirement_engine import (
+    MODE_CUSTOM,
+    MODE_STRATEGY,
+    STRATEGY_DRAWDOWN,
+    IncomeSource,
+    MonteCarloSettings,
+    SharedCache,
+    SimulationConfig,
+    config_hash,
+    run_monte_carlo,
+)
+from retirement_engine.assets import AssetClass, AssetModel, GlidePath
+from retirement_engine.backtest import BacktestSettings, load_return_history, run_backtest
+from retirement_engine.mortality import load_mortality_table, survival_weighted_ruin
+from retirement_engine.pipeline import StagedSimulator
+from retirement_engine.profiling import RunProfile, profiling_requested
+from retirement_engine.scenarios import Scenario, compare_scenarios, simulate_scenarios
+from retirement_engine.solver import (
+    solve_monthly_expenses,
+    solve_monthly_investment,
+    solve_retirement_age,
+)
+from retirement_engine.store import ResultStore
+from retirement_engine.sweep import SWEEP_PARAMETERS, run_sweep
+from retirement_engine.withdrawal import (
+    DYNAMIC_STRATEGIES,
+    STRATEGY_FLOOR_CEILING,
+    STRATEGY_FOUR_PERCENT,
+    STRATEGY_GUYTON_KLINGER,
+    STRATEGY_TYPES,
+    STRATEGY_VPW,
+    WithdrawalRule,
+)
+
+# Número máximo de entradas de cada etapa intermediária mantidas por sessão
+RESULT_CACHE_SIZE = 32
+# Chave da taxa inicial de retirada de cada regra dinâmica (cada uma tem o seu padrão)
+INITIAL_RATE_KEYS = {
+    STRATEGY_GUYTON_KLINGER: 'wr_initial_rate_guardrails',
+    STRATEGY_FOUR_PERCENT: 'wr_initial_rate_four_percent',
+    STRATEGY_FLOOR_CEILING: 'wr_initial_rate_floor_ceiling',
+}
 
 # -----------------------------------------------------------------------------
 # 2. CONFIGURAÇÃO DA PÁGINA
 # -----------------------------------------------------------------------------
-st.set_page_config(
-    page_title="Simulador Avançado de Aposentadoria",
-    layout="wide",
-    initial_sidebar_state="expanded",
-    menu_items={
-        'Get Help': 'https://github.com/seu-usuario/retirement-simulator',
-        'Report a bug': "https://github.com/seu-usuario/retirement-simulator/issues",
-        'About': "# Simulador Avançado de Aposentadoria\nDesenvolvido para ajudar no planejamento financeiro da sua aposentadoria."
-    }
-)
+def configure_page():
+    """Configuração da página; chamada no início de `main`, não na importação do módulo."""
+    st.set_page_config(
+        page_title="Simulador Avançado de Aposentadoria",
+        layout="wide",
+        initial_sidebar_state="expanded",
+        menu_items={
+            'Get Help': 'https://github.com/seu-usuario/retirement-simulator',
+            'Report a bug': "https://github.com/seu-usuario/retirement-simulator/issues",
+            'About': "# Simulador Avançado de Aposentadoria\nDesenvolvido para ajudar no planejamento financeiro da sua aposentadoria."
+        }
+    )
 
 # -----------------------------------------------------------------------------
 # 3. ESTILIZAÇÃO CSS
 # -----------------------------------------------------------------------------
-st.markdown(
-    """
+APP_CSS = """
     <style>
     /* Tema geral e cores */
     :root {
@@ -142,14 +182,106 @@ st.markdown(
         animation: fadeIn 0.5s ease-in;
     }
     </style>
-    """,
-    unsafe_allow_html=True
-)
+    """
+
+
+def inject_styles():
+    """Injeta o CSS da aplicação; chamada a cada execução de `main`."""
+    st.markdown(APP_CSS, unsafe_allow_html=True)
+
 
 # -----------------------------------------------------------------------------
 # 4. FUNÇÃO PRINCIPAL
 # -----------------------------------------------------------------------------
+def render_profile_panel(profile):
+    """Painel de diagnóstico na barra lateral (ativado com ``?profile=1`` ou `RETIREMENT_PROFILE`)."""
+    data = profile.to_dict()
+    with st.sidebar.expander("🐞 Diagnóstico de Desempenho", expanded=False):
+        st.caption(f"Execução {data['run_id']} · {data['total_ms']:,.1f} ms até aqui")
+        st.table({
+            "Seção": list(data["sections_ms"]),
+            "Tempo (ms)": [f"{ms:,.1f}" for ms in data["sections_ms"].values()]
+        })
+        if data["arrays"]:
+            st.table({
+                "Array": list(data["arrays"]),
+                "Formato": [" × ".join(map(str, info["shape"])) for info in data["arrays"].values()],
+                "Tamanho (KB)": [f"{info['nbytes'] / 1024:,.1f}" for info in data["arrays"].values()]
+            })
+        for name, stats in data["caches"].items():
+            st.caption(f"{name}: {stats['hits']} acertos, {stats['misses']} faltas ({stats['size']} entradas)")
+        shared = data.get("shared_cache")
+        if shared:
+            st.caption(
+                f"Cache compartilhado: {shared['entries']} entradas, "
+                f"{shared['bytes'] / 2**20:,.1f} de {shared['max_bytes'] / 2**20:,.0f} MB · "
+                f"{shared['hits']} acertos, {shared['misses']} faltas, "
+                f"{shared['evictions']} descartes e {shared['expirations']} expirações desde o início do processo"
+            )
+        st.caption("Uma linha JSON com estes dados é registrada em stderr a cada atualização.")
+
+
+@st.cache_resource
+def shared_result_cache():
+    """Cache de resultados, gráficos e arquivos do processo, compartilhado entre as sessões.
+
+    Limite de memória e validade definidos por `RETIREMENT_SHARED_CACHE_MB` e
+    `RETIREMENT_SHARED_CACHE_TTL`.
+    """
+    return SharedCache.from_env()
+
+
+@st.cache_resource
+def open_result_store():
+    """Banco de resultados do processo (definido por `RETIREMENT_STORE`), compartilhado entre as sessões."""
+    return ResultStore.from_env()
+
+
+def render_store_panel(store, config, result):
+    """Painel da barra lateral para salvar o plano atual e listar os planos de um cliente."""
+    with st.sidebar.expander("🗄️ Planos Salvos", expanded=False):
+        client = st.text_input(
+            "Cliente",
+            value=st.session_state.get('store_client', ''),
+            help="Nome ou código do cliente a quem o plano pertence",
+            key='store_client'
+        ).strip()
+        tags = st.text_input(
+            "Etiquetas",
+            value=st.session_state.get('store_tags', ''),
+            help="Separadas por vírgula (ex.: base, revisão 2026)",
+            key='store_tags'
+        )
+        if st.button("💾 Salvar Plano Atual", key='store_save', use_container_width=True):
+            store.put(config, result, client=client or None, tags=tags.split(","))
+            st.success("✅ Plano salvo.")
+        plans = store.find(client=client or None, limit=20)
+        if plans:
+            st.table({
+                "Cliente": [plan.client or "—" for plan in plans],
+                "Aposentadoria": [f"{plan.config.retirement_age:g} anos" for plan in plans],
+                "Patrimônio": [f"R$ {plan.portfolio_at_retirement:,.0f}" for plan in plans],
+                "Etiquetas": [", ".join(plan.tags) for plan in plans]
+            })
+        st.caption(
+            f"{len(store)} resultados ({store.total_bytes / 1024:,.0f} KB) · "
+            f"{store.hits} acertos, {store.misses} faltas neste processo"
+        )
+
+
 def main():
+    """Executa a interface medindo cada seção; o perfil só é exibido e registrado se solicitado."""
+    profile = RunProfile(enabled=profiling_requested(st.query_params.get("profile")))
+    try:
+        render_app(profile)
+    finally:
+        profile.finish()
+
+
+def render_app(profile):
+    configure_page()
+    inject_styles()
+    
     # Inicialização do session_state
     if 'initialized' not in st.session_state:
         st.session_state.initialized = True
@@ -163,6 +295,7 @@ def main():
         st.session_state.strategy_mode = "Retirada Personalizada"
         st.session_state.monthly_expenses = 4000.0
         st.session_state.n_sources = 0
+    profile.lap("setup")
 
     # -------------------------------------------------------------------------
     # 4.1 INTERFACE PRINCIPAL
@@ -215,6 +348,21 @@ def main():
                     "n_sources": st.session_state.n_sources,
                     "income_sources": income_sources_export
                 }
+                if config["strategy_type"] in DYNAMIC_STRATEGIES:
+                    default_rule = WithdrawalRule()
+                    config["withdrawal_rule"] = {
+                        name: st.session_state.get(f"wr_{name}", value)
+                        for name, value in default_rule.to_dict().items()
+                    }
+                    if config["strategy_type"] in INITIAL_RATE_KEYS:
+                        config["withdrawal_rule"]["initial_rate"] = st.session_state.get(
+                            INITIAL_RATE_KEYS[config["strategy_type"]], default_rule.rate_for(config["strategy_type"])
+                        )
+                
+                # Parâmetros da última simulação de Monte Carlo, com a semente e a
+                # impressão digital do resultado, para reproduzi-la ao importar
+                if st.session_state.get('enable_monte_carlo') and 'mc_export' in st.session_state:
+                    config["monte_carlo"] = st.session_state.mc_export
                 
                 json_str = json.dumps(config, indent=2, ensure_ascii=False)
                 st.download_button(
@@ -315,6 +463,16 @@ def main():
                             if imported_config.get("strategy_type"):
                                 st.session_state.strategy_type = str(imported_config["strategy_type"])
                             
+                            if imported_config.get("withdrawal_rule"):
+                                for name, value in imported_config["withdrawal_rule"].items():
+                                    if value is None:
+                                        continue
+                                    if name == "initial_rate":
+                                        if imported_config.get("strategy_type") in INITIAL_RATE_KEYS:
+                                            st.session_state[INITIAL_RATE_KEYS[imported_config["strategy_type"]]] = float(value)
+                                    else:
+                                        st.session_state[f"wr_{name}"] = float(value)
+                            
                             # Atualizar número de fontes de renda
                             if imported_config.get("n_sources"):
                                 st.session_state.n_sources = int(imported_config["n_sources"])
@@ -330,6 +488,29 @@ def main():
                                     if not source["lifetime"] and source.get("duration_years"):
                                         st.session_state[f"duration_{i}"] = int(source["duration_years"])
                             
+                            if imported_config.get("monte_carlo"):
+                                mc_imported = MonteCarloSettings.from_dict(imported_config["monte_carlo"])
+                                st.session_state.enable_monte_carlo = True
+                                st.session_state.mc_n_paths = mc_imported.n_paths
+                                if mc_imported.seed is not None:
+                                    st.session_state.mc_seed = mc_imported.seed
+                                model = mc_imported.asset_model
+                                st.session_state.mc_multi_asset = model is not None and model.n_assets == 2
+                                if st.session_state.mc_multi_asset:
+                                    for asset_key, asset in zip(('equity', 'bonds'), model.assets):
+                                        st.session_state[f'mc_{asset_key}_return'] = asset.expected_return
+                                        st.session_state[f'mc_{asset_key}_volatility'] = asset.volatility
+                                    st.session_state.mc_correlation = model.correlation[0][1]
+                                    for share_key, weights in zip(
+                                        ('mc_equity_today', 'mc_equity_retirement', 'mc_equity_end'),
+                                        model.glide_path.weights
+                                    ):
+                                        st.session_state[share_key] = 100.0 * weights[0] / sum(weights)
+                                else:
+                                    st.session_state.mc_volatility_acc = mc_imported.volatility_acc
+                                    st.session_state.mc_volatility_ret = mc_imported.volatility_ret
+                                st.session_state.mc_expected_fingerprint = imported_config["monte_carlo"].get("fingerprint")
+                            
                             st.success("✅ Configurações importadas com sucesso!")
                             st.rerun()
                         except Exception as e:
@@ -449,11 +630,75 @@ def main():
         else:
             strategy_type = st.radio(
                 "Tipo de Estratégia",
-                ["Zerar os Ativos (Drawdown)", "Renda Perpétua (Preservar o Principal)"],
-                help="Escolha entre gastar todo o patrimônio ou preservar o principal",
+                list(STRATEGY_TYPES),
+                help="Escolha entre gastar todo o patrimônio, preservar o principal ou uma regra dinâmica, que ajusta a retirada conforme o saldo",
                 key='strategy_type',
-                index=0 if st.session_state.get('strategy_type') == "Zerar os Ativos (Drawdown)" else 1
+                index=STRATEGY_TYPES.index(st.session_state.get('strategy_type')) if st.session_state.get('strategy_type') in STRATEGY_TYPES else 0
             )
+            if strategy_type in DYNAMIC_STRATEGIES:
+                # Parâmetros da regra dinâmica; os demais mantêm os valores padrão
+                default_rule = WithdrawalRule()
+                rule_values = {}
+                if strategy_type != STRATEGY_VPW:
+                    rule_values["initial_rate"] = st.number_input(
+                        "Taxa Inicial de Retirada (% ao ano)",
+                        value=st.session_state.get(INITIAL_RATE_KEYS[strategy_type], default_rule.rate_for(strategy_type)),
+                        min_value=0.1,
+                        step=0.1,
+                        help="Retirada do primeiro ano como porcentagem do patrimônio na aposentadoria",
+                        key=INITIAL_RATE_KEYS[strategy_type]
+                    )
+                else:
+                    st.caption("A retirada de cada mês é o saldo dividido pela anuidade dos meses restantes, à taxa real da aposentadoria.")
+                if strategy_type == STRATEGY_GUYTON_KLINGER:
+                    rule_values["guardrail"] = st.number_input(
+                        "Guardrail (%)",
+                        value=st.session_state.get('wr_guardrail', default_rule.guardrail),
+                        min_value=0.0,
+                        max_value=99.0,
+                        step=1.0,
+                        help="Desvio da taxa corrente em relação à inicial que dispara um ajuste",
+                        key='wr_guardrail'
+                    )
+                    rule_values["adjustment"] = st.number_input(
+                        "Ajuste da Retirada (%)",
+                        value=st.session_state.get('wr_adjustment', default_rule.adjustment),
+                        min_value=0.0,
+                        max_value=99.0,
+                        step=1.0,
+                        help="Corte (ou aumento) da retirada quando um guardrail é atingido",
+                        key='wr_adjustment'
+                    )
+                elif strategy_type == STRATEGY_FOUR_PERCENT:
+                    rule_values["inflation"] = st.number_input(
+                        "Inflação Esperada (% ao ano)",
+                        value=st.session_state.get('wr_inflation', default_rule.inflation),
+                        step=0.1,
+                        key='wr_inflation'
+                    )
+                    rule_values["inflation_cap"] = st.number_input(
+                        "Teto de Reajuste (% ao ano)",
+                        value=st.session_state.get('wr_inflation_cap', default_rule.inflation_cap),
+                        step=0.1,
+                        help="Reajuste anual máximo da retirada; acima dele, a retirada perde valor real",
+                        key='wr_inflation_cap'
+                    )
+                elif strategy_type == STRATEGY_FLOOR_CEILING:
+                    rule_values["floor"] = st.number_input(
+                        "Piso (% da retirada inicial)",
+                        value=st.session_state.get('wr_floor', default_rule.floor),
+                        min_value=0.0,
+                        step=5.0,
+                        key='wr_floor'
+                    )
+                    rule_values["ceiling"] = st.number_input(
+                        "Teto (% da retirada inicial)",
+                        value=st.session_state.get('wr_ceiling', default_rule.ceiling),
+                        min_value=0.0,
+                        step=5.0,
+                        key='wr_ceiling'
+                    )
+                withdrawal_rule = dataclasses.replace(default_rule, **rule_values)
             st.info("💡 Seus gastos mensais serão calculados automaticamente com base na estratégia escolhida.")
         
         st.sidebar.markdown("### 💸 Rendas Adicionais")
@@ -526,6 +771,206 @@ def main():
                     "annual_rate": annual_rate_source,
                     "monthly_rate": monthly_rate_source
                 })
+        
+        st.sidebar.markdown("### 🎲 Simulação Monte Carlo")
+        enable_monte_carlo = st.checkbox(
+            "Ativar Simulação Estocástica",
+            value=bool(st.session_state.get('enable_monte_carlo', False)),
+            help="Sorteia milhares de cenários de retorno em vez de usar uma taxa fixa",
+            key='enable_monte_carlo'
+        )
+        if enable_monte_carlo:
+            mc_n_paths = st.number_input(
+                "Número de Cenários",
+                value=int(st.session_state.get('mc_n_paths', 10000)),
+                min_value=100,
+                max_value=100000,
+                step=1000,
+                key='mc_n_paths'
+            )
+            mc_multi_asset = st.checkbox(
+                "Carteira com Várias Classes de Ativos",
+                value=bool(st.session_state.get('mc_multi_asset', False)),
+                help="Sorteia retornos correlacionados de ações e renda fixa, com a alocação mudando ao longo da vida",
+                key='mc_multi_asset'
+            )
+            mc_asset_model = None
+            if mc_multi_asset:
+                asset_inputs = []
+                for asset_key, asset_name, default_return, default_volatility in (
+                    ('equity', "Ações", 6.0, 18.0),
+                    ('bonds', "Renda Fixa", 3.0, 6.0),
+                ):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        asset_return = st.number_input(
+                            f"Retorno Real de {asset_name} (%)",
+                            value=float(st.session_state.get(f'mc_{asset_key}_return', default_return)),
+                            step=0.5,
+                            key=f'mc_{asset_key}_return'
+                        )
+                    with col2:
+                        asset_volatility = st.number_input(
+                            f"Volatilidade de {asset_name} (%)",
+                            value=float(st.session_state.get(f'mc_{asset_key}_volatility', default_volatility)),
+                            min_value=0.0,
+                            step=0.5,
+                            key=f'mc_{asset_key}_volatility'
+                        )
+                    asset_inputs.append(AssetClass(asset_name, asset_return, asset_volatility))
+                mc_correlation = st.number_input(
+                    "Correlação entre Ações e Renda Fixa",
+                    value=float(st.session_state.get('mc_correlation', 0.2)),
+                    min_value=-0.99,
+                    max_value=0.99,
+                    step=0.05,
+                    key='mc_correlation'
+                )
+                st.write("Alocação em ações (%):")
+                col1, col2, col3 = st.columns(3)
+                equity_shares = []
+                for col, (share_key, share_label, default_share) in zip(
+                    (col1, col2, col3),
+                    (('mc_equity_today', "Hoje", 80.0), ('mc_equity_retirement', "Na Aposentadoria", 50.0),
+                     ('mc_equity_end', "No Fim", 30.0)),
+                ):
+                    with col:
+                        equity_shares.append(st.number_input(
+                            share_label,
+                            value=float(st.session_state.get(share_key, default_share)),
+                            min_value=0.0,
+                            max_value=100.0,
+                            step=5.0,
+                            key=share_key
+                        ))
+                mc_volatility_acc = mc_volatility_ret = 0.0
+                mc_asset_model = AssetModel(
+                    assets=tuple(asset_inputs),
+                    correlation=((1.0, mc_correlation), (mc_correlation, 1.0)),
+                    glide_path=GlidePath(
+                        ages=(
+                            (datetime.date.today() - birth_date).days / 365.25,
+                            float(retirement_age),
+                            float(life_expectancy)
+                        ),
+                        weights=tuple((share, 100.0 - share) for share in equity_shares)
+                    )
+                )
+            else:
+                col1, col2 = st.columns(2)
+                with col1:
+                    mc_volatility_acc = st.number_input(
+                        "Volatilidade na Acumulação (%)",
+                        value=float(st.session_state.get('mc_volatility_acc', 15.0)),
+                        min_value=0.0,
+                        step=0.5,
+                        key='mc_volatility_acc'
+                    )
+                with col2:
+                    mc_volatility_ret = st.number_input(
+                        "Volatilidade na Aposentadoria (%)",
+                        value=float(st.session_state.get('mc_volatility_ret', 10.0)),
+                        min_value=0.0,
+                        step=0.5,
+                        key='mc_volatility_ret'
+                    )
+            mc_seed = st.number_input(
+                "Semente Aleatória",
+                value=int(st.session_state.get('mc_seed', 42)),
+                min_value=0,
+                step=1,
+                help="Mantém os cenários sorteados iguais entre atualizações da página",
+                key='mc_seed'
+            )
+        
+        st.sidebar.markdown("### 📜 Backtest Histórico")
+        enable_backtest = st.checkbox(
+            "Ativar Backtest Histórico",
+            value=bool(st.session_state.get('enable_backtest', False)),
+            help="Simula o plano com as sequências reais de retornos de um histórico mensal",
+            key='enable_backtest'
+        )
+        return_history = None
+        if enable_backtest:
+            backtest_path = st.text_input(
+                "Arquivo de Retornos (CSV)",
+                value=st.session_state.get('backtest_path', ''),
+                help="Data na primeira coluna (ex.: 1928-01) e os retornos reais mensais de cada ativo, em fração, nas demais",
+                key='backtest_path'
+            )
+            if backtest_path:
+                try:
+                    return_history = load_return_history(backtest_path)
+                except (OSError, ValueError) as e:
+                    st.error(f"⚠️ Não foi possível ler o histórico: {e}")
+            
+            backtest_weights = None
+            if return_history is not None and len(return_history.assets) > 1:
+                st.write("Alocação da carteira (%):")
+                backtest_weights = tuple(
+                    st.number_input(
+                        asset,
+                        value=float(st.session_state.get(f'backtest_weight_{i}', 100.0 if i == 0 else 0.0)),
+                        min_value=0.0,
+                        max_value=100.0,
+                        step=5.0,
+                        key=f'backtest_weight_{i}'
+                    )
+                    for i, asset in enumerate(return_history.assets)
+                )
+                if sum(backtest_weights) <= 0:
+                    st.error("⚠️ A soma dos pesos deve ser positiva.")
+                    return_history = None
+            col1, col2 = st.columns(2)
+            with col1:
+                bt_n_bootstrap = st.number_input(
+                    "Amostras do Bootstrap",
+                    value=int(st.session_state.get('bt_n_bootstrap', 1000)),
+                    min_value=0,
+                    max_value=100000,
+                    step=500,
+                    key='bt_n_bootstrap'
+                )
+            with col2:
+                bt_block_months = st.number_input(
+                    "Tamanho do Bloco (meses)",
+                    value=int(st.session_state.get('bt_block_months', 12)),
+                    min_value=1,
+                    max_value=120,
+                    step=1,
+                    help="Meses consecutivos do histórico em cada bloco sorteado",
+                    key='bt_block_months'
+                )
+        
+        st.sidebar.markdown("### 🧬 Longevidade")
+        enable_mortality = st.checkbox(
+            "Usar Tábua de Mortalidade",
+            value=bool(st.session_state.get('enable_mortality', False)),
+            help="Pondera o esgotamento do patrimônio pela chance de estar vivo e sorteia uma idade de morte em cada cenário do Monte Carlo",
+            key='enable_mortality'
+        )
+        mortality_table = None
+        mortality_sex = None
+        if enable_mortality:
+            mortality_path = st.text_input(
+                "Arquivo da Tábua (CSV)",
+                value=st.session_state.get('mortality_path', ''),
+                help="Idade na primeira coluna e a probabilidade anual de morte (qx), em fração, de cada sexo nas demais",
+                key='mortality_path'
+            )
+            if mortality_path:
+                try:
+                    mortality_table = load_mortality_table(mortality_path)
+                except (OSError, ValueError) as e:
+                    st.error(f"⚠️ Não foi possível ler a tábua: {e}")
+            if mortality_table is not None:
+                mortality_sex = st.selectbox(
+                    "Sexo",
+                    mortality_table.sexes,
+                    index=mortality_table.sexes.index(st.session_state['mortality_sex'])
+                    if st.session_state.get('mortality_sex') in mortality_table.sexes else 0,
+                    key='mortality_sex'
+                )
 
     # -------------------------------------------------------------------------
     # 4.4 CÁLCULOS BÁSICOS E VALIDAÇÕES
@@ -570,139 +1015,166 @@ def main():
         st.error("⚠️ A expectativa de vida deve ser maior que a idade de aposentadoria.")
         return
     
-    accumulation_years = retirement_age - current_age
-    retirement_years = life_expectancy - retirement_age
-    accumulation_months = math.ceil(accumulation_years * 12)
-    retirement_months = math.ceil(retirement_years * 12)
-    
-    monthly_rate_acc = (1 + annual_rate_acc/100)**(1/12) - 1
-    monthly_rate_ret = (1 + annual_rate_ret/100)**(1/12) - 1
+    survival = None
+    if mortality_table is not None:
+        survival = mortality_table.survival_curve(mortality_sex, current_age)
     
     # -------------------------------------------------------------------------
-    # 4.5 SIMULAÇÃO DA FASE DE ACUMULAÇÃO
+    # 4.5 SIMULAÇÃO DAS FASES DE ACUMULAÇÃO E APOSENTADORIA
     # -------------------------------------------------------------------------
-    ages = []
-    portfolio_balances = []
-    net_cash_flows = []           # (Usado somente no modo "Retirada Personalizada" na aposentadoria)
-    additional_incomes_dynamic = []  # Renda adicional dinâmica (para modo personalizado)
-    
-    balance = total_investments_today
-    for m in range(accumulation_months + 1):
-        age = current_age + m/12
-        ages.append(age)
-        portfolio_balances.append(balance)
-        net_cash_flows.append(None)
-        additional_incomes_dynamic.append(None)
-        if m < accumulation_months:
-            balance = balance * (1 + monthly_rate_acc) + monthly_investment
+    profile.lap("inputs")
+    config = SimulationConfig(
+        birth_date=birth_date,
+        total_investments_today=total_investments_today,
+        monthly_investment=monthly_investment,
+        annual_rate_acc=annual_rate_acc,
+        retirement_age=retirement_age,
+        life_expectancy=life_expectancy,
+        annual_rate_ret=annual_rate_ret,
+        strategy_mode=strategy_mode,
+        monthly_expenses=monthly_expenses if strategy_mode == MODE_CUSTOM else None,
+        strategy_type=strategy_type if strategy_mode == MODE_STRATEGY else None,
+        withdrawal_rule=withdrawal_rule if strategy_mode == MODE_STRATEGY and strategy_type in DYNAMIC_STRATEGIES else WithdrawalRule(),
+        income_sources=tuple(
+            IncomeSource(
+                name=source["name"],
+                monthly_income=source["monthly_income"],
+                income_start_age=source["income_start_age"],
+                lifetime=source["lifetime"],
+                duration_years=source["duration_years"],
+                annual_rate=source["annual_rate"]
+            )
+            for source in income_sources
+        ),
+        reference_date=today
+    )
+    # Resultados em cache pelo hash das entradas: interações que só afetam a
+    # apresentação (checkboxes dos gráficos, abas) não refazem a simulação.
+    # O cache é único no processo, de modo que sessões que abrem a mesma
+    # configuração (por exemplo, o exemplo padrão) reaproveitam os resultados
+    # umas das outras, e a memória total fica limitada pelo orçamento dele.
+    result_cache = shared_result_cache()
+    # A simulação determinística é recalculada por etapas: ao mudar só uma
+    # entrada, as etapas que não dependem dela são reaproveitadas.
+    # Com `RETIREMENT_STORE`, os resultados também ficam em um banco SQLite
+    # local, que sobrevive a reinícios e é compartilhado com os jobs em lote.
+    result_store = open_result_store()
+    if 'staged_simulator' not in st.session_state:
+        st.session_state.staged_simulator = StagedSimulator(
+            maxsize=RESULT_CACHE_SIZE, store=result_store, shared=result_cache
+        )
+    simulator = st.session_state.staged_simulator
+    profile.track_cache("result_cache", result_cache)
+    result_key = config_hash(config)
+    result = simulator.run(config)
     
-    portfolio_at_retirement = balance
+    portfolio_at_retirement = result.portfolio_at_retirement
+    sim_ages = result.ages
+    sim_portfolio = result.portfolio
+    profile.lap("simulation")
+    profile.record_array("result.columns", result.columns.values)
+    profile.record_array("result.income_matrix", result.income_matrix)
     
     # -------------------------------------------------------------------------
-    # 4.6 SIMULAÇÃO DA FASE DE APOSENTADORIA
+    # 4.6 CONSELHO DE GASTOS NA APOSENTADORIA
     # -------------------------------------------------------------------------
-    retire_ages = []
-    retire_portfolio = []
-    retire_net_withdrawals = []
-    retire_additional_income = []
-    
-    if strategy_mode == "Retirada Personalizada":
-        # Simula mês a mês com renda dinâmica de cada fonte.
-        for m in range(1, retirement_months + 1):
-            sim_age = retirement_age + m/12
-            total_income = 0
-            for source in income_sources:
-                if sim_age < source["income_start_age"]:
-                    income = 0
-                else:
-                    months_since_start = int(round((sim_age - source["income_start_age"]) * 12))
-                    if not source["lifetime"]:
-                        if sim_age > source["income_start_age"] + source["duration_years"]:
-                            income = 0
-                        else:
-                            income = source["monthly_income"] * ((1 + source["monthly_rate"]) ** months_since_start)
-                    else:
-                        income = source["monthly_income"] * ((1 + source["monthly_rate"]) ** months_since_start)
-                total_income += income
-            
-            retire_additional_income.append(total_income)
-            net_withdrawal = monthly_expenses - total_income
-            retire_net_withdrawals.append(net_withdrawal)
-            balance = balance * (1 + monthly_rate_ret) - net_withdrawal
-            retire_ages.append(sim_age)
-            retire_portfolio.append(balance)
-            if balance < 0:
-                break
-    else:
-        # Modo "Retirada Baseada em Estratégia"
-        A0 = 0
-        for source in income_sources:
-            if retirement_age >= source["income_start_age"]:
-                if not source["lifetime"]:
-                    if retirement_age <= source["income_start_age"] + source["duration_years"]:
-                        A0 += source["monthly_income"]
-                else:
-                    A0 += source["monthly_income"]
-        
-        n = retirement_months
-        r = monthly_rate_ret
-        if strategy_type == "Zerar os Ativos (Drawdown)":
-            if r == 0:
-                computed_portfolio_withdrawal = portfolio_at_retirement / n
-            else:
-                computed_portfolio_withdrawal = portfolio_at_retirement * (r * (1 + r)**n) / ((1 + r)**n - 1)
-        else:  # "Renda Perpétua (Preservar o Principal)"
-            computed_portfolio_withdrawal = portfolio_at_retirement * r
-        
-        recommended_total_spending = computed_portfolio_withdrawal + A0
+    if strategy_mode == MODE_STRATEGY:
+        A0 = result.initial_additional_income
+        computed_portfolio_withdrawal = result.computed_portfolio_withdrawal
+        recommended_total_spending = result.recommended_total_spending
         
         st.subheader("Conselho de Gastos na Aposentadoria")
         st.write(f"Na aposentadoria (aos {retirement_age} anos), seu portfólio está estimado em **R$ {portfolio_at_retirement:,.2f}**.")
         st.write(f"Com base na renda adicional disponível na aposentadoria (**R$ {A0:,.2f} mensais**):")
-        if strategy_type == "Zerar os Ativos (Drawdown)":
+        if strategy_type == STRATEGY_DRAWDOWN:
             st.write(
                 f"Uma estratégia de **Drawdown** exige uma retirada mensal do portfólio de **R$ {computed_portfolio_withdrawal:,.2f}**. "
                 f"Isso resulta em um gasto total mensal de **R$ {recommended_total_spending:,.2f}**, zerando seus ativos aos {life_expectancy} anos."
             )
+        elif strategy_type in DYNAMIC_STRATEGIES:
+            st.write(
+                f"A regra **{strategy_type}** começa com uma retirada mensal do portfólio de **R$ {computed_portfolio_withdrawal:,.2f}** "
+                f"(gasto total de **R$ {recommended_total_spending:,.2f}**) e a ajusta ao longo da aposentadoria conforme o saldo. "
+                f"Ative a Simulação de Monte Carlo ou o Backtest Histórico para ver o efeito da regra em cenários de retorno variados."
+            )
         else:
             st.write(
                 f"Uma estratégia de **Renda Perpétua** permite uma retirada mensal do portfólio de **R$ {computed_portfolio_withdrawal:,.2f}**. "
                 f"Isso gera um gasto total mensal de **R$ {recommended_total_spending:,.2f}**, preservando seu principal."
             )
-        
-        retire_ages = []
-        retire_portfolio = []
-        retire_net_withdrawals = []
-        retire_additional_income = []
-        for m in range(1, retirement_months + 1):
-            sim_age = retirement_age + m/12
-            retire_additional_income.append(A0)
-            retire_net_withdrawals.append(computed_portfolio_withdrawal)
-            balance = balance * (1 + monthly_rate_ret) - computed_portfolio_withdrawal
-            retire_ages.append(sim_age)
-            retire_portfolio.append(balance)
-            if strategy_type == "Zerar os Ativos (Drawdown)" and balance < 0:
-                break
     
-    # Combina os dados da fase de Acumulação e Aposentadoria.
-    sim_ages = ages + retire_ages
-    sim_portfolio = portfolio_balances + retire_portfolio
-    sim_net_withdrawals = net_cash_flows + retire_net_withdrawals
-    sim_add_income = additional_incomes_dynamic + retire_additional_income
+    mc_result = None
+    if enable_monte_carlo:
+        mc_settings = MonteCarloSettings(
+            n_paths=int(mc_n_paths),
+            volatility_acc=mc_volatility_acc,
+            volatility_ret=mc_volatility_ret,
+            seed=int(mc_seed),
+            asset_model=mc_asset_model
+        )
+        mc_key = config_hash(
+            config,
+            mc_settings,
+            mortality_table.fingerprint if survival is not None else None,
+            mortality_sex
+        )
+        mc_result = result_cache.get_or_compute(
+            ("monte_carlo", mc_key),
+            lambda: run_monte_carlo(config, mc_settings, survival)
+        )
+        st.session_state.mc_export = {**mc_result.settings.to_dict(), "fingerprint": mc_result.fingerprint}
     
-    df = pd.DataFrame({
-        "Idade": sim_ages,
-        "Saldo do Portfólio (R$)": sim_portfolio,
-        "Retirada do Portfólio (R$)": sim_net_withdrawals,
-        "Renda Adicional (R$)": sim_add_income
-    })
+    backtest_result = None
+    backtest_key = None
+    if return_history is not None:
+        bt_settings = BacktestSettings(
+            weights=backtest_weights,
+            n_bootstrap=int(bt_n_bootstrap),
+            block_months=int(bt_block_months),
+            seed=int(st.session_state.get('mc_seed', 42))
+        )
+        backtest_key = config_hash(config, bt_settings, return_history.fingerprint)
+        try:
+            backtest_result = result_cache.get_or_compute(
+                ("backtest", backtest_key),
+                lambda: run_backtest(config, return_history, bt_settings)
+            )
+        except ValueError as e:
+            backtest_key = None
+            st.warning(f"⚠️ Backtest não executado: {e}")
+    
+    if mc_result is not None:
+        profile.record_array("monte_carlo.bands", mc_result.bands)
+    profile.lap("analysis")
     
     # -------------------------------------------------------------------------
     # 4.7 VISUALIZAÇÃO DOS RESULTADOS
     # -------------------------------------------------------------------------
-    tab1, tab2, tab3 = st.tabs([
+    # Plotly e pandas são importados só aqui, na primeira renderização, para
+    # que importar este módulo (testes, jobs em lote) não pague esse custo.
+    from retirement_engine.charts import (
+        build_depletion_histogram,
+        build_income_figure,
+        build_monte_carlo_figure,
+        build_portfolio_figure,
+        build_scenario_income_figure,
+        build_scenario_portfolio_figure,
+        build_sweep_heatmap,
+        income_composition,
+    )
+    from retirement_engine.exports import (
+        CSV_FILE_NAME,
+        EXCEL_FILE_NAME,
+        EXCEL_MIME,
+        export_csv,
+        export_excel,
+    )
+    
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "📈 Gráfico da Simulação",
         "📋 Resumo Detalhado",
+        "🔬 Análise de Sensibilidade",
+        "⚖️ Comparação de Cenários",
         "💾 Download dos Dados"
     ])
     
@@ -713,101 +1185,121 @@ def main():
         st.markdown("<div class='stCard'>", unsafe_allow_html=True)
         st.subheader("📈 Evolução do Patrimônio")
         
-        # Gráfico do patrimônio (código existente)
-        fig = go.Figure()
-        
-        # Área sombreada para fase de acumulação
-        fig.add_vrect(
-            x0=current_age,
-            x1=retirement_age,
-            fillcolor="rgba(46, 204, 113, 0.1)",
-            layer="below",
-            line_width=0,
-            annotation_text="Fase de Acumulação",
-            annotation_position="top left"
-        )
-        
-        # Área sombreada para fase de aposentadoria
-        fig.add_vrect(
-            x0=retirement_age,
-            x1=life_expectancy,
-            fillcolor="rgba(52, 152, 219, 0.1)",
-            layer="below",
-            line_width=0,
-            annotation_text="Fase de Aposentadoria",
-            annotation_position="top left"
-        )
-        
-        # Linha principal do portfólio
-        fig.add_trace(go.Scatter(
-            x=df["Idade"],
-            y=df["Saldo do Portfólio (R$)"],
-            mode='lines',
-            name='Saldo do Portfólio',
-            line=dict(color='#2ecc71', width=3),
-            hovertemplate='Idade: %{x:.1f} anos<br>Saldo: R$ %{y:,.2f}<extra></extra>'
-        ))
-        
-        if strategy_mode == "Retirada Personalizada" and n_sources > 0:
-            fig.add_trace(go.Bar(
-                x=df["Idade"],
-                y=[val if val is not None else 0 for val in df["Retirada do Portfólio (R$)"]],
-                name="Retirada Mensal",
-                marker_color='rgba(231, 76, 60, 0.7)',
-                hovertemplate='Idade: %{x:.1f} anos<br>Retirada: R$ %{y:,.2f}<extra></extra>',
-                yaxis="y2"
-            ))
-        
-        if strategy_mode == "Retirada Baseada em Estratégia":
-            fig.add_trace(go.Scatter(
-                x=retire_ages,
-                y=[computed_portfolio_withdrawal]*len(retire_ages),
-                mode='lines',
-                name="Retirada Constante",
-                line=dict(color='#e74c3c', dash='dash'),
-                hovertemplate='Retirada: R$ %{y:,.2f}<extra></extra>'
-            ))
+        with profile.section("charts.build"):
+            fig = simulator.present(
+                "portfolio",
+                (result_key, backtest_key),
+                lambda: build_portfolio_figure(result, backtest=backtest_result)
+            )
+        with profile.section("charts.render"):
+            st.plotly_chart(fig, use_container_width=True)
         
-        # Configuração do layout
-        fig.update_layout(
-            title={
-                'text': "Evolução do seu Patrimônio",
-                'y':0.95,
-                'x':0.5,
-                'xanchor': 'center',
-                'yanchor': 'top'
-            },
-            xaxis_title="Idade (anos)",
-            yaxis=dict(
-                title="Saldo do Portfólio (R$)",
-                gridcolor='rgba(0,0,0,0.1)',
-                hoverformat="R$ ,.2f"
-            ),
-            legend=dict(
-                yanchor="top",
-                y=0.99,
-                xanchor="left",
-                x=0.01,
-                bgcolor='rgba(255,255,255,0.8)'
-            ),
-            hovermode="x unified",
-            template="plotly_white",
-            margin=dict(l=60, r=30, t=80, b=60)
-        )
+        # Resumo do backtest histórico
+        if backtest_result is not None:
+            if backtest_result.n_cohorts == 0:
+                st.info(
+                    f"O histórico ({return_history.n_months} meses) é mais curto que a simulação; "
+                    "apenas as amostras do bootstrap foram avaliadas."
+                )
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(
+                    "Sucesso nas Coortes Históricas",
+                    f"{backtest_result.cohort_success_rate * 100:.1f}%" if backtest_result.n_cohorts else "—",
+                    help=f"Fração das {backtest_result.n_cohorts:,} datas de início do histórico em que o patrimônio dura até os {life_expectancy} anos"
+                )
+            with col2:
+                st.metric(
+                    "Sucesso no Bootstrap",
+                    f"{backtest_result.bootstrap.success_probability * 100:.1f}%" if backtest_result.bootstrap else "—",
+                    help="Fração das sequências reamostradas por blocos em que o patrimônio não se esgota"
+                )
+            with col3:
+                worst = backtest_result.worst
+                st.metric(
+                    "Pior Coorte",
+                    worst.start if worst else "—",
+                    f"esgota aos {worst.depletion_age:.1f} anos" if worst and not math.isnan(worst.depletion_age) else None,
+                    delta_color="inverse",
+                    help="Data de início da sequência histórica com o pior resultado"
+                )
+        st.markdown("</div>", unsafe_allow_html=True)
         
-        if strategy_mode == "Retirada Personalizada" and n_sources > 0:
-            fig.update_layout(
-                yaxis2=dict(
-                    title="Retirada Mensal (R$)",
-                    overlaying="y",
-                    side="right",
-                    showgrid=False,
-                    hoverformat="R$ ,.2f"
+        # Análise estocástica (Monte Carlo)
+        if mc_result is not None:
+            st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+            st.subheader("🎲 Análise de Monte Carlo")
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(
+                    "Probabilidade de Sucesso",
+                    f"{mc_result.success_probability * 100:.1f}%",
+                    help=f"Fração dos {mc_result.n_paths:,} cenários em que o patrimônio dura até os {life_expectancy} anos"
+                )
+            with col2:
+                st.metric(
+                    "Patrimônio Mediano na Aposentadoria",
+                    f"R$ {np.median(mc_result.portfolio_at_retirement):,.2f}"
                 )
+            with col3:
+                depleted_ages = mc_result.depletion_ages[~np.isnan(mc_result.depletion_ages)]
+                st.metric(
+                    "Idade Mediana de Esgotamento",
+                    f"{np.median(depleted_ages):.1f} anos" if len(depleted_ages) else "—",
+                    help="Mediana entre os cenários em que o patrimônio se esgota"
+                )
+            
+            if mc_result.survival_ruin_probability is not None:
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric(
+                        "Risco de Sobreviver ao Patrimônio",
+                        f"{mc_result.longevity_ruin_probability * 100:.1f}%",
+                        help=(
+                            "Fração dos cenários em que o patrimônio se esgota antes da idade de morte sorteada. "
+                            f"Pela curva de sobrevivência, a chance de estar vivo no esgotamento é de "
+                            f"{mc_result.survival_ruin_probability * 100:.1f}%"
+                        )
+                    )
+                with col2:
+                    st.metric(
+                        "Chance de Viver Além do Horizonte",
+                        f"{mc_result.beyond_horizon_probability * 100:.1f}%",
+                        help=f"Fração dos cenários em que a idade de morte sorteada passa dos {life_expectancy} anos simulados"
+                    )
+            
+            st.caption(
+                f"🔑 Semente {mc_result.settings.seed} · impressão digital {mc_result.fingerprint[:16]} "
+                "(incluídas no JSON exportado)"
             )
-        
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown("</div>", unsafe_allow_html=True)
+            # Conferência única, na primeira simulação depois de importar um arquivo
+            expected_fingerprint = st.session_state.pop('mc_expected_fingerprint', None)
+            if expected_fingerprint:
+                if expected_fingerprint == mc_result.fingerprint:
+                    st.success("✅ Simulação reproduzida: o resultado é idêntico ao do arquivo importado.")
+                else:
+                    st.warning(
+                        "⚠️ O resultado difere do arquivo importado. Verifique se algum parâmetro, a tábua de "
+                        "mortalidade ou a data de hoje (que define a idade atual) mudou."
+                    )
+            
+            with profile.section("charts.build"):
+                fig_mc = simulator.present(
+                    "monte_carlo",
+                    (result_key, mc_key),
+                    lambda: build_monte_carlo_figure(mc_result, result)
+                )
+            with profile.section("charts.render"):
+                st.plotly_chart(fig_mc, use_container_width=True)
+            
+            if len(depleted_ages):
+                with profile.section("charts.build"):
+                    fig_depletion = build_depletion_histogram(depleted_ages)
+                with profile.section("charts.render"):
+                    st.plotly_chart(fig_depletion, use_container_width=True)
+            
+            st.markdown("</div>", unsafe_allow_html=True)
         
         # Novo gráfico de evolução da renda
         st.markdown("<div class='stCard'>", unsafe_allow_html=True)
@@ -834,124 +1326,23 @@ def main():
                         value=True,
                         help=f"Renda mensal inicial: R$ {source['monthly_income']:,.2f}"
                     ):
-                        selected_sources.append(source)
+                        selected_sources.append(i)
         
-        # Criar DataFrame com evolução das rendas
-        income_data = []
-        ages_range = np.arange(current_age, life_expectancy + 1/12, 1/12)
+        # Evolução das rendas a partir da matriz (fontes × meses) do motor
+        ages_range = result.income_ages
+        def build_income_view():
+            income_data, total_income = income_composition(result, selected_sources, include_portfolio_withdrawal)
+            return income_data, total_income, build_income_figure(result, income_data, total_income)
         
-        # Inicializar array de rendas totais
-        total_income = np.zeros(len(ages_range))
-        
-        # Adicionar retirada do patrimônio se selecionada
-        if include_portfolio_withdrawal:
-            portfolio_withdrawals = []
-            for age in ages_range:
-                if age < retirement_age:
-                    portfolio_withdrawals.append(0)
-                else:
-                    if strategy_mode == "Retirada Personalizada":
-                        portfolio_withdrawals.append(monthly_expenses)
-                    else:
-                        portfolio_withdrawals.append(computed_portfolio_withdrawal)
-            
-            income_data.append({
-                'name': 'Retirada do Patrimônio',
-                'ages': ages_range,
-                'values': portfolio_withdrawals,
-                'color': '#e74c3c'
-            })
-            total_income += np.array(portfolio_withdrawals)
-        
-        # Adicionar cada fonte de renda selecionada
-        colors = ['#3498db', '#2ecc71', '#f1c40f', '#9b59b6', '#1abc9c', '#34495e']
-        for i, source in enumerate(selected_sources):
-            source_income = []
-            for age in ages_range:
-                if age < source['income_start_age']:
-                    source_income.append(0)
-                else:
-                    months_since_start = int(round((age - source['income_start_age']) * 12))
-                    if not source['lifetime']:
-                        if age > source['income_start_age'] + source['duration_years']:
-                            source_income.append(0)
-                        else:
-                            income = source['monthly_income'] * ((1 + source['monthly_rate']) ** months_since_start)
-                            source_income.append(income)
-                    else:
-                        income = source['monthly_income'] * ((1 + source['monthly_rate']) ** months_since_start)
-                        source_income.append(income)
-            
-            income_data.append({
-                'name': source['name'],
-                'ages': ages_range,
-                'values': source_income,
-                'color': colors[i % len(colors)]
-            })
-            total_income += np.array(source_income)
-        
-        # Criar gráfico de barras empilhadas
-        fig_income = go.Figure()
-        
-        # Área sombreada para fase de aposentadoria
-        fig_income.add_vrect(
-            x0=retirement_age,
-            x1=life_expectancy,
-            fillcolor="rgba(52, 152, 219, 0.1)",
-            layer="below",
-            line_width=0,
-            annotation_text="Fase de Aposentadoria",
-            annotation_position="top left"
-        )
-        
-        # Adicionar cada fonte de renda como barra empilhada
-        for source in income_data:
-            fig_income.add_trace(go.Bar(
-                x=source['ages'],
-                y=source['values'],
-                name=source['name'],
-                marker_color=source['color'],
-                hovertemplate='Idade: %{x:.1f} anos<br>Renda: R$ %{y:,.2f}<extra></extra>'
-            ))
-        
-        # Configuração do layout para barras empilhadas
-        fig_income.update_layout(
-            title={
-                'text': "Composição da Renda ao Longo do Tempo",
-                'y':0.95,
-                'x':0.5,
-                'xanchor': 'center',
-                'yanchor': 'top'
-            },
-            xaxis_title="Idade (anos)",
-            yaxis_title="Renda Mensal (R$)",
-            hovermode="x unified",
-            template="plotly_white",
-            showlegend=True,
-            legend=dict(
-                yanchor="top",
-                y=0.99,
-                xanchor="left",
-                x=0.01,
-                bgcolor='rgba(255,255,255,0.8)'
-            ),
-            margin=dict(l=60, r=30, t=80, b=60),
-            barmode='stack',  # Define o modo de empilhamento das barras
-            bargap=0,  # Remove o espaço entre as barras
-            bargroupgap=0  # Remove o espaço entre grupos de barras
-        )
-        
-        # Adicionar linha do total
-        fig_income.add_trace(go.Scatter(
-            x=ages_range,
-            y=total_income,
-            name='Renda Total',
-            mode='lines',
-            line=dict(color='#2c3e50', width=2, dash='dash'),
-            hovertemplate='Idade: %{x:.1f} anos<br>Total: R$ %{y:,.2f}<extra></extra>'
-        ))
+        with profile.section("charts.build"):
+            income_data, total_income, fig_income = simulator.present(
+                "income",
+                (result_key, tuple(selected_sources), include_portfolio_withdrawal),
+                build_income_view
+            )
         
-        st.plotly_chart(fig_income, use_container_width=True)
+        with profile.section("charts.render"):
+            st.plotly_chart(fig_income, use_container_width=True)
         
         # Adicionar estatísticas da renda
         col1, col2 = st.columns(2)
@@ -969,6 +1360,7 @@ def main():
             )
         
         st.markdown("</div>", unsafe_allow_html=True)
+    profile.lap("tab.charts")
     
     # -------------------------------------------------------------------------
     # 4.7.2 ABA DE RESUMO
@@ -995,6 +1387,11 @@ def main():
                     delta="Patrimônio insuficiente",
                     delta_color="inverse"
                 )
+                if survival is not None:
+                    st.caption(
+                        f"🧬 Chance de estar vivo nessa idade: "
+                        f"{survival_weighted_ruin(survival, sim_ages[-1]) * 100:.1f}%"
+                    )
             else:
                 st.metric(
                     "Saldo Final Projetado",
@@ -1014,43 +1411,287 @@ def main():
             """)
         
         st.markdown("</div>", unsafe_allow_html=True)
+        
+        # Calculadora de metas: inverte o motor para encontrar os valores necessários
+        st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+        st.subheader("🎯 Calculadora de Metas")
+        
+        if strategy_mode == MODE_CUSTOM:
+            target_spending = None
+            st.write(f"Valores necessários para gastar **R$ {monthly_expenses:,.2f}** por mês sem esgotar o patrimônio até os {life_expectancy} anos:")
+        else:
+            target_spending = st.number_input(
+                "Gasto Mensal Desejado",
+                value=float(st.session_state.get('target_spending', round(recommended_total_spending, -2) + 1000.0)),
+                min_value=0.0,
+                step=100.0,
+                help="Gasto total mensal (retirada do portfólio + renda adicional) que você deseja alcançar",
+                key='target_spending'
+            )
+        
+        required_investment = solve_monthly_investment(config, target_spending)
+        earliest_age = solve_retirement_age(config, target_spending)
+        sustainable_spending = solve_monthly_expenses(config)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric(
+                "Investimento Mensal Necessário",
+                f"R$ {required_investment:,.2f}" if required_investment is not None else "Inatingível",
+                delta=f"R$ {required_investment - monthly_investment:,.2f} em relação ao atual" if required_investment is not None else None,
+                delta_color="inverse"
+            )
+        with col2:
+            st.metric(
+                "Idade Mínima de Aposentadoria",
+                f"{earliest_age} anos" if earliest_age is not None else "Inatingível",
+                help="Mantendo o investimento mensal atual"
+            )
+        with col3:
+            st.metric(
+                "Gasto Mensal Sustentável",
+                f"R$ {sustainable_spending:,.2f}",
+                help="Maior gasto mensal total com o plano atual, incluindo as rendas adicionais"
+            )
+        
+        st.markdown("</div>", unsafe_allow_html=True)
+    profile.lap("tab.summary")
     
     # -------------------------------------------------------------------------
-    # 4.7.3 ABA DE DOWNLOAD
+    # 4.7.3 ABA DE SENSIBILIDADE
     # -------------------------------------------------------------------------
     with tab3:
+        st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+        st.subheader("🔬 Análise de Sensibilidade")
+        st.write("Compare o resultado do plano em uma grade de valores para dois parâmetros. Os demais mantêm os valores da barra lateral.")
+        
+        sweep_options = [
+            name for name in SWEEP_PARAMETERS
+            if name != "monthly_expenses" or strategy_mode == MODE_CUSTOM
+        ]
+        sweep_defaults = {
+            "retirement_age": (float(math.floor(current_age)) + 1, float(life_expectancy) - 1),
+            "annual_rate_acc": (0.0, 10.0),
+            "annual_rate_ret": (0.0, 8.0),
+            "monthly_investment": (0.0, max(2 * float(monthly_investment), 1000.0)),
+            "monthly_expenses": (0.0, max(2 * float(monthly_expenses), 1000.0)) if strategy_mode == MODE_CUSTOM else (0.0, 1000.0)
+        }
+        
+        sweep_grid = {}
+        axis_cols = st.columns(2)
+        for axis, (col, default_name) in enumerate(zip(axis_cols, ["retirement_age", "annual_rate_ret"])):
+            with col:
+                param = st.selectbox(
+                    f"Parâmetro do Eixo {'X' if axis == 0 else 'Y'}",
+                    sweep_options,
+                    index=sweep_options.index(default_name),
+                    format_func=lambda name: SWEEP_PARAMETERS[name],
+                    key=f"sweep_param_{axis}"
+                )
+                low_default, high_default = sweep_defaults[param]
+                low = st.number_input("Mínimo", value=low_default, key=f"sweep_min_{axis}_{param}")
+                high = st.number_input("Máximo", value=high_default, key=f"sweep_max_{axis}_{param}")
+                steps = st.slider("Número de Valores", 2, 40, 20, key=f"sweep_steps_{axis}")
+                sweep_grid[param] = np.linspace(low, high, int(steps))
+        
+        if len(sweep_grid) < 2:
+            st.warning("⚠️ Escolha parâmetros diferentes para os dois eixos.")
+        else:
+            sweep_result = result_cache.get_or_compute(
+                ("sweep", config_hash(config, {name: values.tolist() for name, values in sweep_grid.items()})),
+                lambda: run_sweep(config, sweep_grid)
+            )
+            
+            for metric, title, colorscale, hover in [
+                (sweep_result.final_balance, "Saldo Final Projetado (R$)", "RdYlGn", "Saldo: R$ %{z:,.2f}"),
+                (sweep_result.depletion_age, "Idade de Esgotamento do Patrimônio", "Reds_r", "Esgotamento: %{z:.1f} anos")
+            ]:
+                with profile.section("charts.build"):
+                    fig_sweep = build_sweep_heatmap(sweep_result, metric, title, colorscale, hover)
+                with profile.section("charts.render"):
+                    st.plotly_chart(fig_sweep, use_container_width=True)
+            st.caption("Células em branco no mapa de esgotamento indicam combinações em que o patrimônio dura até a expectativa de vida (ou valores inválidos).")
+        
+        st.markdown("</div>", unsafe_allow_html=True)
+    profile.lap("tab.sensitivity")
+    
+    # -------------------------------------------------------------------------
+    # 4.7.4 ABA DE COMPARAÇÃO DE CENÁRIOS
+    # -------------------------------------------------------------------------
+    with tab4:
+        st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+        st.subheader("⚖️ Comparação de Cenários")
+        st.write("Salve alternativas ao plano atual (por exemplo, aposentar mais tarde ou investir mais) e compare-as lado a lado. O plano atual da barra lateral é sempre a referência.")
+        
+        # Cenários salvos na sessão; cada um guarda a configuração completa
+        if 'scenarios' not in st.session_state:
+            st.session_state.scenarios = []
+        scenarios = st.session_state.scenarios
+        
+        scenario_parameters = {"": "Nenhum (cópia do plano atual)"}
+        scenario_parameters.update({
+            name: label for name, label in SWEEP_PARAMETERS.items()
+            if name != "monthly_expenses" or strategy_mode == MODE_CUSTOM
+        })
+        col1, col2, col3 = st.columns([2, 2, 1])
+        with col1:
+            scenario_name = st.text_input(
+                "Nome do Cenário",
+                value=f"Cenário {len(scenarios) + 1}",
+                key=f"scenario_name_{len(scenarios)}"
+            )
+        with col2:
+            scenario_param = st.selectbox(
+                "Parâmetro Alterado",
+                list(scenario_parameters),
+                format_func=lambda name: scenario_parameters[name],
+                key="scenario_param"
+            )
+        with col3:
+            scenario_value = st.number_input(
+                "Novo Valor",
+                value=float(getattr(config, scenario_param)) if scenario_param else 0.0,
+                disabled=not scenario_param,
+                key=f"scenario_value_{scenario_param}"
+            )
+        
+        if st.button("➕ Adicionar Cenário", key="add_scenario"):
+            name = scenario_name.strip()
+            if not name or name == "Plano Atual" or name in [scenario.name for scenario in scenarios]:
+                st.error("❌ Escolha um nome diferente do plano atual e dos cenários já salvos.")
+            else:
+                scenario_config = dataclasses.replace(config, **{scenario_param: scenario_value}) if scenario_param else config
+                try:
+                    scenario_config.validate()
+                except ValueError as e:
+                    st.error(f"❌ Cenário inválido: {e}")
+                else:
+                    scenarios.append(Scenario(name, scenario_config))
+                    st.rerun()
+        
+        for i, scenario in enumerate(scenarios):
+            col1, col2 = st.columns([6, 1])
+            with col1:
+                st.write(
+                    f"**{scenario.name}** — aposentadoria aos {scenario.config.retirement_age:g} anos, "
+                    f"investimento mensal de R$ {scenario.config.monthly_investment:,.2f}, "
+                    f"taxas de {scenario.config.annual_rate_acc:g}% / {scenario.config.annual_rate_ret:g}% ao ano"
+                )
+            with col2:
+                if st.button("🗑️ Remover", key=f"remove_scenario_{i}"):
+                    scenarios.pop(i)
+                    st.rerun()
+        
+        if not scenarios:
+            st.info("Nenhum cenário salvo. Adicione um cenário para compará-lo com o plano atual.")
+        else:
+            # Todos os cenários são simulados juntos, um por linha dos arrays do motor.
+            scenario_names = ["Plano Atual"] + [scenario.name for scenario in scenarios]
+            scenario_key = config_hash(config, [scenario.to_dict() for scenario in scenarios])
+            scenario_results = result_cache.get_or_compute(
+                ("scenarios", scenario_key),
+                lambda: simulate_scenarios([config] + [scenario.config for scenario in scenarios])
+            )
+            
+            with profile.section("charts.build"):
+                fig_scenarios = simulator.present(
+                    "scenario_portfolio",
+                    scenario_key,
+                    lambda: build_scenario_portfolio_figure(scenario_names, scenario_results)
+                )
+                fig_scenario_income = simulator.present(
+                    "scenario_income",
+                    scenario_key,
+                    lambda: build_scenario_income_figure(scenario_names, scenario_results)
+                )
+            with profile.section("charts.render"):
+                st.plotly_chart(fig_scenarios, use_container_width=True)
+                st.plotly_chart(fig_scenario_income, use_container_width=True)
+            
+            # Tabela de diferenças em relação ao plano atual
+            def money(value, signed=False):
+                if value is None:
+                    return "—"
+                return f"R$ {value:+,.2f}" if signed else f"R$ {value:,.2f}"
+            
+            def years(value, signed=False):
+                if value is None:
+                    return "—"
+                return f"{value:+.1f} anos" if signed else f"{value:.1f} anos"
+            
+            rows = compare_scenarios(scenario_names, scenario_results)
+            st.dataframe(
+                {
+                    "Cenário": [row["name"] for row in rows],
+                    "Aposentadoria": [f"{row['retirement_age']:g} anos" for row in rows],
+                    "Patrimônio na Aposentadoria": [money(row["portfolio_at_retirement"]) for row in rows],
+                    "Δ Patrimônio": [money(row["delta_portfolio_at_retirement"], signed=True) for row in rows],
+                    "Gasto Mensal": [money(row["monthly_spending"]) for row in rows],
+                    "Δ Gasto": [money(row["delta_monthly_spending"], signed=True) for row in rows],
+                    "Saldo Final": [money(row["final_balance"]) for row in rows],
+                    "Esgotamento": [years(row["depletion_age"]) for row in rows],
+                    "Δ Esgotamento": [years(row["delta_depletion_age"], signed=True) for row in rows]
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+            st.caption("Diferenças (Δ) em relação ao plano atual. \"—\" indica que a métrica não se aplica: o patrimônio não se esgota ou não há saldo final.")
+        
+        st.markdown("</div>", unsafe_allow_html=True)
+    profile.lap("tab.scenarios")
+    
+    # -------------------------------------------------------------------------
+    # 4.7.5 ABA DE DOWNLOAD
+    # -------------------------------------------------------------------------
+    with tab5:
         st.markdown("<div class='stCard'>", unsafe_allow_html=True)
         st.subheader("💾 Download dos Dados")
         
+        # Os arquivos só são gerados quando o download é solicitado e ficam no
+        # cache compartilhado pelo hash do resultado, evitando reconstruir a
+        # planilha Excel a cada atualização da página.
+        export_cache = result_cache
+        
         col1, col2 = st.columns(2)
         with col1:
             # Botão para CSV
-            csv = df.to_csv(index=False).encode('utf-8')
             st.download_button(
                 label="📥 Baixar CSV",
-                data=csv,
-                file_name='simulacao_aposentadoria.csv',
+                data=profile.deferred(
+                    "export.csv",
+                    lambda: export_cache.get_or_compute(("csv", result_key), lambda: export_csv(result))
+                ),
+                file_name=CSV_FILE_NAME,
                 mime='text/csv',
                 help="Baixe os dados da simulação em formato CSV"
             )
         
         with col2:
             # Botão para Excel
-            output = io.BytesIO()
-            writer = pd.ExcelWriter(output, engine='xlsxwriter')
-            df.to_excel(writer, index=False, sheet_name='Simulacao')
-            writer.close()
-            processed_data = output.getvalue()
             st.download_button(
                 label="📥 Baixar Excel",
-                data=processed_data,
-                file_name='simulacao_aposentadoria.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                data=profile.deferred(
+                    "export.excel",
+                    lambda: export_cache.get_or_compute(("excel", result_key), lambda: export_excel(result))
+                ),
+                file_name=EXCEL_FILE_NAME,
+                mime=EXCEL_MIME,
                 help="Baixe os dados da simulação em formato Excel"
             )
         
         st.markdown("</div>", unsafe_allow_html=True)
     
+    profile.lap("tab.download")
+    
+    # Etapas reaproveitadas ou recalculadas nesta atualização
+    st.sidebar.caption(f"♻️ {simulator.last_report.summary()}")
+    profile.record("stages", simulator.last_report.to_dict())
+    profile.record("shared_cache", result_cache.stats())
+    if result_store is not None:
+        render_store_panel(result_store, config, result)
+    if profile.enabled:
+        render_profile_panel(profile)
+    
     # -------------------------------------------------------------------------
     # 4.8 MENSAGEM FINAL
     # -------------------------------------------------------------------------
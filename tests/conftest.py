@@ -0,0 +1,13 @@
+# =============================================================================
+# CONFIGURAÇÃO DOS TESTES
+# =============================================================================
+# Descrição: Torna o pacote `retirement_engine` importável a partir da raiz
+#            do repositório, qualquer que seja o diretório de execução do
+#            pytest.
+# =============================================================================
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
@@ -0,0 +1,70 @@
+# =============================================================================
+# BACKTEST HISTÓRICO
+# =============================================================================
+# Descrição: Parâmetros inválidos do bootstrap são recusados com ValueError
+#            antes de simular, e os blocos sorteados são trechos contíguos
+#            (circulares) do histórico.
+#
+# Uso:
+#   python -m pytest tests/test_backtest.py
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import numpy as np
+import pytest
+
+from retirement_engine.backtest import BacktestSettings, ReturnHistory, block_bootstrap, run_backtest
+from retirement_engine.samples import make_config
+
+N_MONTHS = 600
+
+
+# -----------------------------------------------------------------------------
+# 2. AUXILIARES
+# -----------------------------------------------------------------------------
+def make_history() -> ReturnHistory:
+    return ReturnHistory(
+        dates=tuple(f"{1950 + i // 12}-{i % 12 + 1:02d}" for i in range(N_MONTHS)),
+        assets=("acoes", "renda_fixa"),
+        returns=np.random.default_rng(1).normal(0.004, 0.03, (N_MONTHS, 2)),
+    )
+
+
+# -----------------------------------------------------------------------------
+# 3. TESTES
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize(
+    "settings",
+    [
+        BacktestSettings(block_months=0),
+        BacktestSettings(block_months=-12),
+        BacktestSettings(n_bootstrap=-1),
+        BacktestSettings(weights=(0.0, 0.0)),
+        BacktestSettings(weights=(1.5, -0.5)),
+    ],
+    ids=["bloco-zero", "bloco-negativo", "amostras-negativas", "pesos-nulos", "peso-negativo"],
+)
+def test_invalid_settings_are_rejected(settings: BacktestSettings) -> None:
+    with pytest.raises(ValueError):
+        settings.validate()
+    with pytest.raises(ValueError):
+        run_backtest(make_config(10, 20), make_history(), settings)
+
+
+def test_valid_settings_run() -> None:
+    settings = BacktestSettings(weights=(0.6, 0.4), n_bootstrap=0, block_months=1, seed=3)
+    settings.validate()
+    result = run_backtest(make_config(10, 20), make_history(), settings)
+    assert result.n_cohorts == N_MONTHS - 30 * 12 + 1 and result.bootstrap is None
+
+
+def test_block_bootstrap_draws_circular_blocks() -> None:
+    returns = np.arange(10, dtype=float)
+    samples = block_bootstrap(returns, months=7, n_samples=50, block_months=3, rng=np.random.default_rng(0))
+    assert samples.shape == (50, 7)
+    # Dentro de cada bloco os meses são consecutivos, voltando ao início após o fim
+    for start in (0, 3, 6):
+        block = samples[:, start:start + 3]
+        assert np.all((np.diff(block, axis=1) % 10) == 1)
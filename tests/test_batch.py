@@ -0,0 +1,128 @@
+# =============================================================================
+# EXECUÇÃO EM LOTE
+# =============================================================================
+# Descrição: Retomada de execuções interrompidas: configurações concluídas
+#            não são recalculadas, as que falharam são simuladas de novo e a
+#            tabela consolidada termina com uma linha por configuração.
+#
+# Uso:
+#   python -m pytest tests/test_batch.py
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import csv
+import datetime
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from retirement_engine.batch import SERIES_DIR_NAME, SUMMARY_FILE_NAME, resume_summary, run_batch
+
+ROOT = Path(__file__).resolve().parent.parent
+REFERENCE_DATE = datetime.date(2025, 1, 1)
+N_CONFIGS = 10
+# Linhas entregues antes de interromper a execução; a segunda configuração falha
+N_BEFORE_KILL = 6
+FAILING_ID = "cliente-01"
+
+
+# -----------------------------------------------------------------------------
+# 2. AUXILIARES
+# -----------------------------------------------------------------------------
+def client_configs() -> List[Dict[str, Any]]:
+    with open(ROOT / "example_config.json", encoding="utf-8") as f:
+        base = json.load(f)
+    return [dict(base, config_id=f"cliente-{i:02d}", retirement_age=55 + i) for i in range(N_CONFIGS)]
+
+
+def read_summary(path: Path) -> List[Dict[str, str]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def wait_for_rows(path: Path, n_rows: int, timeout: float = 60.0) -> None:
+    limit = time.monotonic() + timeout
+    while time.monotonic() < limit:
+        if path.exists() and len(read_summary(path)) >= n_rows:
+            return
+        time.sleep(0.05)
+    raise AssertionError(f"{path} não chegou a {n_rows} linhas")
+
+
+# -----------------------------------------------------------------------------
+# 3. TESTES
+# -----------------------------------------------------------------------------
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="requer pipes nomeados (POSIX)")
+def test_resume_skips_finished_and_retries_failed(tmp_path: Path) -> None:
+    configs = client_configs()
+    output = tmp_path / "saida"
+    series_dir = output / SERIES_DIR_NAME
+    # Um diretório no lugar do arquivo de séries faz a gravação falhar (erro transitório)
+    (series_dir / f"{FAILING_ID}.parquet").mkdir(parents=True)
+
+    # A entrada é um pipe: o processo lê só as linhas já escritas e é
+    # interrompido enquanto espera pelas demais.
+    fifo = tmp_path / "clientes.jsonl"
+    os.mkfifo(fifo)
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "retirement_engine.batch", str(fifo),
+            "--output", str(output), "--workers", "1", "--chunk-size", "1",
+            "--reference-date", str(REFERENCE_DATE),
+        ],
+        cwd=ROOT,
+    )
+    try:
+        with open(fifo, "w", encoding="utf-8") as f:
+            for data in configs[:N_BEFORE_KILL]:
+                f.write(json.dumps(data) + "\n")
+            f.flush()
+            wait_for_rows(output / SUMMARY_FILE_NAME, N_BEFORE_KILL - 2)
+            process.kill()
+            process.wait()
+    except BrokenPipeError:
+        pass
+    finally:
+        process.kill()
+
+    first_run = read_summary(output / SUMMARY_FILE_NAME)
+    finished = {row["config_id"] for row in first_run if not row["error"]}
+    assert 0 < len(first_run) < N_CONFIGS
+    assert [row["error"] != "" for row in first_run if row["config_id"] == FAILING_ID] == [True]
+    finished_mtimes = {config_id: (series_dir / f"{config_id}.parquet").stat().st_mtime_ns for config_id in finished}
+
+    (series_dir / f"{FAILING_ID}.parquet").rmdir()
+    source = tmp_path / "todos.jsonl"
+    source.write_text("".join(json.dumps(data) + "\n" for data in configs), encoding="utf-8")
+    stats = run_batch(source, output, workers=1, chunk_size=1, reference_date=REFERENCE_DATE)
+
+    assert stats == {"skipped": len(finished), "completed": N_CONFIGS - len(finished), "failed": 0}
+    rows = read_summary(output / SUMMARY_FILE_NAME)
+    assert sorted(row["config_id"] for row in rows) == sorted(data["config_id"] for data in configs)
+    assert not any(row["error"] for row in rows)
+    # Concluídas não são recalculadas: as séries gravadas na primeira execução ficam intactas
+    for config_id, mtime in finished_mtimes.items():
+        assert (series_dir / f"{config_id}.parquet").stat().st_mtime_ns == mtime
+    assert (series_dir / f"{FAILING_ID}.parquet").is_file()
+
+
+def test_resume_summary_drops_failed_and_truncated_rows(tmp_path: Path) -> None:
+    path = tmp_path / SUMMARY_FILE_NAME
+    path.write_text(
+        "config_id,config_hash,portfolio_at_retirement,recommended_total_spending,depletion_age,final_balance,error\n"
+        "a,h1,1.0,,,2.0,\n"
+        "b,,,,,,falhou\n"
+        "a,h1,1.0,,,2.0,\n"
+        "c,h3,1.0\n",
+        encoding="utf-8",
+    )
+    assert resume_summary(path) == {"a"}
+    assert [row["config_id"] for row in read_summary(path)] == ["a"]
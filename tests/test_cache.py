@@ -0,0 +1,204 @@
+# =============================================================================
+# CACHE DE RESULTADOS
+# =============================================================================
+# Descrição: Cache compartilhado entre sessões: um único cálculo por chave
+#            mesmo com várias threads pedindo ao mesmo tempo, descarte pelo
+#            limite de memória e pela validade, contadores de acertos e
+#            faltas, e a estimativa de memória de views e gráficos.
+#
+# Uso:
+#   python -m pytest tests/test_cache.py
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, List
+
+import numpy as np
+import pytest
+
+from retirement_engine import SharedCache, SimulationConfig, estimate_nbytes, run_simulation
+from retirement_engine.samples import make_config
+from retirement_engine.scenarios import simulate_scenarios
+
+ROOT = Path(__file__).resolve().parent.parent
+N_THREADS = 8
+
+
+# -----------------------------------------------------------------------------
+# 2. AUXILIARES
+# -----------------------------------------------------------------------------
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def sized_cache(max_bytes: int, ttl: Any = None, clock: Any = time.monotonic) -> SharedCache:
+    """Cache em que cada valor é o próprio tamanho, em bytes."""
+    return SharedCache(max_bytes=max_bytes, ttl=ttl, sizeof=lambda value: value, clock=clock)
+
+
+def run_threads(target: Any, n_threads: int = N_THREADS) -> None:
+    threads = [threading.Thread(target=target) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+        assert not thread.is_alive()
+
+
+# -----------------------------------------------------------------------------
+# 3. CÁLCULO ÚNICO ENTRE THREADS
+# -----------------------------------------------------------------------------
+def test_get_or_compute_runs_once_per_key() -> None:
+    cache = SharedCache()
+    calls: List[int] = []
+    started = threading.Event()
+    release = threading.Event()
+    values: List[Any] = []
+
+    def compute() -> object:
+        calls.append(1)
+        started.set()
+        # Segura o cálculo até que as demais threads estejam esperando por ele
+        release.wait(timeout=10)
+        return object()
+
+    def request() -> None:
+        values.append(cache.get_or_compute("chave", compute))
+
+    first = threading.Thread(target=request)
+    first.start()
+    assert started.wait(timeout=10)
+    others = threading.Thread(target=run_threads, args=(request, N_THREADS - 1))
+    others.start()
+    time.sleep(0.05)
+    release.set()
+    first.join(timeout=10)
+    others.join(timeout=10)
+
+    assert len(calls) == 1
+    assert len(values) == N_THREADS and all(value is values[0] for value in values)
+    assert (cache.misses, cache.hits) == (1, N_THREADS - 1)
+
+
+def test_get_or_compute_retries_after_failure() -> None:
+    cache = SharedCache()
+    calls: List[int] = []
+    lock = threading.Lock()
+    values: List[Any] = []
+
+    def compute() -> str:
+        with lock:
+            calls.append(1)
+            failing = len(calls) == 1
+        time.sleep(0.02)
+        if failing:
+            raise RuntimeError("falha simulada")
+        return "valor"
+
+    def request() -> None:
+        try:
+            values.append(cache.get_or_compute("chave", compute))
+        except RuntimeError:
+            values.append(None)
+
+    run_threads(request)
+    # Só a thread que falhou recebe o erro; uma das que esperavam calcula de novo
+    assert len(calls) == 2
+    assert sorted(values, key=str) == [None] + ["valor"] * (N_THREADS - 1)
+    assert cache.get("chave") == "valor"
+
+
+# -----------------------------------------------------------------------------
+# 4. LIMITE DE MEMÓRIA E VALIDADE
+# -----------------------------------------------------------------------------
+def test_byte_budget_evicts_least_recently_used() -> None:
+    cache = sized_cache(max_bytes=100)
+    for key, nbytes in (("a", 30), ("b", 30), ("c", 30)):
+        cache.put(key, nbytes)
+    assert cache.get("a") == 30  # "b" passa a ser a usada há mais tempo
+    cache.put("d", 30)
+    assert [key in cache for key in "abcd"] == [True, False, True, True]
+    assert (cache.total_bytes, cache.evictions) == (90, 1)
+
+    # Substituir uma chave não conta o tamanho antigo
+    cache.put("a", 10)
+    assert cache.total_bytes == 70
+    # Um valor maior que o limite inteiro não é guardado nem descarta os demais
+    cache.put("enorme", 101)
+    assert "enorme" not in cache and len(cache) == 3
+    cache.put("e", 100)
+    assert list(cache.stats()[name] for name in ("entries", "bytes", "evictions")) == [1, 100, 4]
+
+
+def test_ttl_expires_entries() -> None:
+    clock = FakeClock()
+    cache = sized_cache(max_bytes=100, ttl=10.0, clock=clock)
+    cache.put("a", 1)
+    clock.now = 5.0
+    cache.put("b", 1)
+    assert cache.get("a") == 1  # acessar não renova a validade
+
+    clock.now = 10.0
+    assert cache.get("a") is None and "b" in cache
+    assert cache.stats()["expirations"] == 1
+    assert cache.get_or_compute("a", lambda: 2) == 2
+
+    clock.now = 20.0
+    assert cache.expire() == 2
+    assert len(cache) == 0 and cache.total_bytes == 0
+    with pytest.raises(ValueError):
+        sized_cache(max_bytes=100, ttl=0)
+
+
+def test_hit_and_miss_counters() -> None:
+    cache = sized_cache(max_bytes=100)
+    assert cache.get("a", "padrão") == "padrão"
+    assert cache.get_or_compute("a", lambda: 5) == 5
+    assert cache.get_or_compute("a", lambda: 6) == 5
+    assert cache.get("a") == 5
+    assert "a" in cache  # consultar não conta
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+    cache.clear()
+    assert cache.stats() == {
+        "entries": 0, "bytes": 0, "max_bytes": 100, "hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+    }
+
+
+# -----------------------------------------------------------------------------
+# 5. ESTIMATIVA DE MEMÓRIA
+# -----------------------------------------------------------------------------
+def test_views_count_only_their_own_data() -> None:
+    block = np.zeros((4, 1000))
+    rows = list(block)
+    assert all(estimate_nbytes(row) < row.nbytes + 200 for row in rows)
+    assert estimate_nbytes(rows) < block.nbytes + 1000
+
+    # Cenários simulados juntos dividem um bloco: cada resultado conta a sua parte
+    configs = [make_config(20, years) for years in (10, 20, 40, 80)]
+    results = simulate_scenarios(configs)
+    assert results[0].columns.values.base is not None
+    for config, result in zip(configs, results):
+        alone = estimate_nbytes(run_simulation(config))
+        assert abs(estimate_nbytes(result) - alone) <= 0.1 * alone
+
+
+def test_figure_estimate_ignores_shared_validators() -> None:
+    pytest.importorskip("plotly")
+    from retirement_engine.charts import build_portfolio_figure
+
+    with open(ROOT / "example_config.json", encoding="utf-8") as f:
+        config = SimulationConfig.from_dict(json.load(f))
+    figure = build_portfolio_figure(run_simulation(config))
+    # Da ordem do JSON do gráfico, não dos validadores do Plotly
+    assert estimate_nbytes(figure) < 3 * len(figure.to_json())
@@ -0,0 +1,79 @@
+# =============================================================================
+# MONTE CARLO COM MORTALIDADE
+# =============================================================================
+# Descrição: O risco de longevidade acompanha cada caminho além da
+#            expectativa de vida: confere a fração de caminhos em que o
+#            patrimônio acaba antes da morte sorteada contra um cálculo
+#            direto, caminho a caminho, com os mesmos sorteios.
+#
+# Uso:
+#   python -m pytest tests/test_monte_carlo.py
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import math
+
+import numpy as np
+
+from retirement_engine import MonteCarloSettings, run_monte_carlo
+from retirement_engine.monte_carlo import (
+    STREAM_PATHS,
+    draw_beyond_returns,
+    draw_phase_returns,
+    months_beyond_horizon,
+    n_streams,
+    stream_rng,
+)
+from retirement_engine.mortality import build_survival_curve
+from retirement_engine.samples import make_config
+
+# Probabilidade anual de morte constante em todas as idades da tábua
+FLAT_QX = 0.05
+MAX_TABLE_AGE = 110
+
+
+# -----------------------------------------------------------------------------
+# 2. TESTES
+# -----------------------------------------------------------------------------
+def test_longevity_ruin_follows_paths_beyond_horizon() -> None:
+    # Aposentadoria dos 50 aos 60 anos, com despesas que esgotam o patrimônio
+    # depois dos 60 na maior parte dos caminhos.
+    config = make_config(20, 10)
+    settings = MonteCarloSettings(n_paths=2 * STREAM_PATHS - 100, volatility_acc=15.0, volatility_ret=10.0, seed=11)
+    ages = np.arange(MAX_TABLE_AGE + 1)
+    curve = build_survival_curve(ages, np.full(len(ages), FLAT_QX), config.current_age)
+    result = run_monte_carlo(config, settings, curve)
+
+    depletion_ages = []
+    lifespans = []
+    for index in range(n_streams(settings.n_paths)):
+        n_paths = min(STREAM_PATHS, settings.n_paths - index * STREAM_PATHS)
+        rng = stream_rng(settings.seed, index)
+        returns_acc, returns_ret = draw_phase_returns(config, settings, n_paths, rng)
+        stream_lifespans = curve.draw_lifespans(n_paths, rng)
+        beyond = draw_beyond_returns(config, settings, n_paths, months_beyond_horizon(config, curve.ages[-1]), rng)
+        for p in range(n_paths):
+            balance = config.total_investments_today
+            for rate in returns_acc[p]:
+                balance = balance * (1 + rate) + config.monthly_investment
+            depletion_age = math.nan
+            for m, rate in enumerate(np.concatenate([returns_ret[p], beyond[p]])):
+                balance = balance * (1 + rate) - config.monthly_expenses
+                if balance < 0:
+                    depletion_age = config.retirement_age + (m + 1) / 12
+                    break
+            depletion_ages.append(depletion_age)
+        lifespans.extend(stream_lifespans)
+    depletion_ages = np.array(depletion_ages)
+    lifespans = np.array(lifespans)
+
+    assert np.array_equal(result.lifespans, lifespans)
+    np.testing.assert_allclose(result.lifetime_depletion_ages, depletion_ages, rtol=0, atol=1e-9)
+    expected_ruin = float(np.mean(depletion_ages < lifespans))
+    assert result.longevity_ruin_probability == expected_ruin
+    assert result.survival_ruin_probability == float(np.mean(curve.probability_alive(depletion_ages)))
+    # Medido só até a expectativa de vida, o risco seria subestimado
+    assert float(np.mean(result.depletion_ages < result.lifespans)) < expected_ruin
+    assert result.success_probability == float(np.mean(~(depletion_ages <= config.life_expectancy)))
@@ -0,0 +1,121 @@
+# =============================================================================
+# PARIDADE DAS FÓRMULAS
+# =============================================================================
+# Descrição: Confere que as fórmulas fechadas (série geométrica, anuidade e
+#            recorrência linear) reproduzem a recursão mês a mês, e que a
+#            simulação vetorizada de cenários dá os mesmos resultados de
+#            `run_simulation`, inclusive em entradas que estouram o float.
+#
+# Uso:
+#   python -m pytest tests/test_parity.py
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import dataclasses
+from typing import List
+
+import numpy as np
+import pytest
+
+from retirement_engine import (
+    METHOD_CLOSED_FORM,
+    METHOD_LOOP,
+    MODE_CUSTOM,
+    MODE_STRATEGY,
+    STRATEGY_DRAWDOWN,
+    STRATEGY_PERPETUAL,
+    SimulationConfig,
+    first_negative_index,
+    retirement_income_schedule,
+    run_simulation,
+    simulate_accumulation,
+    simulate_retirement,
+)
+from retirement_engine.samples import HORIZONS, SOURCE_COUNTS, make_config
+from retirement_engine.scenarios import simulate_scenarios
+
+# -----------------------------------------------------------------------------
+# 2. CONFIGURAÇÕES
+# -----------------------------------------------------------------------------
+# Diferença máxima aceita entre fórmulas e recursão, relativa à escala do caminho
+PARITY_TOLERANCE = 1e-9
+
+
+def parity_configs() -> List[SimulationConfig]:
+    """Horizontes, fontes e modos dos benchmarks e casos extremos."""
+    configs = []
+    for n_sources in SOURCE_COUNTS:
+        for years in HORIZONS:
+            configs.append(make_config(20, years, n_sources))
+    for strategy_type in (STRATEGY_DRAWDOWN, STRATEGY_PERPETUAL):
+        for years in HORIZONS:
+            configs.append(make_config(20, years, 10, MODE_STRATEGY, strategy_type))
+    extremes = []
+    for config in configs[::3]:
+        for rate in (0.0, -2.0, 12.0):
+            extremes.append(dataclasses.replace(config, annual_rate_acc=rate, annual_rate_ret=rate))
+        if config.strategy_mode == MODE_CUSTOM:
+            # Despesas altas: o patrimônio se esgota no meio da aposentadoria
+            extremes.append(dataclasses.replace(config, monthly_expenses=40_000.0))
+    return configs + extremes
+
+
+def overflow_configs() -> List[SimulationConfig]:
+    """Taxas e saldos extremos, em que as fórmulas deixam de dar valores finitos."""
+    configs = []
+    for config in (make_config(20, 40, 10), make_config(20, 40, 10, MODE_STRATEGY, STRATEGY_DRAWDOWN)):
+        for rate in (500.0, 1e4, 1e9):
+            configs.append(dataclasses.replace(config, annual_rate_acc=rate))
+            configs.append(dataclasses.replace(config, annual_rate_ret=rate))
+        configs.append(dataclasses.replace(config, total_investments_today=1e306, annual_rate_ret=500.0))
+        configs.append(dataclasses.replace(config, monthly_investment=1e305))
+    return configs
+
+
+def describe(config: SimulationConfig) -> str:
+    return (
+        f"{config.strategy_type or config.strategy_mode}-{config.accumulation_months}+"
+        f"{config.retirement_months}m-{len(config.income_sources)}fontes-taxa{config.annual_rate_ret:g}"
+    )
+
+
+PARITY_CONFIGS = parity_configs()
+OVERFLOW_CONFIGS = overflow_configs()
+
+
+# -----------------------------------------------------------------------------
+# 3. TESTES
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("config", PARITY_CONFIGS, ids=[describe(c) for c in PARITY_CONFIGS])
+def test_closed_form_matches_loop(config: SimulationConfig) -> None:
+    """Saldos relativos à escala do caminho (o maior saldo em módulo) e mês de esgotamento."""
+    _, acc_closed = simulate_accumulation(config, method=METHOD_CLOSED_FORM)
+    _, acc_loop = simulate_accumulation(config, method=METHOD_LOOP)
+    income = retirement_income_schedule(config)
+    ret_closed = simulate_retirement(config, float(acc_loop[-1]), income, method=METHOD_CLOSED_FORM)
+    ret_loop = simulate_retirement(config, float(acc_loop[-1]), income, method=METHOD_LOOP)
+    depletion_closed = int(first_negative_index(np.asarray(ret_closed.portfolio)))
+    depletion_loop = int(first_negative_index(np.asarray(ret_loop.portfolio)))
+    assert depletion_closed == depletion_loop
+    assert len(ret_closed.portfolio) == len(ret_loop.portfolio)
+    for closed, loop in (
+        (acc_closed, acc_loop),
+        (np.asarray(ret_closed.portfolio), np.asarray(ret_loop.portfolio)),
+    ):
+        if not len(loop):
+            continue
+        scale = max(1.0, float(np.abs(loop).max()), abs(float(acc_loop[-1])))
+        assert float(np.abs(closed - loop).max()) / scale <= PARITY_TOLERANCE
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_scenarios_match_run_simulation() -> None:
+    """Todas as configurações em um único lote: séries idênticas às de `run_simulation`."""
+    configs = PARITY_CONFIGS + OVERFLOW_CONFIGS
+    for config, result in zip(configs, simulate_scenarios(configs)):
+        expected = run_simulation(config)
+        columns, expected_columns = result.columns.to_dict(), expected.columns.to_dict()
+        for name, column in expected_columns.items():
+            assert np.array_equal(columns[name], column, equal_nan=True), f"{describe(config)}: {name}"
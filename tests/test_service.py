@@ -0,0 +1,231 @@
+# =============================================================================
+# SERVIÇO HTTP DE SIMULAÇÃO
+# =============================================================================
+# Descrição: Cada requisição de um lote recebe a própria resposta (422 para
+#            corpos inválidos e 500 para falhas na simulação, sem afetar as
+#            demais), a fila cheia responde 503, requisições vencidas
+#            respondem 504 e cabeçalhos e campos malformados são recusados
+#            com mensagens claras.
+#
+# Uso:
+#   python -m pytest tests/test_service.py
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import http.client
+import json
+import threading
+import time
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+import pytest
+
+from retirement_engine import service as service_module
+from retirement_engine.service import (
+    TIMEOUT_RESPONSE,
+    ServiceOverloaded,
+    SimulationServer,
+    SimulationService,
+    simulate_requests,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+# Expectativa de vida que faz a simulação falhar (ver `failing_simulations`)
+FAILING_LIFE_EXPECTANCY = 97
+
+
+# -----------------------------------------------------------------------------
+# 2. AUXILIARES
+# -----------------------------------------------------------------------------
+def example_config(**changes: Any) -> Dict[str, Any]:
+    with open(ROOT / "example_config.json", encoding="utf-8") as f:
+        return dict(json.load(f), reference_date="2025-01-01", **changes)
+
+
+@pytest.fixture
+def failing_simulations(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Simulações (determinísticas ou de Monte Carlo) que falham para uma expectativa de vida."""
+    simulate_scenarios, run_monte_carlo = service_module.simulate_scenarios, service_module.run_monte_carlo
+
+    def failing_scenarios(configs: Any) -> Any:
+        if any(config.life_expectancy == FAILING_LIFE_EXPECTANCY for config in configs):
+            raise RuntimeError("falha simulada")
+        return simulate_scenarios(configs)
+
+    def failing_monte_carlo(config: Any, settings: Any) -> Any:
+        if config.life_expectancy == FAILING_LIFE_EXPECTANCY:
+            raise RuntimeError("falha simulada")
+        return run_monte_carlo(config, settings)
+
+    monkeypatch.setattr(service_module, "simulate_scenarios", failing_scenarios)
+    monkeypatch.setattr(service_module, "run_monte_carlo", failing_monte_carlo)
+
+
+class BlockedPool:
+    """Ocupa todas as vagas do pool: o despachante para no primeiro lote retirado da fila."""
+
+    def __init__(self, service: SimulationService):
+        self.service = service
+        for _ in range(2 * service.workers):
+            service._slots.acquire()
+
+    def wait_until_dispatched(self, timeout: float = 5.0) -> None:
+        limit = time.monotonic() + timeout
+        while self.service.metrics()["queue_depth"]:
+            assert time.monotonic() < limit, "o despachante não retirou a requisição da fila"
+            time.sleep(0.01)
+
+    def release(self) -> None:
+        for _ in range(2 * self.service.workers):
+            self.service._slots.release()
+
+
+@pytest.fixture(scope="module")
+def server() -> Iterator[SimulationServer]:
+    service = SimulationService(workers=1)
+    httpd = SimulationServer(("127.0.0.1", 0), service)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield httpd
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        service.close()
+
+
+def post(server: SimulationServer, body: bytes, content_length: str) -> Tuple[int, Dict[str, Any]]:
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=30)
+    try:
+        connection.putrequest("POST", "/simulate")
+        connection.putheader("Content-Type", "application/json")
+        connection.putheader("Content-Length", content_length)
+        connection.endheaders(body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def post_json(server: SimulationServer, data: Any) -> Tuple[int, Dict[str, Any]]:
+    body = json.dumps(data).encode("utf-8")
+    return post(server, body, str(len(body)))
+
+
+# -----------------------------------------------------------------------------
+# 3. LOTES
+# -----------------------------------------------------------------------------
+def test_batch_isolates_invalid_and_failing_requests(failing_simulations: None) -> None:
+    requests = [
+        example_config(),
+        example_config(retirement_age="sessenta"),
+        example_config(life_expectancy=FAILING_LIFE_EXPECTANCY),
+        {"config": example_config(), "monte_carlo": {"n_paths": 200, "seed": 1}},
+        {"config": example_config(life_expectancy=FAILING_LIFE_EXPECTANCY), "monte_carlo": {"n_paths": 200}},
+        {"config": example_config(), "monte_carlo": {"n_paths": 0}},
+        "não é um objeto",
+        example_config(annual_rate_ret=4.0),
+    ]
+    statuses = [status for status, _ in simulate_requests(requests)]
+    assert statuses == [
+        HTTPStatus.OK,
+        HTTPStatus.UNPROCESSABLE_ENTITY,
+        HTTPStatus.INTERNAL_SERVER_ERROR,
+        HTTPStatus.OK,
+        HTTPStatus.INTERNAL_SERVER_ERROR,
+        HTTPStatus.UNPROCESSABLE_ENTITY,
+        HTTPStatus.UNPROCESSABLE_ENTITY,
+        HTTPStatus.OK,
+    ]
+    # As válidas do lote têm o mesmo resultado que teriam sozinhas
+    alone = simulate_requests([requests[0], requests[-1]])
+    responses = simulate_requests(requests)
+    assert [responses[0], responses[-1]] == alone
+
+
+def test_missing_field_is_named() -> None:
+    data = example_config()
+    del data["birth_date"]
+    [(status, body)] = simulate_requests([data])
+    assert status == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert body["error"] == "Campo obrigatório ausente: `birth_date`."
+
+
+# -----------------------------------------------------------------------------
+# 4. FILA E PRAZOS
+# -----------------------------------------------------------------------------
+def test_full_queue_is_rejected_with_503() -> None:
+    service = SimulationService(workers=1, queue_size=1)
+    try:
+        pool = BlockedPool(service)
+        first = service.submit(example_config())
+        pool.wait_until_dispatched()
+        second = service.submit(example_config(annual_rate_ret=4.0))
+        with pytest.raises(ServiceOverloaded):
+            service.submit(example_config())
+        status, _ = service.simulate(example_config())
+        assert status == HTTPStatus.SERVICE_UNAVAILABLE
+
+        pool.release()
+        assert service.wait(first)[0] == HTTPStatus.OK
+        assert service.wait(second)[0] == HTTPStatus.OK
+        metrics = service.metrics()
+        assert (metrics["requests"], metrics["rejected"], metrics["completed"]) == (4, 2, 2)
+        assert metrics["in_flight"] == 0
+    finally:
+        service.close()
+
+
+def test_expired_requests_get_504() -> None:
+    service = SimulationService(workers=1)
+    try:
+        pool = BlockedPool(service)
+        first = service.submit(example_config())
+        pool.wait_until_dispatched()
+        # Aguardada pelo cliente: o prazo acaba enquanto espera na fila
+        assert service.simulate(example_config(), timeout=0.05) == TIMEOUT_RESPONSE
+        # Não aguardada: o despachante a descarta ao retirá-la da fila, já vencida
+        expired = service.submit(example_config(), timeout=0.05)
+        time.sleep(0.1)
+
+        pool.release()
+        assert service.wait(first)[0] == HTTPStatus.OK
+        assert expired.future.result(timeout=5) == TIMEOUT_RESPONSE
+        assert service.wait(expired) == TIMEOUT_RESPONSE
+        metrics = service.metrics()
+        assert (metrics["completed"], metrics["timed_out"], metrics["expired"]) == (1, 2, 2)
+        assert metrics["batched_requests"] == 1
+    finally:
+        service.close()
+
+
+# -----------------------------------------------------------------------------
+# 5. SERVIDOR HTTP
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("content_length", ["abc", "-1", "1.5"])
+def test_invalid_content_length_is_rejected(server: SimulationServer, content_length: str) -> None:
+    status, body = post(server, b"{}", content_length)
+    assert status == HTTPStatus.BAD_REQUEST
+    assert "Content-Length" in body["error"]
+
+
+@pytest.mark.parametrize("timeout", [True, False, 0, -1, "10"])
+def test_invalid_timeout_is_rejected(server: SimulationServer, timeout: Any) -> None:
+    status, body = post_json(server, {"config": example_config(), "timeout": timeout})
+    assert status == HTTPStatus.BAD_REQUEST
+    assert "timeout" in body["error"]
+
+
+def test_simulate_over_http(server: SimulationServer) -> None:
+    status, body = post_json(server, {"config": example_config(), "timeout": 20})
+    assert status == HTTPStatus.OK and body["portfolio_at_retirement"] > 0
+    data = example_config()
+    del data["retirement_age"]
+    assert post_json(server, data) == (
+        HTTPStatus.UNPROCESSABLE_ENTITY,
+        {"error": "Campo obrigatório ausente: `retirement_age`."},
+    )
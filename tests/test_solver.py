@@ -0,0 +1,117 @@
+# =============================================================================
+# CALCULADORA DE METAS (GOAL SEEK)
+# =============================================================================
+# Descrição: Confere as respostas dos solucionadores contra a simulação
+#            completa (`run_simulation`): a solução atende à meta e um passo
+#            aquém dela (um centavo ou um ano) não atende.
+#
+# Uso:
+#   python -m pytest tests/test_solver.py
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import dataclasses
+import json
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from retirement_engine import (
+    MODE_STRATEGY,
+    STRATEGY_DRAWDOWN,
+    STRATEGY_PERPETUAL,
+    SimulationConfig,
+    run_simulation,
+)
+from retirement_engine.samples import make_config
+from retirement_engine.solver import solve_monthly_expenses, solve_monthly_investment, solve_retirement_age
+
+ROOT = Path(__file__).resolve().parent.parent
+CENT = 0.01
+# Gasto total mensal desejado no modo estratégia
+TARGET_SPENDING = 12_000.0
+
+
+# -----------------------------------------------------------------------------
+# 2. CONFIGURAÇÕES
+# -----------------------------------------------------------------------------
+def example_config() -> SimulationConfig:
+    with open(ROOT / "example_config.json", encoding="utf-8") as f:
+        return SimulationConfig.from_dict(dict(json.load(f), reference_date="2025-01-01"))
+
+
+def custom_configs() -> List[SimulationConfig]:
+    return [make_config(20, 30), make_config(20, 30, 10), make_config(25, 40, 10), make_config(10, 50, 2)]
+
+
+def strategy_configs() -> List[SimulationConfig]:
+    configs = [
+        make_config(20, years, n_sources, MODE_STRATEGY, strategy_type)
+        for strategy_type in (STRATEGY_DRAWDOWN, STRATEGY_PERPETUAL)
+        for years, n_sources in ((30, 0), (40, 10))
+    ]
+    return [example_config()] + configs
+
+
+def describe(config: SimulationConfig) -> str:
+    return (
+        f"{config.strategy_type or config.strategy_mode}-{config.accumulation_months}+"
+        f"{config.retirement_months}m-{len(config.income_sources)}fontes"
+    )
+
+
+CUSTOM_CONFIGS = custom_configs()
+STRATEGY_CONFIGS = strategy_configs()
+
+
+def sustainable(config: SimulationConfig) -> bool:
+    """Meta atendida pela simulação completa: patrimônio não se esgota ou gasto recomendado alcançado."""
+    result = run_simulation(config)
+    if config.strategy_mode == MODE_STRATEGY:
+        return result.recommended_total_spending >= TARGET_SPENDING
+    return not result.depleted
+
+
+# -----------------------------------------------------------------------------
+# 3. TESTES
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("config", CUSTOM_CONFIGS + STRATEGY_CONFIGS, ids=describe)
+def test_monthly_investment_is_minimal(config: SimulationConfig) -> None:
+    target = TARGET_SPENDING if config.strategy_mode == MODE_STRATEGY else None
+    investment = solve_monthly_investment(config, target)
+    assert investment is not None and investment > CENT
+    assert sustainable(dataclasses.replace(config, monthly_investment=investment))
+    assert not sustainable(dataclasses.replace(config, monthly_investment=investment - CENT))
+
+
+@pytest.mark.parametrize("config", CUSTOM_CONFIGS, ids=describe)
+def test_monthly_expenses_is_maximal(config: SimulationConfig) -> None:
+    expenses = solve_monthly_expenses(config)
+    assert sustainable(dataclasses.replace(config, monthly_expenses=expenses))
+    assert not sustainable(dataclasses.replace(config, monthly_expenses=expenses + CENT))
+
+
+@pytest.mark.parametrize("config", STRATEGY_CONFIGS, ids=describe)
+def test_strategy_spending_matches_simulation(config: SimulationConfig) -> None:
+    assert solve_monthly_expenses(config) == pytest.approx(run_simulation(config).recommended_total_spending)
+
+
+@pytest.mark.parametrize("config", CUSTOM_CONFIGS + STRATEGY_CONFIGS, ids=describe)
+def test_retirement_age_is_earliest(config: SimulationConfig) -> None:
+    target = TARGET_SPENDING if config.strategy_mode == MODE_STRATEGY else None
+    age = solve_retirement_age(config, target)
+    assert age is not None and age > config.current_age + 1
+    assert sustainable(dataclasses.replace(config, retirement_age=float(age)))
+    assert not sustainable(dataclasses.replace(config, retirement_age=float(age - 1)))
+
+
+def test_unreachable_goals() -> None:
+    config = dataclasses.replace(make_config(20, 30), monthly_expenses=1e9)
+    assert solve_retirement_age(config) is None
+    perpetual = make_config(20, 30, 0, MODE_STRATEGY, STRATEGY_PERPETUAL)
+    assert solve_monthly_investment(dataclasses.replace(perpetual, annual_rate_ret=0.0), TARGET_SPENDING) is None
+    with pytest.raises(ValueError):
+        solve_monthly_investment(perpetual)
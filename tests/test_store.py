@@ -0,0 +1,200 @@
+# =============================================================================
+# ARMAZENAMENTO PERSISTENTE DE RESULTADOS
+# =============================================================================
+# Descrição: Leitura e gravação de resultados no banco SQLite, descarte pelo
+#            limite de tamanho (primeiro os de outras versões do motor, depois
+#            os sem cliente), total mantido pelos gatilhos e buscas por
+#            cliente e etiqueta.
+#
+# Uso:
+#   python -m pytest tests/test_store.py
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import dataclasses
+import itertools
+import sqlite3
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pytest
+
+from retirement_engine import ENGINE_VERSION, SimulationConfig, SimulationResult, run_simulation
+from retirement_engine import store as store_module
+from retirement_engine.samples import make_config
+from retirement_engine.store import ResultStore
+
+
+# -----------------------------------------------------------------------------
+# 2. AUXILIARES
+# -----------------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def fake_clock(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Relógio que avança um segundo a cada leitura: a ordem de uso é determinística."""
+    ticks = itertools.count(1_000_000)
+    monkeypatch.setattr(store_module, "time", SimpleNamespace(time=lambda: float(next(ticks))))
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> Iterator[ResultStore]:
+    with ResultStore(tmp_path / "resultados.db") as opened:
+        yield opened
+
+
+def simulated(*configs: SimulationConfig) -> List[Tuple[SimulationConfig, SimulationResult]]:
+    return [(config, run_simulation(config)) for config in configs]
+
+
+def stored_sizes(store: ResultStore) -> int:
+    return sum(plan.size_bytes for plan in store.find(limit=-1))
+
+
+# -----------------------------------------------------------------------------
+# 3. TESTES
+# -----------------------------------------------------------------------------
+def test_round_trip(tmp_path: Path) -> None:
+    config = make_config(20, 30, 10)
+    result = run_simulation(config)
+    path = tmp_path / "resultados.db"
+    with ResultStore(path) as store:
+        assert store.get(config) is None
+        store.put(config, result, client="ana")
+
+    # Outra instância (outro processo) lê o mesmo banco
+    with ResultStore(path) as store:
+        loaded = store.get(config)
+        assert config in store
+        assert (store.hits, store.misses) == (1, 0)
+        narrow = store.get(config, dtype=np.float32)
+    assert loaded is not None and narrow is not None
+    for name, column in result.columns.to_dict().items():
+        assert np.array_equal(loaded.columns.to_dict()[name], column, equal_nan=True), name
+    for name in (
+        "portfolio_at_retirement",
+        "recommended_total_spending",
+        "initial_additional_income",
+        "computed_portfolio_withdrawal",
+        "depletion_age",
+        "final_balance",
+    ):
+        assert getattr(loaded, name) == getattr(result, name), name
+    assert np.array_equal(loaded.income_matrix, result.income_matrix)
+    assert narrow.columns.dtype == np.float32
+
+    with pytest.raises(ValueError):
+        with ResultStore(path) as store:
+            store.put(config, dataclasses.replace(result, columns=result.columns.astype(np.float32)))
+
+
+def test_total_bytes_follows_inserts_updates_and_deletes(store: ResultStore) -> None:
+    (short, short_result), (long, long_result) = simulated(make_config(20, 10), make_config(20, 60, 10))
+    store.put(short, short_result)
+    store.put(long, long_result)
+    assert store.total_bytes == stored_sizes(store) > 0
+
+    # Mesmo hash com séries de outro tamanho: o gatilho de atualização ajusta o total
+    store.put(short, long_result)
+    assert store.total_bytes == stored_sizes(store)
+
+    assert store.delete(long)
+    assert not store.delete(long)
+    assert store.total_bytes == stored_sizes(store)
+    store.delete(short)
+    assert store.total_bytes == 0
+
+
+def test_eviction_drops_ownerless_results_first(store: ResultStore) -> None:
+    items = simulated(*(make_config(20, years) for years in (10, 20, 30, 40)))
+    (old_free, _), (owned, _), (new_free, _), (recent_owned, _) = items
+    for (config, result), client in zip(items, (None, "ana", None, "bruno")):
+        store.put(config, result, client=client)
+    # O resultado sem cliente mais antigo passa a ser o mais recente
+    assert store.get(old_free) is not None
+
+    expected_order = [new_free, old_free, owned, recent_owned]
+    for evicted in range(len(items)):
+        assert store.evict(store.total_bytes - 1) == 1
+        assert [config in store for config in expected_order] == [False] * (evicted + 1) + [True] * (3 - evicted)
+    assert len(store) == 0 and store.total_bytes == 0
+
+
+def test_put_evicts_over_max_bytes_but_keeps_new_result(tmp_path: Path) -> None:
+    items = simulated(*(make_config(20, years) for years in (10, 20, 30)))
+    with ResultStore(tmp_path / "resultados.db", max_bytes=1) as store:
+        for config, result in items:
+            store.put(config, result)
+            # Só o resultado recém-gravado fica, mesmo maior que o limite
+            assert len(store) == 1 and config in store
+    with pytest.raises(ValueError):
+        ResultStore(tmp_path / "outro.db", max_bytes=0)
+
+
+def test_find_by_client_and_tags(store: ResultStore) -> None:
+    (base, base_result), (early, early_result), (other, other_result) = simulated(
+        make_config(20, 30), make_config(15, 35), make_config(25, 25)
+    )
+    store.put(base, base_result, client="ana", tags=["base", " revisado ", ""])
+    store.put(early, early_result, client="ana", tags="vip")
+    store.put(other, other_result, client="bruno", tags=("base",))
+    # Sem cliente, o dono anterior é mantido e as etiquetas se acumulam
+    store.put(early, early_result, tags=["base"])
+    store.tag(other, "vip")
+
+    assert store.clients() == ["ana", "bruno"]
+    plans = store.find(client="ana")
+    assert [plan.config for plan in plans] == [early, base]
+    assert [plan.tags for plan in plans] == [("base", "vip"), ("base", "revisado")]
+    assert {plan.config_hash for plan in store.find(tags=["base"])} == {
+        plan.config_hash for plan in store.find()
+    }
+    # Etiquetar não conta como uso: o resultado de "ana" foi gravado por último
+    assert [plan.client for plan in store.find(tags=["vip", "base"])] == ["ana", "bruno"]
+    assert [plan.config for plan in store.find(client="ana", tags=["revisado"])] == [base]
+    assert store.find(client="carla") == []
+    assert len(store.find(limit=1)) == 1
+
+    with pytest.raises(KeyError):
+        store.tag(make_config(20, 50), ["base"])
+
+
+def test_results_from_other_engine_versions_are_misses(store: ResultStore, monkeypatch: pytest.MonkeyPatch) -> None:
+    (stale, stale_result), (owned, owned_result) = simulated(make_config(20, 10), make_config(20, 20))
+    store.put(stale, stale_result)
+    store.put(owned, owned_result, client="ana")
+
+    monkeypatch.setattr(store_module, "ENGINE_VERSION", ENGINE_VERSION + 1)
+    assert store.get(stale) is None and stale not in store
+    assert store.find() == [] and store.misses == 1
+    # Ao descartar, saem antes os resultados das outras versões, mesmo com cliente
+    (fresh, fresh_result), = simulated(make_config(20, 30))
+    store.put(fresh, fresh_result)
+    store.evict(store.total_bytes - 1)
+    assert len(store) == 2
+    store.evict(store.total_bytes - 1)
+    assert [plan.config for plan in store.find()] == [fresh]
+
+    # Recalculado, o resultado volta a ser servido, com o cliente mantido
+    store.put(stale, stale_result)
+    assert store.get(stale) is not None
+
+
+@pytest.mark.skipif(sqlite3.sqlite_version_info < (3, 35), reason="requer ALTER TABLE DROP COLUMN")
+def test_opening_database_without_engine_version(tmp_path: Path) -> None:
+    config = make_config(20, 30)
+    path = tmp_path / "resultados.db"
+    with ResultStore(path) as store:
+        store.put(config, run_simulation(config), client="ana")
+    with sqlite3.connect(str(path)) as connection:
+        connection.execute("ALTER TABLE results DROP COLUMN engine_version")
+    connection.close()
+
+    with ResultStore(path) as store:
+        assert len(store) == 1
+        assert store.get(config) is None
+        store.put(config, run_simulation(config))
+        assert store.get(config) is not None
+        assert store.find(client="ana")[0].config == config
@@ -0,0 +1,162 @@
+# =============================================================================
+# REGRAS DE RETIRADA
+# =============================================================================
+# Descrição: Fixa a retirada de cada regra dinâmica em caminhos de saldo
+#            escolhidos à mão, com os valores esperados calculados a partir
+#            da definição de cada regra: os gatilhos dos guardrails de
+#            Guyton-Klinger, o teto de reajuste da regra dos 4%, os limites
+#            do piso e teto e a anuidade da VPW.
+#
+# Uso:
+#   python -m pytest tests/test_withdrawal.py
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+from typing import Sequence
+
+import numpy as np
+import pytest
+
+from retirement_engine.withdrawal import (
+    STRATEGY_DRAWDOWN,
+    STRATEGY_FLOOR_CEILING,
+    STRATEGY_FOUR_PERCENT,
+    STRATEGY_GUYTON_KLINGER,
+    STRATEGY_VPW,
+    WithdrawalPolicy,
+    WithdrawalRule,
+    annuity_due_factor,
+)
+
+PORTFOLIO = 1_200_000.0
+YEARS = 30
+
+
+# -----------------------------------------------------------------------------
+# 2. AUXILIARES
+# -----------------------------------------------------------------------------
+def portfolios(n_paths: int) -> np.ndarray:
+    return np.full(n_paths, PORTFOLIO)
+
+
+def run_path(policy: WithdrawalPolicy, yearly_balances: Sequence[Sequence[float]]) -> np.ndarray:
+    """Retiradas mês a mês; o saldo de cada caminho fica constante dentro de cada ano.
+
+    `yearly_balances[k]` é o saldo visto nos meses do ano ``k`` (um valor
+    por caminho). Devolve a retirada do primeiro mês de cada ano.
+    """
+    first_of_year = []
+    for year, balances in enumerate(yearly_balances):
+        balances = np.asarray(balances, dtype=float)
+        for month in range(12 * year, 12 * year + 12):
+            withdrawal = policy.withdrawal(month, balances).copy()
+            if month % 12 == 0:
+                first_of_year.append(withdrawal)
+            else:
+                # Fora da revisão anual a retirada não muda
+                np.testing.assert_array_equal(withdrawal, first_of_year[-1])
+    return np.array(first_of_year)
+
+
+# -----------------------------------------------------------------------------
+# 3. GUARDRAILS DE GUYTON-KLINGER
+# -----------------------------------------------------------------------------
+def test_guyton_klinger_guardrails() -> None:
+    # 5% de R$ 1,2 milhão: R$ 5.000 por mês. Com guardrails de 20%, a
+    # retirada é cortada em 10% acima de 6% ao ano e aumentada abaixo de 4%.
+    policy = WithdrawalPolicy(STRATEGY_GUYTON_KLINGER, WithdrawalRule(), portfolios(4), 0.0, YEARS * 12)
+    withdrawals = run_path(policy, [
+        [PORTFOLIO, PORTFOLIO, PORTFOLIO, PORTFOLIO],
+        # 60.000 / 900.000 = 6,7% (corte); 3,75% (aumento); 5,45% (mantém); saldo zerado (corte)
+        [900_000.0, 1_600_000.0, 1_100_000.0, 0.0],
+        # 54.000 / 700.000 = 7,7% (corte); 66.000 / 1.700.000 = 3,9% (aumento); 6,0% exato (mantém)
+        [700_000.0, 1_700_000.0, 1_000_000.0, 0.0],
+    ])
+    np.testing.assert_allclose(withdrawals, [
+        [5_000.0, 5_000.0, 5_000.0, 5_000.0],
+        [4_500.0, 5_500.0, 5_000.0, 4_500.0],
+        [4_050.0, 6_050.0, 5_000.0, 4_050.0],
+    ], rtol=1e-12)
+
+
+def test_guyton_klinger_does_not_cut_in_last_fifteen_years() -> None:
+    # Com 16 anos de aposentadoria, a revisão do ano 1 deixa 15 anos: só aumenta
+    policy = WithdrawalPolicy(STRATEGY_GUYTON_KLINGER, WithdrawalRule(), portfolios(2), 0.0, 16 * 12)
+    withdrawals = run_path(policy, [[PORTFOLIO, PORTFOLIO], [900_000.0, 1_600_000.0]])
+    np.testing.assert_allclose(withdrawals[-1], [5_000.0, 5_500.0], rtol=1e-12)
+
+
+# -----------------------------------------------------------------------------
+# 4. REGRA DOS 4% COM TETO DE REAJUSTE
+# -----------------------------------------------------------------------------
+def test_four_percent_cap_erodes_real_withdrawal() -> None:
+    # Inflação de 4% reajustada em no máximo 3%: perde 1,03 / 1,04 por ano em
+    # valores reais, qualquer que seja o saldo.
+    policy = WithdrawalPolicy(STRATEGY_FOUR_PERCENT, WithdrawalRule(), portfolios(2), 0.0, YEARS * 12)
+    withdrawals = run_path(policy, [[PORTFOLIO, 1.0]] * 3)
+    expected = 4_000.0 * (1.03 / 1.04) ** np.arange(3)
+    assert expected[1] == pytest.approx(3_961.538461538, rel=1e-12)
+    np.testing.assert_allclose(withdrawals, np.column_stack([expected, expected]), rtol=1e-12)
+
+    # Com a inflação abaixo do teto o reajuste é integral e a retirada real se mantém
+    below_cap = WithdrawalRule(inflation=2.0, inflation_cap=3.0)
+    policy = WithdrawalPolicy(STRATEGY_FOUR_PERCENT, below_cap, portfolios(1), 0.0, YEARS * 12)
+    np.testing.assert_allclose(run_path(policy, [[PORTFOLIO]] * 3), 4_000.0, rtol=1e-12)
+
+
+# -----------------------------------------------------------------------------
+# 5. PISO E TETO
+# -----------------------------------------------------------------------------
+def test_floor_ceiling_clamps_to_initial_withdrawal() -> None:
+    # 5% do saldo ao ano, limitado a 90% (R$ 4.500) e 125% (R$ 6.250) da retirada inicial
+    policy = WithdrawalPolicy(STRATEGY_FLOOR_CEILING, WithdrawalRule(), portfolios(4), 0.0, YEARS * 12)
+    withdrawals = run_path(policy, [
+        [PORTFOLIO] * 4,
+        [600_000.0, 2_400_000.0, 1_320_000.0, -10.0],
+        [1_320_000.0, 1_140_000.0, 600_000.0, 2_400_000.0],
+    ])
+    np.testing.assert_allclose(withdrawals, [
+        [5_000.0, 5_000.0, 5_000.0, 5_000.0],
+        [4_500.0, 6_250.0, 5_500.0, 4_500.0],
+        [5_500.0, 4_750.0, 4_500.0, 6_250.0],
+    ], rtol=1e-12)
+
+
+# -----------------------------------------------------------------------------
+# 6. RETIRADA PERCENTUAL VARIÁVEL (VPW)
+# -----------------------------------------------------------------------------
+def test_vpw_spreads_balance_over_remaining_months() -> None:
+    # Sem rendimento, retira o saldo dividido pelos meses restantes, todo mês
+    policy = WithdrawalPolicy(STRATEGY_VPW, WithdrawalRule(), PORTFOLIO, 0.0, 120)
+    assert policy.initial_withdrawal == pytest.approx(10_000.0)
+    cases = [
+        (0, PORTFOLIO, 10_000.0),
+        (60, 600_000.0, 10_000.0),
+        (100, 100_000.0, 5_000.0),
+        # No último mês retira o saldo inteiro; saldo negativo não gera retirada
+        (119, 4_321.0, 4_321.0),
+        (119, -5.0, 0.0),
+    ]
+    for month, balance, expected in cases:
+        assert policy.withdrawal(month, np.array([balance]))[0] == pytest.approx(expected, rel=1e-12)
+
+
+def test_vpw_annuity_with_return() -> None:
+    # Dois meses a 1%: W = 1,01 × (B − W), então W = B × 1,01 / 2,01
+    assert annuity_due_factor(0.01, 2) == pytest.approx(1.01 / 2.01, rel=1e-12)
+    policy = WithdrawalPolicy(STRATEGY_VPW, WithdrawalRule(), PORTFOLIO, 0.01, 2)
+    # A retirada inicial é calculada sobre o saldo após o rendimento do primeiro mês
+    assert policy.initial_withdrawal == pytest.approx(PORTFOLIO * 1.01 * 1.01 / 2.01, rel=1e-12)
+    first = float(policy.withdrawal(0, np.array([PORTFOLIO]))[0])
+    assert first == pytest.approx(PORTFOLIO * 1.01 / 2.01, rel=1e-12)
+    # O saldo restante rende 1% e é retirado inteiro no último mês
+    last = float(policy.withdrawal(1, np.array([(PORTFOLIO - first) * 1.01]))[0])
+    assert last == pytest.approx(first, rel=1e-12)
+    assert annuity_due_factor(0.01, 1) == pytest.approx(1.0)
+
+
+def test_fixed_strategies_have_no_policy() -> None:
+    with pytest.raises(ValueError):
+        WithdrawalPolicy(STRATEGY_DRAWDOWN, WithdrawalRule(), PORTFOLIO, 0.0, YEARS * 12)
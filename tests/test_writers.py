@@ -0,0 +1,224 @@
+# =============================================================================
+# GRAVAÇÃO EM FLUXO (STREAMING)
+# =============================================================================
+# Descrição: Os gravadores de tabelas em blocos produzem, em CSV, CSV com
+#            gzip, Parquet e Excel (inclusive a divisão em abas no limite de
+#            linhas do Excel), a mesma tabela montada na memória; e o lote
+#            grava os caminhos de Monte Carlo com `--monte-carlo-paths`.
+#
+# Uso:
+#   python -m pytest tests/test_writers.py
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+# 1. IMPORTAÇÃO DE BIBLIOTECAS
+# -----------------------------------------------------------------------------
+import gzip
+import json
+import re
+import zipfile
+from pathlib import Path
+from typing import Dict, List
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from retirement_engine import MonteCarloSettings, SimulationConfig, run_monte_carlo, simulation_timeline
+from retirement_engine import writers
+from retirement_engine.batch import MONTE_CARLO_DIR_NAME, main as batch_main
+from retirement_engine.samples import make_config
+from retirement_engine.writers import (
+    MONTE_CARLO_PATH_COLUMNS,
+    CsvTableWriter,
+    TableWriter,
+    open_table_writer,
+    write_monte_carlo_paths,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+COLUMNS = ["config_id", "mês", "Saldo, R$ \"nominal\""]
+# Tamanhos dos blocos gravados, com um bloco vazio no meio
+CHUNK_SIZES = (3, 0, 5, 1, 4)
+SHEET_NAMESPACE = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+# -----------------------------------------------------------------------------
+# 2. AUXILIARES
+# -----------------------------------------------------------------------------
+def make_chunks() -> List[Dict[str, np.ndarray]]:
+    rng = np.random.default_rng(7)
+    chunks = []
+    start = 0
+    for size in CHUNK_SIZES:
+        balances = rng.normal(1e5, 5e4, size)
+        balances[::3] = np.nan
+        chunks.append({
+            "config_id": np.array([f"cliente, {i % 2}" for i in range(start, start + size)], dtype=object),
+            "mês": np.arange(start, start + size, dtype=np.int64),
+            "Saldo, R$ \"nominal\"": balances,
+        })
+        start += size
+    return chunks
+
+
+def expected_frame(chunks: List[Dict[str, np.ndarray]]) -> pd.DataFrame:
+    return pd.concat([pd.DataFrame(chunk) for chunk in chunks], ignore_index=True)
+
+
+def write_chunks(path: Path, chunks: List[Dict[str, np.ndarray]], **kwargs: object) -> TableWriter:
+    with open_table_writer(path, COLUMNS, **kwargs) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    return writer
+
+
+def read_xlsx(path: Path) -> Dict[str, pd.DataFrame]:
+    """Abas de uma planilha do xlsxwriter (números e textos em linha), sem depender do openpyxl."""
+    sheets = {}
+    with zipfile.ZipFile(path) as archive:
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        names = [sheet.get("name") for sheet in workbook.iter(f"{SHEET_NAMESPACE}sheet")]
+        for index, name in enumerate(names, start=1):
+            root = ElementTree.fromstring(archive.read(f"xl/worksheets/sheet{index}.xml"))
+            rows = []
+            for row in root.iter(f"{SHEET_NAMESPACE}row"):
+                values = {}
+                for cell in row.iter(f"{SHEET_NAMESPACE}c"):
+                    column = re.match(r"[A-Z]+", cell.get("r")).group()
+                    if cell.get("t") == "inlineStr":
+                        values[column] = "".join(text.text or "" for text in cell.iter(f"{SHEET_NAMESPACE}t"))
+                    else:
+                        values[column] = float(cell.find(f"{SHEET_NAMESPACE}v").text)
+                rows.append(values)
+            letters = sorted(rows[0])
+            header = [rows[0][letter] for letter in letters]
+            sheets[name] = pd.DataFrame(
+                [[values.get(letter, np.nan) for letter in letters] for values in rows[1:]], columns=header
+            )
+    return sheets
+
+
+# -----------------------------------------------------------------------------
+# 3. GRAVADORES
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("suffix", [".csv", ".csv.gz", ".parquet"])
+def test_chunked_output_matches_in_memory_frame(tmp_path: Path, suffix: str) -> None:
+    chunks = make_chunks()
+    path = tmp_path / f"tabela{suffix}"
+    writer = write_chunks(path, chunks)
+    expected = expected_frame(chunks)
+    assert writer.rows_written == len(expected)
+
+    if suffix == ".parquet":
+        import pyarrow.parquet
+
+        metadata = pyarrow.parquet.ParquetFile(path).metadata
+        # Um row group por bloco não vazio, com a compressão padrão
+        assert metadata.num_row_groups == sum(1 for size in CHUNK_SIZES if size)
+        assert metadata.row_group(0).column(0).compression == writers.DEFAULT_PARQUET_COMPRESSION.upper()
+        frame = pd.read_parquet(path)
+    else:
+        if suffix == ".csv.gz":
+            with gzip.open(path) as f:
+                assert f.read(len(COLUMNS[0])) == COLUMNS[0].encode()
+        frame = pd.read_csv(path)
+    pd.testing.assert_frame_equal(frame, expected, check_dtype=False)
+
+
+def test_csv_gzip_compression_option(tmp_path: Path) -> None:
+    chunks = make_chunks()
+    path = tmp_path / "tabela.csv"
+    write_chunks(path, chunks, compression="gzip")
+    assert path.read_bytes()[:2] == b"\x1f\x8b"
+    pd.testing.assert_frame_equal(pd.read_csv(path, compression="gzip"), expected_frame(chunks), check_dtype=False)
+    with pytest.raises(ValueError):
+        CsvTableWriter(tmp_path / "outra.csv", COLUMNS, compression="bz2")
+
+
+def test_parquet_without_chunks_has_columns(tmp_path: Path) -> None:
+    path = tmp_path / "vazia.parquet"
+    write_chunks(path, [])
+    frame = pd.read_parquet(path)
+    assert list(frame.columns) == COLUMNS and len(frame) == 0
+
+
+def test_invalid_chunks_and_formats(tmp_path: Path) -> None:
+    with pytest.raises(TypeError):
+        TableWriter(tmp_path / "base.csv", COLUMNS)  # classe abstrata
+    with open_table_writer(tmp_path / "tabela.csv", COLUMNS) as writer:
+        with pytest.raises(ValueError):
+            writer.write({"config_id": np.array(["a"]), "mês": np.arange(2), COLUMNS[2]: np.ones(2)})
+    with pytest.raises(ValueError):
+        open_table_writer(tmp_path / "tabela.json", COLUMNS)
+
+
+def test_excel_matches_in_memory_frame(tmp_path: Path) -> None:
+    chunks = make_chunks()
+    path = tmp_path / "tabela.xlsx"
+    write_chunks(path, chunks)
+    sheets = read_xlsx(path)
+    assert list(sheets) == ["Simulacao"]
+    pd.testing.assert_frame_equal(sheets["Simulacao"], expected_frame(chunks), check_dtype=False)
+
+
+def test_excel_continues_on_new_sheet_at_row_limit(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    assert writers.EXCEL_MAX_ROWS == 1_048_576
+    # Limite reduzido: 5 linhas por aba, das quais uma é o cabeçalho
+    monkeypatch.setattr(writers, "EXCEL_MAX_ROWS", 5)
+    chunks = make_chunks()
+    path = tmp_path / "tabela.xlsx"
+    write_chunks(path, chunks)
+    sheets = read_xlsx(path)
+    # 13 linhas de dados: três abas cheias e uma com a linha restante
+    assert list(sheets) == ["Simulacao", "Simulacao_2", "Simulacao_3", "Simulacao_4"]
+    assert [len(frame) for frame in sheets.values()] == [4, 4, 4, 1]
+    pd.testing.assert_frame_equal(
+        pd.concat(sheets.values(), ignore_index=True), expected_frame(chunks), check_dtype=False
+    )
+
+
+# -----------------------------------------------------------------------------
+# 4. CAMINHOS DE MONTE CARLO
+# -----------------------------------------------------------------------------
+def test_monte_carlo_paths_match_run_monte_carlo(tmp_path: Path) -> None:
+    config = make_config(20, 10)
+    settings = MonteCarloSettings(n_paths=30, seed=5)
+    path = tmp_path / "caminhos.parquet"
+    n_rows = write_monte_carlo_paths(config, settings, path, chunk_paths=7)
+    frame = pd.read_parquet(path)
+    n_months = len(simulation_timeline(config))
+    assert n_rows == len(frame) == settings.n_paths * n_months
+    assert list(frame.columns) == list(MONTE_CARLO_PATH_COLUMNS)
+
+    result = run_monte_carlo(config, settings)
+    balances = frame["portfolio"].to_numpy().reshape(settings.n_paths, n_months)
+    assert np.array_equal(balances[:, config.accumulation_months], result.portfolio_at_retirement)
+    assert np.array_equal(balances[:, -1], result.final_balances)
+
+
+def test_batch_writes_monte_carlo_paths(tmp_path: Path) -> None:
+    with open(ROOT / "example_config.json", encoding="utf-8") as f:
+        base = json.load(f)
+    monte_carlo = {"n_paths": 20, "seed": 3}
+    source = tmp_path / "clientes.jsonl"
+    source.write_text(
+        json.dumps(dict(base, config_id="com-mc", monte_carlo=monte_carlo)) + "\n"
+        + json.dumps(dict(base, config_id="sem-mc")) + "\n",
+        encoding="utf-8",
+    )
+    output = tmp_path / "saida"
+    assert batch_main([
+        str(source), "--output", str(output), "--workers", "1", "--no-series",
+        "--reference-date", "2025-01-01", "--monte-carlo-paths", "csv.gz",
+    ]) == 0
+
+    files = sorted(path.name for path in (output / MONTE_CARLO_DIR_NAME).iterdir())
+    assert files == ["com-mc.csv.gz"]
+    config = SimulationConfig.from_dict(dict(base, reference_date="2025-01-01"))
+    expected = tmp_path / "esperado.csv.gz"
+    write_monte_carlo_paths(config, MonteCarloSettings.from_dict(monte_carlo), expected)
+    pd.testing.assert_frame_equal(
+        pd.read_csv(output / MONTE_CARLO_DIR_NAME / "com-mc.csv.gz"), pd.read_csv(expected)
+    )